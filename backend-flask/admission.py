@@ -0,0 +1,199 @@
+import threading
+import time
+from collections import deque
+
+# Admission control for /student/register-event. When a popular event opens,
+# every student retries at once; without a gate each attempt costs several
+# queries even after the event has filled. Per event, the controller lets
+# through only as many concurrent attempts as there are free seats plus a
+# small margin (for attempts that fail, e.g. duplicates). Everyone else gets
+# a FIFO ticket and a queue position to retry with, and once the event is
+# full and nothing is in flight, attempts are refused after one indexed
+# lookup: a student who is already registered is let through, so they get
+# "Already registered" rather than "Event is full".
+#
+# The free seat count comes from the database on first use, is updated from
+# every committed seat change (app.seats_changed) and is reloaded every
+# ``refresh_seconds`` so other worker processes' writes are picked up. The
+# conditional seat UPDATE stays the source of truth: the gate only sheds
+# load, it never decides who gets a seat.
+#
+# Framework-agnostic: the Flask and ASGI routes both call enter()/release().
+
+ADMIT = "admit"
+QUEUED = "queued"
+FULL = "full"
+REFRESH = "refresh"
+
+class Decision:
+    """Outcome of one admission attempt"""
+
+    def __init__(self, outcome, position=None, retry_after=None, tracked=True):
+        self.outcome = outcome
+        self.position = position  # 1-based queue position when QUEUED
+        self.retry_after = retry_after
+        self.tracked = tracked  # an admitted attempt that must be release()d
+
+    @property
+    def admitted(self):
+        return self.outcome == ADMIT
+
+class _Gate:
+    """Admission state for one event"""
+
+    def __init__(self):
+        self.available = None  # free seats, None until loaded
+        self.loaded_at = 0.0
+        self.refreshing = False
+        self.in_flight = 0
+        self.next_ticket = 0
+        self.queue = deque()  # (ticket, client) in arrival order, with stale entries
+        self.tickets = {}  # client -> [ticket, last_seen] for live entries
+
+class AdmissionController:
+    """Per-event concurrency gate with a FIFO retry queue"""
+
+    def __init__(self, margin=4, queue_ttl=30.0, retry_after=1.0, refresh_seconds=5.0, clock=time.monotonic):
+        self.margin = margin
+        self.queue_ttl = queue_ttl  # a queued client that stops retrying loses its place
+        self.retry_after = retry_after
+        self.refresh_seconds = refresh_seconds
+        self.clock = clock
+        self._gates = {}
+        self._lock = threading.Lock()
+        self.stats = {ADMIT: 0, QUEUED: 0, FULL: 0}
+
+    def _head(self, gate, now):
+        """Drop admitted, abandoned and expired entries from the queue front; return the head ticket"""
+        while gate.queue:
+            ticket, client = gate.queue[0]
+            entry = gate.tickets.get(client)
+            if entry is not None and entry[0] == ticket:
+                if now - entry[1] <= self.queue_ttl:
+                    return ticket
+                del gate.tickets[client]
+            gate.queue.popleft()
+        return gate.next_ticket
+
+    def admit(self, event_id, client):
+        """Try to admit ``client`` for ``event_id``.
+
+        Returns REFRESH when the caller must load the event's free seats and
+        pass them to update() first.
+        """
+        now = self.clock()
+        with self._lock:
+            gate = self._gates.get(event_id)
+            if gate is None:
+                gate = self._gates[event_id] = _Gate()
+            stale = gate.available is None or now - gate.loaded_at > self.refresh_seconds
+            if stale and not gate.refreshing:
+                gate.refreshing = True
+                return Decision(REFRESH)
+
+            if gate.available is not None and gate.available <= 0 and gate.in_flight == 0:
+                gate.tickets.pop(client, None)
+                self.stats[FULL] += 1
+                return Decision(FULL)
+
+            slots = (gate.available or 0) + self.margin - gate.in_flight
+            entry = gate.tickets.get(client)
+            if entry is None:
+                if slots > 0 and not gate.tickets:
+                    return self._admit(gate)
+                entry = gate.tickets[client] = [gate.next_ticket, now]
+                gate.queue.append((gate.next_ticket, client))
+                gate.next_ticket += 1
+            entry[1] = now
+
+            position = entry[0] - self._head(gate, now)
+            if position < slots:
+                del gate.tickets[client]
+                return self._admit(gate)
+            self.stats[QUEUED] += 1
+            return Decision(QUEUED, position=position + 1, retry_after=self.retry_after)
+
+    def _admit(self, gate):
+        gate.in_flight += 1
+        self.stats[ADMIT] += 1
+        return Decision(ADMIT)
+
+    def release(self, event_id):
+        """Mark a tracked, admitted attempt as finished, whatever its outcome"""
+        with self._lock:
+            gate = self._gates.get(event_id)
+            if gate is not None and gate.in_flight > 0:
+                gate.in_flight -= 1
+
+    def update(self, event_id, available):
+        """Record ``event_id``'s committed free seats; None forgets the event (e.g. not found)"""
+        with self._lock:
+            if available is None:
+                gate = self._gates.get(event_id)
+                if gate is not None and not gate.in_flight and not gate.tickets:
+                    del self._gates[event_id]
+                elif gate is not None:
+                    gate.refreshing = False
+                return
+            gate = self._gates.get(event_id)
+            if gate is None:
+                gate = self._gates[event_id] = _Gate()
+            gate.available = available
+            gate.loaded_at = self.clock()
+            gate.refreshing = False
+
+    def enter(self, event_id, client, load_available):
+        """admit(), loading the free seats with ``load_available()`` when needed.
+
+        ``load_available`` returns the event's free seats, or None when it does
+        not exist; the attempt is then admitted untracked and the route
+        reports the missing event.
+        """
+        decision = self.admit(event_id, client)
+        if decision.outcome != REFRESH:
+            return decision
+        try:
+            available = load_available()
+        except Exception:
+            self.update(event_id, None)
+            raise
+        return self._after_load(event_id, client, available)
+
+    async def enter_async(self, event_id, client, load_available):
+        """enter() with an awaitable ``load_available()``"""
+        decision = self.admit(event_id, client)
+        if decision.outcome != REFRESH:
+            return decision
+        try:
+            available = await load_available()
+        except Exception:
+            self.update(event_id, None)
+            raise
+        return self._after_load(event_id, client, available)
+
+    def _after_load(self, event_id, client, available):
+        self.update(event_id, available)
+        if available is None:
+            return Decision(ADMIT, tracked=False)
+        return self.admit(event_id, client)
+
+def rejection(decision):
+    """(body, status, headers) for an attempt that was not admitted"""
+    if decision.outcome == FULL:
+        return {"status": "error", "message": "Event is full", "waitlist": True}, 400, {}
+    body = {
+        "status": "queued",
+        "message": "Registration is busy, retry shortly",
+        "queue_position": decision.position,
+        "retry_after": decision.retry_after,
+    }
+    return body, 429, {"Retry-After": str(max(1, round(decision.retry_after)))}
+
+def create(config):
+    """AdmissionController configured from the app config"""
+    return AdmissionController(
+        margin=config["ADMISSION_MARGIN"],
+        queue_ttl=config["ADMISSION_QUEUE_TTL"],
+        retry_after=config["ADMISSION_RETRY_AFTER"],
+        refresh_seconds=config["ADMISSION_REFRESH_SECONDS"],
+    )
@@ -1,27 +1,437 @@
-from flask import Flask, jsonify, request
+from flask import Flask, Response, g, jsonify, request, current_app, stream_with_context
 from flask_cors import CORS
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+import functools
+import hashlib
+import io
+import os
 import uuid
-import re
 from config import Config
-from models import db, Event, Student, Registration
+from cache import TTLCache, LRUCache, VersionedCache
+import metrics
+import pool
+import replicas
+from replicas import read_your_writes, replica_read
+import search
+import idempotency
+from idempotency import idempotent
+import admission
+import catalog
+import outbox
+import payments
+import sessions
+import waitlist
+from sqlalchemy import Select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload
+from models import db, Event, Student, Registration, WaitlistEntry, PaymentOutbox
+from migrations import run_migrations
+from validation import VALID_BRANCHES, parse_student, parse_event, parse_price
+import broadcast
+import compression
+import bulk
+import listing
+import serializers
 
 def create_app():
     app = Flask(__name__)
     app.config.from_object(Config)
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = pool.engine_options(app)
     
     # Initialize extensions
     db.init_app(app)
-    CORS(app)
+    pool.init_pool(app, db)
+    replicas.init_replicas(app, db)
+    CORS(app, expose_headers=["X-Next-Cursor", replicas.PRIMARY_UNTIL_HEADER, idempotency.REPLAYED_HEADER])
+    metrics.init_metrics(app)
+    compression.init_compression(app)
 
     return app
 
 app = create_app()
 
+# Admin dashboard payload, cleared whenever events or registrations change
+dashboard_cache = TTLCache(app.config["DASHBOARD_CACHE_TTL"])
+
+# Serialized public catalog responses, versioned on event writes
+if app.config["CATALOG_CACHE_BACKEND"] == "ttl":
+    catalog_cache = VersionedCache(TTLCache(app.config["CATALOG_CACHE_TTL"]))
+else:
+    catalog_cache = VersionedCache(LRUCache(app.config["CATALOG_CACHE_SIZE"]))
+
+# Seat availability deltas for /events/stream
+seat_updates = broadcast.create(app.config)
+
+# Per-event admission gate in front of /student/register-event
+registration_gate = admission.create(app.config)
+
+# Student.to_dict() per student id, so authenticated routes skip the lookup
+principal_cache = LRUCache(app.config["PRINCIPAL_CACHE_SIZE"], ttl=app.config["PRINCIPAL_CACHE_TTL"])
+
+def seats_changed(event, publish=True):
+    """Push an event's committed seat availability to /events/stream clients"""
+    available_spots = event.capacity - event.seats_taken
+    registration_gate.update(event.id, max(0, available_spots))
+    if not publish:
+        return
+    try:
+        seat_updates.publish({"id": event.id, "available_spots": max(0, available_spots), "is_full": available_spots <= 0})
+    except Exception:
+        # The write is already committed; listeners catch up on their next reset
+        app.logger.exception("Could not publish seat update for event %s", event.id)
+
+def payments_changed(event_ids):
+    """Announce events whose seats or revenue a payment worker batch changed"""
+    for event_id in event_ids:
+        events_changed(event_id, shared=False)  # outbox.apply() bumped the shared versions
+        event = db.session.get(Event, event_id)
+        if event:
+            seats_changed(event)
+
+def seats_changed_elsewhere(event_ids):
+    """Feed seat changes other processes committed to the gate and the local stream"""
+    with app.app_context():
+        events = db.session.execute(
+            db.select(Event.id, Event.capacity, Event.seats_taken).where(Event.id.in_(event_ids))
+        ).all()
+    for event in events:
+        # A shared broadcaster already carried the writer's own delta
+        seats_changed(event, publish=not seat_updates.shared)
+
+def catalog_version_rows():
+    with app.app_context():
+        return db.session.execute(catalog.all_versions_statement()).all()
+
+# Seat changes from other worker processes and the payment worker arrive
+# through the shared catalog versions; started per process after fork
+seat_watcher = catalog.VersionWatcher(
+    catalog_version_rows, seats_changed_elsewhere,
+    app.config["SEAT_POLL_INTERVAL"] if app.config["CATALOG_CACHE_SHARED"] else 0,
+)
+
+# Payments settle off the request path: routes write outbox rows and these
+# workers (started by `python app.py` or `python worker.py`) charge them
+payment_gateway = payments.create(app.config)
+payment_workers = outbox.create(app, payment_gateway, on_change=payments_changed)
+
+def load_principal(student_id):
+    """A student's to_dict() from principal_cache, loading it on a miss; None if unknown"""
+    principal = principal_cache.get(student_id)
+    if principal is None:
+        student = db.session.get(Student, student_id)
+        if student is None:
+            return None
+        principal = student.to_dict()
+        principal_cache.set(student.id, principal)
+    return principal
+
+def student_session(view):
+    """Identify the calling student from a Bearer session token (see sessions.py).
+
+    Sets g.session_student_id, or None when no token was sent; routes then
+    fall back to the student_id in the request unless SESSION_REQUIRED is set.
+    """
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        student_id, message = sessions.authenticate(
+            request.headers.get("Authorization"), app.config["SECRET_KEY"], principal_cache.get
+        )
+        if message:
+            return jsonify({"status": "error", "message": message}), 401
+        if student_id is None and app.config["SESSION_REQUIRED"]:
+            return jsonify({"status": "error", "message": "Login required"}), 401
+        g.session_student_id = student_id
+        return view(*args, **kwargs)
+    return wrapper
+
+def acting_student(claimed_id):
+    """The student a request acts for: the session's, else ``claimed_id``.
+
+    Returns (student_id, None), or (None, error_response) when the request
+    names a different student than its session.
+    """
+    session_id = g.get("session_student_id")
+    if session_id is None:
+        return claimed_id, None
+    if claimed_id and str(claimed_id) != session_id:
+        return None, (jsonify({"status": "error", "message": "student_id does not match the session"}), 403)
+    return session_id, None
+
+def free_seats(event_id):
+    """Committed free seats of an active event, None if there is no such event"""
+    return db.session.execute(
+        db.select(Event.capacity - Event.seats_taken).where(Event.id == event_id, Event.status == 'active')
+    ).scalar()
+
+def already_registered(event_id, student_id):
+    """Whether ``student_id`` holds a registration for ``event_id``"""
+    return db.session.execute(
+        db.select(Registration.id).where(Registration.event_id == event_id, Registration.student_id == student_id)
+    ).first() is not None
+
+def admission_controlled(view):
+    """Shed registration attempts the event cannot absorb (see admission.py).
+
+    Attempts beyond the free seats plus ADMISSION_MARGIN get a 429 with their
+    queue position; once the event is full they get "Event is full". A
+    student who is already registered is let through instead, so the view
+    answers "Already registered". Goes inside @idempotent, so a repeated
+    Idempotency-Key is replayed before it reaches the gate.
+    """
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        data = request.get_json(force=True, silent=True)
+        if not app.config["ADMISSION_ENABLED"] or not isinstance(data, dict):
+            return view(*args, **kwargs)
+        student_id = g.get("session_student_id") or data.get("student_id")
+        try:
+            event_id = int(data.get("event_id"))
+        except (TypeError, ValueError):
+            return view(*args, **kwargs)
+        if not student_id:
+            return view(*args, **kwargs)
+
+        decision = registration_gate.enter(event_id, str(student_id), lambda: free_seats(event_id))
+        if not decision.admitted:
+            if already_registered(event_id, str(student_id)):
+                return view(*args, **kwargs)
+            body, status, headers = admission.rejection(decision)
+            return jsonify(body), status, headers
+        try:
+            return view(*args, **kwargs)
+        finally:
+            if decision.tracked:
+                registration_gate.release(event_id)
+    return wrapper
+
+def events_changed(event_id=None, shared=True):
+    """Invalidate cached reads after a committed event or registration write.
+
+    Pass ``event_id`` when only that event's seat availability changed.
+    Other worker processes see the write through the shared catalog
+    version; pass ``shared=False`` if the writer already bumped it in its
+    own transaction.
+    """
+    dashboard_cache.clear()
+    catalog_cache.bump(event_id)
+    if shared and app.config["CATALOG_CACHE_SHARED"]:
+        # On the session's own connection: the request may already hold one
+        try:
+            db.session.execute(catalog.bump_statement(db.engine.dialect, event_id))
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            # Other workers keep their cached copy until the next write
+            app.logger.exception("Could not bump the catalog version for event %s", event_id)
+
+def catalog_versions(scope=None):
+    """Shared catalog versions for a response cached under ``scope``, None when not shared"""
+    if not app.config["CATALOG_CACHE_SHARED"]:
+        return None
+    return catalog.versions(db.session.execute(catalog.versions_statement(scope)), scope)
+
+def catalog_entry(data, headers):
+    """Cache entry for a built catalog response: (headers, representations by mimetype)"""
+    body = app.json.dumps(data).encode("utf-8")
+    return headers, {"application/json": (body, hashlib.sha256(body).hexdigest(), {})}
+
+def catalog_representation(entry, req):
+    """(mimetype, body, etag, compressed variants) of a cached entry as ``req`` negotiated.
+
+    The MessagePack body is packed from the cached JSON on first use and
+    kept in the entry with its own ETag.
+    """
+    representations = entry[1]
+    mimetype = serializers.MSGPACK_MIMETYPE if serializers.wants_msgpack(req) else "application/json"
+    if mimetype not in representations:
+        body = app.json.packb(app.json.loads(representations["application/json"][0]))
+        representations[mimetype] = (body, hashlib.sha256(body).hexdigest(), {})
+    return (mimetype, *representations[mimetype])
+
+def catalog_response(key, build, cache_control, scope=None):
+    """Serve a public catalog response from catalog_cache with a strong ETag.
+
+    ``build`` returns (data, headers), or None when there is nothing to
+    serve, and only runs on a cache miss. A matching If-None-Match gets a
+    304 after one lookup of the shared catalog versions. JSON and
+    MessagePack are cached side by side (see catalog_representation()).
+    """
+    versioned_key = catalog_cache.key((key, catalog_versions(scope)), scope)
+    entry = catalog_cache.get(versioned_key)
+    if entry is None:
+        built = build()
+        if built is None:
+            return None
+        entry = catalog_entry(*built)
+        catalog_cache.set(versioned_key, entry)
+
+    mimetype, body, etag, encoded = catalog_representation(entry, request)
+    response = app.response_class(body, mimetype=mimetype, headers=entry[0])
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = cache_control
+    if serializers.msgpack is not None:
+        response.vary.add("Accept")
+    response = response.make_conditional(request)
+    # Compressed bodies are cached with the entry
+    compression.encode_cached(response, body, encoded, request.accept_encodings, app.config)
+    return response
+
+# List helpers: keyset pagination, field projection and filters (see listing.py)
+def parse_list_args(cursor_columns):
+    """Parse the list query args for this request.
+
+    Returns (args, None) on success or (None, error_response) on bad input.
+    """
+    args, message = listing.parse_list_params(request.args, cursor_columns, current_app.config["MAX_PAGE_SIZE"])
+    if message:
+        return None, (jsonify({"status": "error", "message": message}), 400)
+    return args, None
+
+def fetch(query, yield_per=None):
+    """Run an ORM query or a Core select of columns, optionally in batches"""
+    if isinstance(query, Select):
+        options = {"yield_per": yield_per} if yield_per else {}
+        return db.session.execute(query, execution_options=options)
+    return query.yield_per(yield_per) if yield_per else query.all()
+
+def paginate(query, args, columns, key, descending=False):
+    """Apply keyset pagination on ``columns`` to ``query``.
+
+    ``key`` maps a result row to its values for ``columns``. Returns the rows
+    of the requested page and the cursor for the next one (None on the last
+    page). Without a ``limit`` every remaining row is returned.
+    """
+    rows = fetch(listing.page_statement(query, args, columns, descending))
+    return listing.split_page(list(rows), args, key)
+
+def schema_select(schema, stmt, args, sort_columns):
+    """Narrow ``stmt`` to the columns ``schema`` needs for the requested fields.
+
+    Returns the tuple-row statement, its row encoder and the keyset key
+    function (the sort columns are selected after the schema's columns).
+    """
+    columns, encode = schema.plan(args["fields"])
+    stmt = stmt.with_only_columns(*columns, *sort_columns, maintain_column_froms=True)
+    return stmt, encode, lambda row: tuple(row[len(columns):])
+
+def filter_events(query, args, allow_status=True):
+    """Apply the category/date range/status filters to an Event query."""
+    return listing.filter_events(query, request.args, args, allow_status)
+
+def filter_students(query):
+    """Apply the branch/semester filters to a Student query."""
+    return listing.filter_students(query, request.args)
+
+project = listing.project
+
+def page_response(items, next_cursor):
+    response = jsonify(items)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return response, 200
+
+# ?shape= for responses embedding events and students per registration
+SHAPES = ("nested", "normalized")
+
+def parse_shape():
+    """Return (shape, None), or (None, error_response) for an unknown shape"""
+    shape = request.args.get("shape") or "nested"
+    if shape not in SHAPES:
+        return None, (jsonify({"status": "error", "message": f"shape must be one of: {', '.join(SHAPES)}"}), 400)
+    return shape, None
+
+def normalize_registrations(registrations, fields=None, events=True):
+    """Registrations that reference their event and student by id.
+
+    Each referenced event and student is sent once, in "events"/"students"
+    maps keyed by id, instead of once per registration. Registrations
+    missing either are skipped, as in the nested shape. ``events=False``
+    leaves out the events map, for responses about a single event.
+    """
+    body = {"registrations": [], "students": {}}
+    if events:
+        body["events"] = {}
+    for reg in registrations:
+        if reg.student is None or (events and reg.event is None):
+            continue
+        item = reg.to_dict()
+        item['amount_formatted'] = f"₹{reg.amount_paid:.2f}"
+        body["registrations"].append(project(item, fields))
+        if reg.student_id not in body["students"]:
+            body["students"][reg.student_id] = reg.student.to_dict()
+        if events and reg.event_id not in body["events"]:
+            body["events"][reg.event_id] = reg.event.to_dict()
+    return body
+
+STREAM_BATCH_SIZE = 500
+
+def stream_format():
+    """Return "ndjson" or "json" when the client opted into streaming, else None.
+
+    Streaming is requested with ``?stream=ndjson|json`` or an
+    ``Accept: application/x-ndjson`` header.
+    """
+    requested = request.args.get("stream")
+    if requested in ("ndjson", "json"):
+        return requested
+    if request.accept_mimetypes.best == "application/x-ndjson":
+        return "ndjson"
+    return None
+
+def list_response(query, args, columns, key, serialize, descending=False):
+    """Respond with one page of ``query`` or, if requested, stream every row.
+
+    ``serialize`` turns a row into its response dict (or None to skip it).
+    Streaming keeps the keyset order and cursor but not the page size limit
+    semantics: rows are fetched through a server-side cursor with yield_per
+    and encoded incrementally, so memory stays flat for any table size.
+    """
+    fmt = stream_format()
+    if fmt is None:
+        rows, next_cursor = paginate(query, args, columns, key, descending)
+        items = [project(item, args["fields"]) for item in map(serialize, rows) if item is not None]
+        return page_response(items, next_cursor)
+
+    query = listing.keyset(query, args, columns, descending)
+    if args["limit"] is not None:
+        query = query.limit(args["limit"])
+
+    def generate():
+        separator = "\n" if fmt == "ndjson" else ","
+        chunk = []
+        if fmt == "json":
+            yield "["
+        count = 0
+        for row in fetch(query, STREAM_BATCH_SIZE):
+            item = serialize(row)
+            if item is None:
+                continue
+            encoded = app.json.dumps(project(item, args["fields"]))
+            chunk.append(encoded if fmt == "ndjson" or count == 0 else separator + encoded)
+            if fmt == "ndjson":
+                chunk.append(separator)
+            count += 1
+            # Flush the first row straight away, then once per batch
+            if count == 1 or count % STREAM_BATCH_SIZE == 0:
+                yield "".join(chunk)
+                chunk = []
+        if fmt == "json":
+            chunk.append("]")
+        if chunk:
+            yield "".join(chunk)
+
+    mimetype = "application/x-ndjson" if fmt == "ndjson" else "application/json"
+    return Response(stream_with_context(generate()), mimetype=mimetype)
+
 @app.get("/health")
 def health():
     return jsonify({"status": "ok", "timestamp": datetime.now().isoformat()}), 200
 
+@app.get("/metrics")
+def get_metrics():
+    """Per-route latency and query histograms in Prometheus text format"""
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
 # Student Authentication Endpoints
 @app.post("/student/register")
 def student_register():
@@ -31,27 +441,10 @@ def student_register():
     except Exception:
         return jsonify({"status": "error", "message": "Invalid JSON"}), 400
 
-    required_fields = ["usn", "name", "email", "password", "semester", "branch"]
-    for field in required_fields:
-        if not data.get(field):
-            return jsonify({"status": "error", "message": f"{field} is required"}), 400
-
-    # Validate semester (1-8)
-    semester = int(data["semester"])
-    if semester < 1 or semester > 8:
-        return jsonify({"status": "error", "message": "Semester must be between 1 and 8"}), 400
-
-    # Validate branch
-    valid_branches = [
-        "Computer Science",
-        "Computer Science and Business Systems",
-        "Electronics and Communication Engineering",
-        "Artificial Intelligence and Data Science",
-        "Mechanical Engineering",
-        "Civil Engineering"
-    ]
-    if data["branch"] not in valid_branches:
-        return jsonify({"status": "error", "message": "Invalid branch"}), 400
+    values, message = parse_student(data)
+    if message:
+        return jsonify({"status": "error", "message": message}), 400
+    password = values.pop("password")
 
     try:
         # Check if USN or email already exists
@@ -64,17 +457,11 @@ def student_register():
 
         # Create new student
         new_student = Student(
-            id=data["usn"],
-            usn=data["usn"].strip(),
-            name=data["name"].strip(),
-            email=data["email"].strip(),
-            phone=data.get("phone", ""),
-            semester=semester,
-            branch=data["branch"],
+            **values,
             password_hash="",  # Will be set below
             is_active=True
         )
-        new_student.set_password(data["password"])
+        new_student.set_password(password)
         
         db.session.add(new_student)
         db.session.commit()
@@ -117,10 +504,23 @@ def student_login():
         if not student.is_active:
             return jsonify({"status": "error", "message": "Account is deactivated"}), 401
         
+        # Transparently upgrade hashes made with an older BCRYPT_ROUNDS
+        if student.password_needs_rehash():
+            student.set_password(password)
+            db.session.commit()
+        
+        # Later requests present the token instead of logging in again
+        student_dict = student.to_dict()
+        principal_cache.set(student.id, student_dict)
+        token, expires_at = sessions.issue(
+            app.config["SECRET_KEY"], student.id, student.is_active, app.config["SESSION_TTL"]
+        )
         return jsonify({
             "status": "success",
             "message": "Login successful",
-            "student": student.to_dict()
+            "student": student_dict,
+            "token": token,
+            "expires_at": expires_at
         }), 200
     except Exception as e:
         return jsonify({"status": "error", "message": "Login failed"}), 500
@@ -129,24 +529,16 @@ def student_login():
 @app.get("/admin/events")
 def admin_get_events():
     """Get all events with registration counts for admin"""
+    args, error = parse_list_args([Event.date, Event.id])
+    if error:
+        return error
+
     try:
-        events = Event.query.all()
-        events_with_stats = []
-        
-        for event in events:
-            registration_count = Registration.query.filter_by(event_id=event.id).count()
-            revenue = db.session.query(db.func.sum(Registration.amount_paid)).filter(
-                Registration.event_id == event.id,
-                Registration.payment_status == 'paid'
-            ).scalar() or 0.0
-            
-            event_dict = event.to_dict()
-            event_dict['registration_count'] = registration_count
-            event_dict['revenue'] = float(revenue)
-            event_dict['price_formatted'] = f"₹{event.price:.2f}" if event.price > 0 else "Free"
-            events_with_stats.append(event_dict)
-        
-        return jsonify(events_with_stats), 200
+        # Registration count and revenue are maintained on the event row
+        sort_columns = [Event.date, Event.id]
+        stmt, encode, key = schema_select(serializers.ADMIN_EVENT, filter_events(db.select(Event), args), args, sort_columns)
+        rows, next_cursor = paginate(stmt, args, sort_columns, key)
+        return page_response([encode(row) for row in rows], next_cursor)
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
@@ -158,50 +550,16 @@ def admin_create_event():
     except Exception:
         return jsonify({"status": "error", "message": "Invalid JSON"}), 400
 
-    required_fields = ["title", "description", "date", "time", "location", "category", "capacity", "price"]
-    for field in required_fields:
-        if not data.get(field):
-            return jsonify({"status": "error", "message": f"{field} is required"}), 400
-
-    # Validate date format
-    if not re.match(r"^\d{4}-\d{2}-\d{2}$", data["date"]):
-        return jsonify({"status": "error", "message": "date must be in YYYY-MM-DD format"}), 400
-
-    # Validate time format
-    if not re.match(r"^\d{2}:\d{2}$", data["time"]):
-        return jsonify({"status": "error", "message": "time must be in HH:MM format"}), 400
+    values, message = parse_event(data)
+    if message:
+        return jsonify({"status": "error", "message": message}), 400
 
     try:
-        # Parse date and time
-        event_date = datetime.strptime(data["date"], "%Y-%m-%d").date()
-        event_time = datetime.strptime(data["time"], "%H:%M").time()
-        
-        # Handle price - allow "free" or numeric value
-        price = 0.0
-        if data["price"] != "free" and data["price"] != "Free":
-            try:
-                price = float(data["price"])
-            except ValueError:
-                return jsonify({"status": "error", "message": "Invalid price format"}), 400
-        
-        new_event = Event(
-            title=data["title"].strip(),
-            description=data["description"].strip(),
-            date=event_date,
-            time=event_time,
-            duration=data.get("duration", 2),
-            location=data["location"].strip(),
-            category=data["category"].strip(),
-            capacity=int(data["capacity"]),
-            price=price,
-            image=data.get("image", ""),
-            organizer=data.get("organizer", "Admin"),
-            status="active",
-            tags=data.get("tags", [])
-        )
+        new_event = Event(**values)
         
         db.session.add(new_event)
         db.session.commit()
+        events_changed()
         
         return jsonify({"status": "success", "event": new_event.to_dict()}), 201
     except Exception as e:
@@ -230,17 +588,19 @@ def admin_update_event(event_id):
                     event.time = datetime.strptime(data[field], "%H:%M").time()
                 elif field == "price":
                     # Handle price - allow "free" or numeric value
-                    if data[field] == "free" or data[field] == "Free":
-                        event.price = 0.0
-                    else:
-                        try:
-                            event.price = float(data[field])
-                        except ValueError:
-                            return jsonify({"status": "error", "message": "Invalid price format"}), 400
+                    try:
+                        event.price = parse_price(data[field])
+                    except ValueError:
+                        return jsonify({"status": "error", "message": "Invalid price format"}), 400
                 else:
                     setattr(event, field, data[field])
         
+        # A larger capacity (or reactivation) may have room for waitlisted students
+        if "capacity" in data or "status" in data:
+            waitlist.promote(event.id)
         db.session.commit()
+        events_changed()
+        seats_changed(event)
         return jsonify({"status": "success", "event": event.to_dict()}), 200
     except Exception as e:
         db.session.rollback()
@@ -253,6 +613,7 @@ def admin_delete_event(event_id):
         event = Event.query.get_or_404(event_id)
         db.session.delete(event)
         db.session.commit()
+        events_changed()
         return jsonify({"status": "success", "message": "Event deleted"}), 200
     except Exception as e:
         db.session.rollback()
@@ -261,39 +622,77 @@ def admin_delete_event(event_id):
 @app.get("/admin/registrations")
 def admin_get_registrations():
     """Get all registrations with event and student details"""
+    sort_columns = [Registration.registered_at, Registration.id]
+    args, error = parse_list_args(sort_columns)
+    if error:
+        return error
+    shape, error = parse_shape()
+    if error:
+        return error
+    if shape == "normalized" and stream_format():
+        return jsonify({"status": "error", "message": "shape=normalized cannot be streamed"}), 400
+
     try:
-        registrations = Registration.query.all()
-        registrations_with_details = []
+        query = Registration.query.options(
+            joinedload(Registration.event), joinedload(Registration.student)
+        )
+        status = request.args.get("status")
+        if status:
+            query = query.filter(Registration.payment_status == status)
+        if request.args.get("event_id"):
+            query = query.filter(Registration.event_id == request.args.get("event_id", type=int))
+        if request.args.get("student_id"):
+            query = query.filter(Registration.student_id == request.args["student_id"])
+        if request.args.get("category"):
+            query = query.filter(Registration.event.has(Event.category == request.args["category"]))
+        if args["date_from"]:
+            query = query.filter(Registration.registered_at >= args["date_from"])
+        if args["date_to"]:
+            query = query.filter(Registration.registered_at < args["date_to"] + timedelta(days=1))
         
-        for reg in registrations:
-            event = Event.query.get(reg.event_id)
-            student = Student.query.get(reg.student_id)
+        key = lambda reg: (reg.registered_at, reg.id)
+        if shape == "normalized":
+            rows, next_cursor = paginate(query, args, sort_columns, key, descending=True)
+            return page_response(normalize_registrations(rows, args["fields"]), next_cursor)
+
+        def serialize(reg):
+            event = reg.event
+            student = reg.student
             
             if event and student:
                 reg_dict = reg.to_dict()
                 reg_dict['event'] = event.to_dict()
                 reg_dict['student'] = student.to_dict()
                 reg_dict['amount_formatted'] = f"₹{reg.amount_paid:.2f}"
-                registrations_with_details.append(reg_dict)
+                return reg_dict
         
-        return jsonify(registrations_with_details), 200
+        return list_response(query, args, sort_columns, key, serialize, descending=True)
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
 @app.get("/admin/dashboard")
 def admin_dashboard():
     """Get admin dashboard statistics"""
+    cached = dashboard_cache.get("dashboard")
+    if cached is not None:
+        return jsonify(cached), 200
+
     try:
-        total_events = Event.query.count()
-        total_registrations = Registration.query.count()
-        total_revenue = db.session.query(db.func.sum(Registration.amount_paid)).filter(
-            Registration.payment_status == 'paid'
-        ).scalar() or 0.0
+        today = datetime.now().date()
+
+        # All scalar stats in a single statement over the per-event totals
+        stats = db.session.execute(db.select(
+            db.func.count(Event.id).label("total_events"),
+            db.func.coalesce(db.func.sum(Event.seats_taken), 0).label("total_registrations"),
+            db.func.sum(Event.revenue).label("total_revenue"),
+            db.func.count(Event.id).filter(Event.date > today).label("upcoming_events_count"),
+        )).one()
+        total_revenue = stats.total_revenue or 0.0
         
         # Upcoming events (next 30 days)
-        upcoming_date = datetime.now().date() + timedelta(days=30)
+        upcoming_date = today + timedelta(days=30)
         upcoming_events = Event.query.filter(
-            Event.date > datetime.now().date(),
+            Event.date > today,
             Event.date <= upcoming_date
         ).limit(5).all()
         
@@ -303,48 +702,91 @@ def admin_dashboard():
             Registration.registered_at > recent_date
         ).limit(5).all()
         
-        return jsonify({
-            "total_events": total_events,
-            "total_registrations": total_registrations,
+        dashboard = {
+            "total_events": stats.total_events,
+            "total_registrations": stats.total_registrations,
             "total_revenue": float(total_revenue),
             "total_revenue_formatted": f"₹{total_revenue:.2f}",
-            "upcoming_events_count": Event.query.filter(
-                Event.date > datetime.now().date()
-            ).count(),
+            "upcoming_events_count": stats.upcoming_events_count,
             "recent_registrations_count": len(recent_registrations),
             "upcoming_events": [event.to_dict() for event in upcoming_events],
             "recent_registrations": [reg.to_dict() for reg in recent_registrations]
-        }), 200
+        }
+        dashboard_cache.set("dashboard", dashboard)
+        return jsonify(dashboard), 200
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
 @app.get("/admin/students")
 def admin_get_students():
     """Get all registered students for admin"""
+    args, error = parse_list_args([Student.id])
+    if error:
+        return error
+
     try:
-        students = Student.query.all()
-        students_with_stats = []
+        query = db.session.query(Student, db.func.count(Registration.id)).outerjoin(
+            Registration, Registration.student_id == Student.id
+        ).group_by(Student.id)
+        query = filter_students(query)
         
-        for student in students:
-            registration_count = Registration.query.filter_by(student_id=student.id).count()
+        def serialize(row):
+            student, registration_count = row
             student_dict = student.to_dict()
             student_dict['registration_count'] = registration_count
-            students_with_stats.append(student_dict)
+            return student_dict
         
-        return jsonify(students_with_stats), 200
+        return list_response(query, args, [Student.id], lambda row: (row[0].id,), serialize)
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+@app.put("/admin/students/<student_id>")
+def admin_update_student(student_id):
+    """Activate or deactivate a student (admin only)"""
+    try:
+        data = request.get_json(force=True) or {}
+    except Exception:
+        return jsonify({"status": "error", "message": "Invalid JSON"}), 400
+    if not isinstance(data.get("is_active"), bool):
+        return jsonify({"status": "error", "message": "is_active must be true or false"}), 400
+
+    try:
+        student = db.session.get(Student, student_id)
+        if not student:
+            return jsonify({"status": "error", "message": "Student not found"}), 404
+        student.is_active = data["is_active"]
+        db.session.commit()
+        # Cache the new flag rather than evict it, so this process rejects the
+        # student's outstanding session tokens straight away
+        principal_cache.set(student.id, student.to_dict())
+        return jsonify({"status": "success", "student": student.to_dict()}), 200
     except Exception as e:
+        db.session.rollback()
         return jsonify({"status": "error", "message": str(e)}), 500
 
 @app.get("/admin/events/<int:event_id>/details")
 def admin_get_event_details(event_id):
     """Get detailed event information with all registrations"""
+    shape, error = parse_shape()
+    if error:
+        return error
     try:
         event = Event.query.get_or_404(event_id)
-        registrations = Registration.query.filter_by(event_id=event_id).all()
+        registrations = Registration.query.options(
+            joinedload(Registration.student)
+        ).filter_by(event_id=event_id).all()
+
+        if shape == "normalized":
+            event_dict = event.to_dict()
+            event_dict.update(normalize_registrations(registrations, events=False))
+            event_dict['total_registrations'] = len(event_dict['registrations'])
+            event_dict['available_spots'] = event.capacity - event_dict['total_registrations']
+            event_dict['price_formatted'] = f"₹{event.price:.2f}" if event.price > 0 else "Free"
+            return jsonify(event_dict), 200
         
         registrations_with_students = []
         for reg in registrations:
-            student = Student.query.get(reg.student_id)
+            student = reg.student
             if student:
                 reg_dict = reg.to_dict()
                 reg_dict['student'] = student.to_dict()
@@ -361,29 +803,67 @@ def admin_get_event_details(event_id):
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
+@app.post("/admin/import")
+def admin_import():
+    """Bulk import students or events from a CSV or NDJSON request body"""
+    kind = request.args.get("type")
+    if kind not in bulk.IMPORTERS:
+        return jsonify({"status": "error", "message": "type must be students or events"}), 400
+    fmt = request.args.get("format") or bulk.detect_format(content_type=request.content_type)
+    if fmt not in ("csv", "ndjson"):
+        return jsonify({"status": "error", "message": "format must be csv or ndjson"}), 400
+    batch_size = request.args.get("batch_size", bulk.IMPORT_BATCH_SIZE, type=int)
+
+    try:
+        stream = io.TextIOWrapper(request.stream, encoding="utf-8-sig", newline="")
+        result = bulk.IMPORTERS[kind](bulk.read_rows(stream, fmt), batch_size=max(1, batch_size))
+        if kind == "events" and result["imported"]:
+            events_changed()
+        return jsonify({"status": "success", **result}), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+@app.get("/admin/export")
+def admin_export():
+    """Stream students, events or registrations as CSV or NDJSON"""
+    kind = request.args.get("type")
+    if kind not in bulk.EXPORT_MODELS:
+        return jsonify({"status": "error", "message": "type must be students, events or registrations"}), 400
+    fmt = request.args.get("format", "csv")
+    if fmt not in ("csv", "ndjson"):
+        return jsonify({"status": "error", "message": "format must be csv or ndjson"}), 400
+
+    mimetype = "text/csv" if fmt == "csv" else "application/x-ndjson"
+    return Response(
+        stream_with_context(bulk.export_rows(kind, fmt)),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f"attachment; filename={kind}.{fmt}"}
+    )
+
 # Student Portal Endpoints
 @app.get("/student/events")
+@replica_read
 def student_get_events():
     """Get all active events for students"""
+    args, error = parse_list_args([Event.date, Event.id])
+    if error:
+        return error
+
     try:
-        active_events = Event.query.filter_by(status='active').all()
-        events_with_availability = []
-        
-        for event in active_events:
-            registration_count = Registration.query.filter_by(event_id=event.id).count()
-            available_spots = event.capacity - registration_count
-            
-            event_dict = event.to_dict()
-            event_dict['available_spots'] = max(0, available_spots)
-            event_dict['is_full'] = available_spots <= 0
-            event_dict['price_formatted'] = f"₹{event.price:.2f}" if event.price > 0 else "Free"
-            events_with_availability.append(event_dict)
-        
-        return jsonify(events_with_availability), 200
+        sort_columns = [Event.date, Event.id]
+        stmt = filter_events(db.select(Event).filter_by(status='active'), args, allow_status=False)
+        stmt, encode, key = schema_select(serializers.STUDENT_EVENT, stmt, args, sort_columns)
+        rows, next_cursor = paginate(stmt, args, sort_columns, key)
+        return page_response([encode(row) for row in rows], next_cursor)
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
 @app.post("/student/register-event")
+@read_your_writes
+@student_session
+@idempotent
+@admission_controlled
 def student_register_event():
     """Register a student for an event"""
     try:
@@ -392,34 +872,38 @@ def student_register_event():
         return jsonify({"status": "error", "message": "Invalid JSON"}), 400
 
     event_id = data.get("event_id")
-    student_id = data.get("student_id")
+    student_id, error = acting_student(data.get("student_id"))
+    if error:
+        return error
     
     if not event_id or not student_id:
         return jsonify({"status": "error", "message": "event_id and student_id are required"}), 400
 
     try:
-        # Check if event exists and is active
-        event = Event.query.filter_by(id=event_id, status='active').first()
-        if not event:
-            return jsonify({"status": "error", "message": "Event not found or inactive"}), 404
-
-        # Check if student exists
-        student = Student.query.get(student_id)
+        # Check if student exists (cached, so usually no query)
+        student = load_principal(student_id)
         if not student:
             return jsonify({"status": "error", "message": "Student not found"}), 404
 
-        # Check if already registered
-        existing_registration = Registration.query.filter_by(
-            event_id=event_id, student_id=student_id
-        ).first()
-        if existing_registration:
-            return jsonify({"status": "error", "message": "Already registered for this event"}), 400
-
-        # Check capacity
-        registration_count = Registration.query.filter_by(event_id=event_id).count()
-        if registration_count >= event.capacity:
+        # Reserve a seat atomically: the conditional UPDATE row-locks the event
+        # until commit, so concurrent requests cannot oversell it
+        reserved = db.session.execute(
+            db.update(Event)
+            .where(Event.id == event_id, Event.status == 'active', Event.seats_taken < Event.capacity)
+            .values(seats_taken=Event.seats_taken + 1)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if not reserved:
+            db.session.rollback()
+            event = Event.query.filter_by(id=event_id, status='active').first()
+            if not event:
+                return jsonify({"status": "error", "message": "Event not found or inactive"}), 404
+            if Registration.query.filter_by(event_id=event_id, student_id=student_id).first():
+                return jsonify({"status": "error", "message": "Already registered for this event"}), 400
             return jsonify({"status": "error", "message": "Event is full"}), 400
 
+        event = Event.query.get(event_id)
+
         # Create registration
         registration = Registration(
             event_id=event_id,
@@ -429,34 +913,200 @@ def student_register_event():
             payment_method=data.get("payment_method", "card"),
             special_requirements=data.get("special_requirements", "")
         )
-        
-        # Simulate payment processing for paid events
-        if event.price > 0:
-            registration.payment_status = 'paid'
-            registration.transaction_id = f"TXN_{uuid.uuid4().hex[:8].upper()}"
-        
         db.session.add(registration)
-        db.session.commit()
+
+        # Paid events settle through the outbox once this commits
+        if registration.payment_status == 'pending':
+            db.session.add(outbox.settlement(registration))
+        try:
+            # The stats UPDATE autoflushes the insert, so a duplicate can surface here too
+            if registration.payment_status == 'paid':
+                db.session.execute(
+                    db.update(Event)
+                    .where(Event.id == event.id)
+                    .values(paid_count=Event.paid_count + 1, revenue=Event.revenue + registration.amount_paid)
+                    .execution_options(synchronize_session=False)
+                )
+            db.session.commit()
+        except IntegrityError:
+            # uq_registration_event_student rejected a duplicate; the seat
+            # reservation is rolled back with it
+            db.session.rollback()
+            return jsonify({"status": "error", "message": "Already registered for this event"}), 400
+        events_changed(event.id)
+        seats_changed(event)
         
         return jsonify({
             "status": "success", 
             "registration": registration.to_dict(),
             "event": event.to_dict(),
-            "student": student.to_dict()
+            "student": student
         }), 201
     except Exception as e:
         db.session.rollback()
         return jsonify({"status": "error", "message": str(e)}), 500
 
+BATCH_MODES = ("all_or_nothing", "best_effort")
+
+def reserve_seats(event_ids):
+    """Take one seat on each of ``event_ids`` that is active and not full.
+
+    The same conditional UPDATE as the single registration, applied to the
+    whole set in one statement. Free events count as paid straight away;
+    paid ones are counted when the outbox settles them. Returns the
+    reserved events' (id, capacity, seats_taken) rows.
+    """
+    stmt = (
+        db.update(Event)
+        .where(Event.id.in_(event_ids), Event.status == 'active', Event.seats_taken < Event.capacity)
+        .values(seats_taken=Event.seats_taken + 1,
+                paid_count=Event.paid_count + db.case((db.func.coalesce(Event.price, 0) > 0, 0), else_=1))
+        .execution_options(synchronize_session=False)
+    )
+    if db.engine.dialect.update_returning:
+        return db.session.execute(stmt.returning(Event.id, Event.capacity, Event.seats_taken)).all()
+    reserved = [event_id for event_id in event_ids if db.session.execute(stmt.where(Event.id == event_id)).rowcount]
+    return db.session.execute(
+        db.select(Event.id, Event.capacity, Event.seats_taken).where(Event.id.in_(reserved))
+    ).all() if reserved else []
+
+@app.post("/student/register-events")
+@read_your_writes
+@student_session
+@idempotent
+def student_register_events():
+    """Register a student for several events in one transaction.
+
+    ``mode`` is "all_or_nothing" (the default: any failure registers
+    nothing) or "best_effort" (register wherever possible). Every event id
+    gets a result entry.
+    """
+    try:
+        data = request.get_json(force=True) or {}
+    except Exception:
+        return jsonify({"status": "error", "message": "Invalid JSON"}), 400
+
+    student_id, error = acting_student(data.get("student_id"))
+    if error:
+        return error
+    event_ids = data.get("event_ids")
+    mode = data.get("mode", "all_or_nothing")
+    if not student_id or not isinstance(event_ids, list) or not event_ids:
+        return jsonify({"status": "error", "message": "event_ids (a list) and student_id are required"}), 400
+    if not all(isinstance(event_id, int) and not isinstance(event_id, bool) for event_id in event_ids):
+        return jsonify({"status": "error", "message": "event_ids must be integers"}), 400
+    event_ids = list(dict.fromkeys(event_ids))
+    if len(event_ids) > app.config["REGISTRATION_BATCH_MAX"]:
+        return jsonify({"status": "error", "message": f"At most {app.config['REGISTRATION_BATCH_MAX']} events per batch"}), 400
+    if mode not in BATCH_MODES:
+        return jsonify({"status": "error", "message": f"mode must be one of: {', '.join(BATCH_MODES)}"}), 400
+
+    try:
+        student = load_principal(student_id)
+        if not student:
+            return jsonify({"status": "error", "message": "Student not found"}), 404
+
+        # Set-based checks: one IN lookup for the events, one for existing
+        # registrations. Locking the events in id order up front keeps two
+        # overlapping batches from deadlocking in the seat UPDATE.
+        events = {row.id: row for row in db.session.execute(
+            db.select(Event.id, Event.status, Event.price).where(Event.id.in_(event_ids))
+            .order_by(Event.id).with_for_update()
+        )}
+        registered = set(db.session.execute(
+            db.select(Registration.event_id).where(Registration.student_id == student_id, Registration.event_id.in_(event_ids))
+        ).scalars())
+
+        results = {}
+        for event_id in event_ids:
+            event = events.get(event_id)
+            if event is None or event.status != 'active':
+                results[event_id] = {"status": "not_found", "message": "Event not found or inactive"}
+            elif event_id in registered:
+                results[event_id] = {"status": "already_registered", "message": "Already registered for this event"}
+        candidates = [event_id for event_id in event_ids if event_id not in results]
+
+        reserved = {row.id: row for row in reserve_seats(candidates)} if candidates else {}
+        for event_id in candidates:
+            if event_id not in reserved:
+                results[event_id] = {"status": "full", "message": "Event is full"}
+
+        if mode == "all_or_nothing" and len(reserved) < len(event_ids):
+            db.session.rollback()
+            for event_id in reserved:
+                results[event_id] = {"status": "rolled_back", "message": "Not registered because another event failed"}
+            return jsonify({
+                "status": "error",
+                "message": "No registrations were made",
+                "results": [{"event_id": event_id, **results[event_id]} for event_id in event_ids]
+            }), 409
+
+        # One multi-row INSERT for every reserved seat, and one for the outbox
+        # rows of the paid ones. Core rather than ORM bulk insert: the ORM
+        # splits the batch wherever a value is None.
+        now = datetime.utcnow()
+        rows, settlements = [], []
+        for event_id in reserved:
+            price = events[event_id].price or 0
+            rows.append({
+                "id": str(uuid.uuid4()),
+                "event_id": event_id,
+                "student_id": student_id,
+                "amount_paid": price,
+                "payment_status": 'pending' if price > 0 else 'paid',
+                "payment_method": data.get("payment_method", "card"),
+                "transaction_id": None,
+                "special_requirements": data.get("special_requirements", ""),
+                "registered_at": now,
+                "updated_at": now,
+            })
+            if price > 0:
+                settlements.append({"registration_id": rows[-1]["id"], "amount": price, "payment_method": rows[-1]["payment_method"]})
+        try:
+            if rows:
+                db.session.execute(Registration.__table__.insert(), rows)
+            if settlements:
+                db.session.execute(PaymentOutbox.__table__.insert(), settlements)
+            db.session.commit()
+        except IntegrityError:
+            # A concurrent request registered one of these first
+            db.session.rollback()
+            return jsonify({"status": "error", "message": "Registrations changed concurrently, please retry"}), 409
+
+        for row in rows:
+            registration = Registration(**row)
+            results[row["event_id"]] = {"status": "registered", "registration": registration.to_dict()}
+        for event in reserved.values():
+            events_changed(event.id)
+            seats_changed(event)
+
+        return jsonify({
+            "status": "success" if rows else "error",
+            "registered": len(rows),
+            "results": [{"event_id": event_id, **results[event_id]} for event_id in event_ids],
+            "student": student
+        }), 201 if rows else 409
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"status": "error", "message": str(e)}), 500
+
 @app.get("/student/registrations/<student_id>")
+@student_session
+@replica_read
 def student_get_registrations(student_id):
     """Get all registrations for a specific student"""
+    student_id, error = acting_student(student_id)
+    if error:
+        return error
+
     try:
-        registrations = Registration.query.filter_by(student_id=student_id).all()
+        registrations = Registration.query.options(
+            joinedload(Registration.event)
+        ).filter_by(student_id=student_id).all()
         registrations_with_events = []
-        
+
         for reg in registrations:
-            event = Event.query.get(reg.event_id)
+            event = reg.event
             if event:
                 reg_dict = reg.to_dict()
                 reg_dict['event'] = event.to_dict()
@@ -467,80 +1117,271 @@ def student_get_registrations(student_id):
         return jsonify({"status": "error", "message": str(e)}), 500
 
 @app.delete("/student/registrations/<registration_id>")
+@read_your_writes
+@student_session
 def student_cancel_registration(registration_id):
     """Cancel a registration"""
     try:
         registration = Registration.query.get_or_404(registration_id)
+        _, error = acting_student(registration.student_id)
+        if error:
+            return jsonify({"status": "error", "message": "Not your registration"}), 403
         
-        # Check if event is within 24 hours (no cancellation)
+        # Check if event is within 24 hours (no cancellation). A registration
+        # whose payment failed holds no seat, so it can always be removed.
         event = Event.query.get(registration.event_id)
-        if event:
+        holds_seat = registration.payment_status != 'failed'
+        if event and holds_seat:
             event_datetime = datetime.combine(event.date, event.time)
             if event_datetime - datetime.now() < timedelta(hours=24):
                 return jsonify({"status": "error", "message": "Cannot cancel within 24 hours of event"}), 400
 
+        if holds_seat:
+            stats = {"seats_taken": Event.seats_taken - 1}
+            if registration.payment_status == 'paid':
+                stats["paid_count"] = Event.paid_count - 1
+                stats["revenue"] = Event.revenue - registration.amount_paid
+            db.session.execute(
+                db.update(Event)
+                .where(Event.id == registration.event_id, Event.seats_taken > 0)
+                .values(**stats)
+                .execution_options(synchronize_session=False)
+            )
+        # An unsettled payment is dropped with it; one already being charged
+        # is refunded by the outbox worker
+        db.session.execute(db.delete(PaymentOutbox).where(PaymentOutbox.registration_id == registration.id))
         db.session.delete(registration)
+        # The freed seat goes to the head of the waitlist in the same transaction
+        promoted = waitlist.promote(registration.event_id)
+        db.session.commit()
+        events_changed(registration.event_id)
+        if event:
+            seats_changed(event)
+        return jsonify({
+            "status": "success",
+            "message": "Registration cancelled",
+            "promoted": [reg.student_id for reg in promoted]
+        }), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+@app.post("/student/waitlist")
+@student_session
+def student_join_waitlist():
+    """Join the waitlist of a full event"""
+    try:
+        data = request.get_json(force=True) or {}
+    except Exception:
+        return jsonify({"status": "error", "message": "Invalid JSON"}), 400
+
+    event_id = data.get("event_id")
+    student_id, error = acting_student(data.get("student_id"))
+    if error:
+        return error
+    if not event_id or not student_id:
+        return jsonify({"status": "error", "message": "event_id and student_id are required"}), 400
+
+    try:
+        try:
+            entry, error = waitlist.join(event_id, student_id)
+            db.session.commit()
+        except IntegrityError:
+            # A concurrent request added the same student first
+            db.session.rollback()
+            entry, error = WaitlistEntry.query.filter_by(event_id=event_id, student_id=student_id).first(), None
+        if error:
+            message, status = error
+            return jsonify({"status": "error", "message": message}), status
+
+        entry_dict = entry.to_dict()
+        entry_dict['position'] = waitlist.position(entry)
+        return jsonify({"status": "success", "entry": entry_dict}), 201
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+@app.get("/student/waitlist/<student_id>")
+@student_session
+def student_get_waitlist(student_id):
+    """Get a student's waitlist entries with their current positions"""
+    student_id, error = acting_student(student_id)
+    if error:
+        return error
+
+    try:
+        entries = []
+        for entry, position in waitlist.entries_for(student_id):
+            entry_dict = entry.to_dict()
+            entry_dict['position'] = position
+            entry_dict['event'] = entry.event.to_dict()
+            entries.append(entry_dict)
+        return jsonify(entries), 200
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+@app.delete("/student/waitlist/<int:event_id>/<student_id>")
+@student_session
+def student_leave_waitlist(event_id, student_id):
+    """Leave an event's waitlist"""
+    student_id, error = acting_student(student_id)
+    if error:
+        return error
+
+    try:
+        removed = db.session.execute(
+            db.delete(WaitlistEntry).where(WaitlistEntry.event_id == event_id, WaitlistEntry.student_id == student_id)
+        ).rowcount
         db.session.commit()
-        return jsonify({"status": "success", "message": "Registration cancelled"}), 200
+        if not removed:
+            return jsonify({"status": "error", "message": "Not on the waitlist for this event"}), 404
+        return jsonify({"status": "success", "message": "Left the waitlist"}), 200
     except Exception as e:
         db.session.rollback()
         return jsonify({"status": "error", "message": str(e)}), 500
 
 # Public API Endpoints
 @app.get("/events")
+@replica_read
 def get_events():
     """Get all active events (public)"""
+    args, error = parse_list_args([Event.date, Event.id])
+    if error:
+        return error
+
+    def build():
+        sort_columns = [Event.date, Event.id]
+        stmt = filter_events(db.select(Event).filter_by(status='active'), args, allow_status=False)
+        stmt, encode, key = schema_select(serializers.PUBLIC_EVENT, stmt, args, sort_columns)
+        rows, next_cursor = paginate(stmt, args, sort_columns, key)
+        return [encode(row) for row in rows], {"X-Next-Cursor": next_cursor} if next_cursor else {}
+
     try:
-        active_events = Event.query.filter_by(status='active').all()
-        events_with_prices = []
-        
-        for event in active_events:
-            event_dict = event.to_dict()
-            event_dict['price_formatted'] = f"₹{event.price:.2f}" if event.price > 0 else "Free"
-            events_with_prices.append(event_dict)
-        
-        return jsonify(events_with_prices), 200
+        cache_control = f"public, max-age={app.config['CATALOG_MAX_AGE']}"
+        return catalog_response(("events", request.query_string.decode()), build, cache_control)
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
+search_backends = {}
+
+def search_backend():
+    """The search index this database has, detected once per engine"""
+    engine = db.engine
+    if engine not in search_backends:
+        with engine.connect() as connection:
+            search_backends[engine] = search.detect_backend(connection)
+    return search_backends[engine]
+
+@app.get("/events/search")
+@replica_read
+def search_events():
+    """Ranked full-text search over active events with facet counts"""
+    args, message = search.parse_search_params(request.args, app.config["MAX_PAGE_SIZE"])
+    if message:
+        return jsonify({"status": "error", "message": message}), 400
+    fields = {field.strip() for field in request.args.get("fields", "").split(",") if field.strip()} or None
+    # Date buckets and facets move at midnight, so the day is part of the cache key
+    today = date.today()
+
+    def build():
+        columns, encode = serializers.PUBLIC_EVENT.plan(fields)
+        rows, facets, total = search.search(db.session, args, columns, search_backend(), today)
+        results = []
+        for row in rows:
+            item = encode(row)
+            item["rank"] = round(float(row[-1]), 6)
+            results.append(item)
+        next_offset = args["offset"] + len(results)
+        return {
+            "query": args["q"],
+            "results": results,
+            "total": total,
+            "facets": facets,
+            "next_offset": next_offset if next_offset < total and results else None,
+        }, {}
+
+    try:
+        cache_control = f"public, max-age={app.config['CATALOG_MAX_AGE']}"
+        return catalog_response(("search", today.isoformat(), request.query_string.decode()), build, cache_control)
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+@app.get("/events/stream")
+def events_stream():
+    """Live seat availability as server-sent events, or a JSON long-poll.
+
+    Both hold a request thread, so both end within STREAM_SYNC_MAX_WAIT;
+    asgi.py serves the same route without that limit.
+    """
+    since = request.args.get("since") or request.headers.get("Last-Event-ID")
+    try:
+        since = int(since) if since else None
+    except ValueError:
+        return jsonify({"status": "error", "message": "since must be an integer version"}), 400
+
+    if request.accept_mimetypes.best == "text/event-stream":
+        if since is None:
+            since = seat_updates.version
+        return Response(
+            seat_updates.sse_stream(
+                since, app.config["STREAM_KEEPALIVE"], app.config["STREAM_SYNC_MAX_WAIT"], app.config["STREAM_RETRY_MS"]
+            ),
+            mimetype="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    # Long-poll: without ?since= answer with the current version straight away
+    if since is None:
+        return jsonify({"version": seat_updates.version, "changes": [], "reset": False}), 200
+    max_wait = min(app.config["STREAM_MAX_WAIT"], app.config["STREAM_SYNC_MAX_WAIT"])
+    wait = request.args.get("wait", max_wait, type=float)
+    latest, changes = seat_updates.wait(since, max(0.0, min(wait, max_wait)))
+    return jsonify({"version": latest, "changes": changes or [], "reset": changes is None}), 200
+
 @app.get("/events/<int:event_id>")
+@replica_read
 def get_event(event_id):
     """Get specific event details"""
-    try:
-        event = Event.query.get_or_404(event_id)
-        registration_count = Registration.query.filter_by(event_id=event_id).count()
-        available_spots = event.capacity - registration_count
+    def build():
+        event = db.session.get(Event, event_id)
+        if not event:
+            return None
+        available_spots = event.capacity - event.seats_taken
         
         event_dict = event.to_dict()
         event_dict['available_spots'] = max(0, available_spots)
         event_dict['is_full'] = available_spots <= 0
         event_dict['price_formatted'] = f"₹{event.price:.2f}" if event.price > 0 else "Free"
         
-        return jsonify(event_dict), 200
+        return event_dict, {}
+
+    try:
+        # Seat availability changes often, so clients always revalidate
+        response = catalog_response("event", build, "no-cache", scope=event_id)
+        if response is None:
+            return jsonify({"status": "error", "message": "Event not found"}), 404
+        return response
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
 @app.get("/categories")
+@replica_read
 def get_categories():
     """Get all event categories"""
-    try:
+    def build():
         categories = db.session.query(Event.category).distinct().all()
-        return jsonify([cat[0] for cat in categories]), 200
+        return [cat[0] for cat in categories], {}
+
+    try:
+        cache_control = f"public, max-age={app.config['CATALOG_MAX_AGE']}"
+        return catalog_response("categories", build, cache_control)
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
 @app.get("/branches")
 def get_branches():
     """Get all available branches"""
-    branches = [
-        "Computer Science",
-        "Computer Science and Business Systems",
-        "Electronics and Communication Engineering",
-        "Artificial Intelligence and Data Science",
-        "Mechanical Engineering",
-        "Civil Engineering"
-    ]
-    return jsonify(branches), 200
+    return jsonify(VALID_BRANCHES), 200
 
 @app.get("/semesters")
 def get_semesters():
@@ -551,14 +1392,19 @@ def get_semesters():
 @app.get("/students")
 def get_students():
     """Get all students (for demo purposes)"""
+    args, error = parse_list_args([Student.id])
+    if error:
+        return error
+
     try:
-        students = Student.query.all()
-        return jsonify([student.to_dict() for student in students]), 200
+        stmt, encode, key = schema_select(serializers.STUDENT, filter_students(db.select(Student)), args, [Student.id])
+        return list_response(stmt, args, [Student.id], key, encode)
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
 # Payment simulation endpoint
 @app.post("/payment/process")
+@idempotent
 def process_payment():
     """Simulate payment processing"""
     try:
@@ -571,8 +1417,15 @@ def process_payment():
     
     # Simulate payment processing
     if amount > 0:
-        # In a real app, this would integrate with payment gateways
-        transaction_id = f"TXN_{uuid.uuid4().hex[:8].upper()}"
+        # Registrations settle through the outbox; this charges directly
+        try:
+            transaction_id = payment_gateway.charge(
+                request.headers.get(idempotency.HEADER) or str(uuid.uuid4()), amount, payment_method
+            )
+        except payments.PaymentDeclined as e:
+            return jsonify({"status": "error", "message": str(e)}), 402
+        except payments.GatewayError as e:
+            return jsonify({"status": "error", "message": str(e)}), 503
         return jsonify({
             "status": "success",
             "transaction_id": transaction_id,
@@ -592,4 +1445,9 @@ def process_payment():
 if __name__ == "__main__":
     with app.app_context():
         db.create_all()
+        run_migrations()
+    # Under the debug reloader only the serving child runs the workers
+    if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        payment_workers.start()
+        seat_watcher.start()
     app.run(host="0.0.0.0", port=5000, debug=True)
@@ -0,0 +1,391 @@
+"""Optional ASGI entry point: ``hypercorn asgi:app`` (see requirements-async.txt).
+
+The hot public and registration routes and the /events/stream seat feed are
+served by async Quart handlers on an async SQLAlchemy engine (asyncpg for
+Postgres, aiosqlite for SQLite), so one process can hold many concurrent
+connections while they wait on the database or for seat updates. Every other route falls through to the unchanged sync Flask app.
+Both share models.py, listing.py, the catalog cache and ``app.config``; the
+sync server (`python app.py`) is still available.
+"""
+import asyncio
+from asgiref.wsgi import WsgiToAsgi
+from quart import Quart, Response, jsonify, request
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from werkzeug.exceptions import HTTPException
+import admission
+import catalog
+import compression
+import app as sync
+import idempotency
+import listing
+import outbox
+import pool
+import replicas
+import serializers
+import sessions
+from models import Event, Student, Registration
+
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+def async_database_url(url):
+    """Swap the sync driver in a database URL for its async counterpart"""
+    scheme, _, rest = url.partition("://")
+    return f"{ASYNC_DRIVERS.get(scheme, scheme)}://{rest}"
+
+config = sync.app.config
+
+engine = create_async_engine(
+    async_database_url(config["SQLALCHEMY_DATABASE_URI"]),
+    **pool.async_engine_options(config["SQLALCHEMY_DATABASE_URI"], config["SQLALCHEMY_ENGINE_OPTIONS"])
+)
+Session = async_sessionmaker(engine, expire_on_commit=False)
+
+quart_app = Quart(__name__)
+
+@quart_app.after_request
+async def add_cors_headers(response):
+    # Same open policy as flask-cors in the sync app
+    response.headers["Access-Control-Allow-Origin"] = "*"
+    response.headers["Access-Control-Expose-Headers"] = (
+        f"X-Next-Cursor, {replicas.PRIMARY_UNTIL_HEADER}, {idempotency.REPLAYED_HEADER}"
+    )
+    response.headers["Access-Control-Allow-Headers"] = request.headers.get("Access-Control-Request-Headers", "*")
+    response.headers["Access-Control-Allow-Methods"] = "GET, POST, OPTIONS"
+    if request.method not in replicas.SAFE_METHODS and response.status_code < 400 and config["DATABASE_REPLICA_URLS"]:
+        # The only async write is a student's registration (see replicas.read_your_writes):
+        # async routes always use the primary, but the student's next sync reads may not
+        response.headers[replicas.PRIMARY_UNTIL_HEADER] = replicas.primary_token(config["REPLICA_STICKY_SECONDS"])
+    return response
+
+@quart_app.before_serving
+async def start_seat_watcher():
+    # Seat changes from other processes (see app.seat_watcher)
+    sync.seat_watcher.start()
+
+@quart_app.after_request
+async def compress_response(response):
+    # Same negotiation as compression.init_compression() in the sync app
+    if not config["COMPRESS_ENABLED"]:
+        return response
+    encoding = compression.negotiate(response, request.accept_encodings)
+    if encoding is None:
+        return response
+    data = await response.get_data()
+    if len(data) < config["COMPRESS_MIN_SIZE"]:
+        return response
+    response.set_data(compression.encode(data, encoding, sync.app.config))
+    compression.finish(response, encoding)
+    return response
+
+async def catalog_response(key, build, cache_control, scope=None):
+    """Async twin of app.catalog_response, sharing its cache and ETags"""
+    versions = None
+    if config["CATALOG_CACHE_SHARED"]:
+        async with Session() as session:
+            versions = catalog.versions(await session.execute(catalog.versions_statement(scope)), scope)
+    versioned_key = sync.catalog_cache.key((key, versions), scope)
+    entry = sync.catalog_cache.get(versioned_key)
+    if entry is None:
+        built = await build()
+        if built is None:
+            return None
+        entry = sync.catalog_entry(*built)
+        sync.catalog_cache.set(versioned_key, entry)
+
+    mimetype, body, etag, encoded = sync.catalog_representation(entry, request)
+    headers = entry[0]
+    # Weak comparison: compressed responses carry W/"<etag>"
+    if request.if_none_match.contains_weak(etag):
+        response = Response(b"", status=304, headers=headers)
+    else:
+        response = Response(body, mimetype=mimetype, headers=headers)
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = cache_control
+    if serializers.msgpack is not None:
+        response.vary.add("Accept")
+    compression.encode_cached(response, body, encoded, request.accept_encodings, sync.app.config)
+    return response
+
+def list_args(cursor_columns):
+    return listing.parse_list_params(request.args, cursor_columns, config["MAX_PAGE_SIZE"])
+
+async def event_page(schema, args):
+    """One keyset page of active events as tuple rows, with their encoder and next cursor"""
+    sort_columns = [Event.date, Event.id]
+    columns, encode = schema.plan(args["fields"])
+    stmt = listing.filter_events(select(Event).filter_by(status='active'), request.args, args, allow_status=False)
+    stmt = stmt.with_only_columns(*columns, *sort_columns, maintain_column_froms=True)
+    stmt = listing.page_statement(stmt, args, sort_columns)
+    async with Session() as session:
+        rows = (await session.execute(stmt)).all()
+    rows, next_cursor = listing.split_page(rows, args, lambda row: tuple(row[len(columns):]))
+    return rows, encode, next_cursor
+
+async def run_blocking(func, *args):
+    """Run a sync call that may block (Redis, locked caches) off the event loop"""
+    return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+def price_formatted(event):
+    return f"₹{event.price:.2f}" if event.price > 0 else "Free"
+
+@quart_app.get("/health")
+async def health():
+    return jsonify({"status": "ok", "mode": "asgi"}), 200
+
+@quart_app.get("/events")
+async def get_events():
+    """Get all active events (public)"""
+    args, message = list_args([Event.date, Event.id])
+    if message:
+        return jsonify({"status": "error", "message": message}), 400
+
+    async def build():
+        rows, encode, next_cursor = await event_page(serializers.PUBLIC_EVENT, args)
+        return [encode(row) for row in rows], {"X-Next-Cursor": next_cursor} if next_cursor else {}
+
+    try:
+        cache_control = f"public, max-age={config['CATALOG_MAX_AGE']}"
+        return await catalog_response(("events", request.query_string.decode()), build, cache_control)
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+@quart_app.get("/events/stream")
+async def events_stream():
+    """Live seat availability; waiting clients cost no thread here"""
+    seat_updates = sync.seat_updates
+    since = request.args.get("since") or request.headers.get("Last-Event-ID")
+    try:
+        since = int(since) if since else None
+    except ValueError:
+        return jsonify({"status": "error", "message": "since must be an integer version"}), 400
+
+    if request.accept_mimetypes.best == "text/event-stream":
+        if since is None:
+            since = seat_updates.version
+        response = Response(
+            seat_updates.sse_stream_async(since, config["STREAM_KEEPALIVE"]),
+            mimetype="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+        response.timeout = None  # keep the stream open past Quart's response timeout
+        return response
+
+    if since is None:
+        return jsonify({"version": seat_updates.version, "changes": [], "reset": False}), 200
+    wait = request.args.get("wait", config["STREAM_MAX_WAIT"], type=float)
+    latest, changes = await seat_updates.wait_async(since, max(0.0, min(wait, config["STREAM_MAX_WAIT"])))
+    return jsonify({"version": latest, "changes": changes or [], "reset": changes is None}), 200
+
+@quart_app.get("/events/<int:event_id>")
+async def get_event(event_id):
+    """Get specific event details"""
+    async def build():
+        async with Session() as session:
+            event = await session.get(Event, event_id)
+        if not event:
+            return None
+        available_spots = event.capacity - event.seats_taken
+        event_dict = event.to_dict()
+        event_dict['available_spots'] = max(0, available_spots)
+        event_dict['is_full'] = available_spots <= 0
+        event_dict['price_formatted'] = price_formatted(event)
+        return event_dict, {}
+
+    try:
+        response = await catalog_response("event", build, "no-cache", scope=event_id)
+        if response is None:
+            return jsonify({"status": "error", "message": "Event not found"}), 404
+        return response
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+@quart_app.get("/categories")
+async def get_categories():
+    """Get all event categories"""
+    async def build():
+        async with Session() as session:
+            categories = (await session.execute(select(Event.category).distinct())).scalars().all()
+        return list(categories), {}
+
+    try:
+        cache_control = f"public, max-age={config['CATALOG_MAX_AGE']}"
+        return await catalog_response("categories", build, cache_control)
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+@quart_app.get("/student/events")
+async def student_get_events():
+    """Get all active events for students"""
+    args, message = list_args([Event.date, Event.id])
+    if message:
+        return jsonify({"status": "error", "message": message}), 400
+
+    try:
+        rows, encode, next_cursor = await event_page(serializers.STUDENT_EVENT, args)
+        response = jsonify([encode(row) for row in rows])
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+        return response, 200
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+@quart_app.post("/student/register-event")
+async def student_register_event():
+    """Register a student for an event (same rules as the sync route)"""
+    try:
+        data = await request.get_json(force=True) or {}
+    except Exception:
+        return jsonify({"status": "error", "message": "Invalid JSON"}), 400
+
+    # Session token handling as in app.student_session/acting_student
+    session_id, message = await run_blocking(
+        sessions.authenticate, request.headers.get("Authorization"), config["SECRET_KEY"], sync.principal_cache.get
+    )
+    if message:
+        return jsonify({"status": "error", "message": message}), 401
+    if session_id is None and config["SESSION_REQUIRED"]:
+        return jsonify({"status": "error", "message": "Login required"}), 401
+
+    event_id = data.get("event_id")
+    student_id = data.get("student_id")
+    if session_id is not None:
+        if student_id and str(student_id) != session_id:
+            return jsonify({"status": "error", "message": "student_id does not match the session"}), 403
+        student_id = session_id
+
+    if not event_id or not student_id:
+        return jsonify({"status": "error", "message": "event_id and student_id are required"}), 400
+    try:
+        event_id = int(event_id)
+    except (TypeError, ValueError):
+        return jsonify({"status": "error", "message": "event_id must be an integer"}), 400
+
+    # Same admission gate as the sync route (see app.admission_controlled)
+    if not config["ADMISSION_ENABLED"]:
+        return await _register_event(data, event_id, student_id)
+
+    async def load_free_seats():
+        async with Session() as session:
+            return (await session.execute(
+                select(Event.capacity - Event.seats_taken).where(Event.id == event_id, Event.status == 'active')
+            )).scalar()
+
+    decision = await sync.registration_gate.enter_async(event_id, str(student_id), load_free_seats)
+    if not decision.admitted:
+        async with Session() as session:
+            existing = (await session.execute(
+                select(Registration.id).filter_by(event_id=event_id, student_id=str(student_id))
+            )).first()
+        if existing:
+            return await _register_event(data, event_id, student_id)
+        body, status, headers = admission.rejection(decision)
+        return jsonify(body), status, headers
+    try:
+        return await _register_event(data, event_id, student_id)
+    finally:
+        if decision.tracked:
+            sync.registration_gate.release(event_id)
+
+async def _register_event(data, event_id, student_id):
+    async with Session() as session:
+        try:
+            student = await run_blocking(sync.principal_cache.get, student_id)
+            if student is None:
+                row = await session.get(Student, student_id)
+                if not row:
+                    return jsonify({"status": "error", "message": "Student not found"}), 404
+                student = row.to_dict()
+                await run_blocking(sync.principal_cache.set, row.id, student)
+
+            # Reserve a seat atomically, as in app.student_register_event
+            reserved = (await session.execute(
+                update(Event)
+                .where(Event.id == event_id, Event.status == 'active', Event.seats_taken < Event.capacity)
+                .values(seats_taken=Event.seats_taken + 1)
+                .execution_options(synchronize_session=False)
+            )).rowcount
+            if not reserved:
+                await session.rollback()
+                event = (await session.execute(select(Event).filter_by(id=event_id, status='active'))).scalar()
+                if not event:
+                    return jsonify({"status": "error", "message": "Event not found or inactive"}), 404
+                existing = (await session.execute(
+                    select(Registration.id).filter_by(event_id=event_id, student_id=student_id)
+                )).first()
+                if existing:
+                    return jsonify({"status": "error", "message": "Already registered for this event"}), 400
+                return jsonify({"status": "error", "message": "Event is full"}), 400
+
+            event = await session.get(Event, event_id)
+            registration = Registration(
+                event_id=event_id,
+                student_id=student_id,
+                amount_paid=event.price,
+                payment_status='pending' if event.price > 0 else 'paid',
+                payment_method=data.get("payment_method", "card"),
+                special_requirements=data.get("special_requirements", "")
+            )
+            session.add(registration)
+            # Paid events settle through the outbox once this commits
+            if registration.payment_status == 'pending':
+                session.add(outbox.settlement(registration))
+
+            try:
+                if registration.payment_status == 'paid':
+                    await session.execute(
+                        update(Event)
+                        .where(Event.id == event.id)
+                        .values(paid_count=Event.paid_count + 1, revenue=Event.revenue + registration.amount_paid)
+                        .execution_options(synchronize_session=False)
+                    )
+                if config["CATALOG_CACHE_SHARED"]:
+                    await session.execute(catalog.bump_statement(engine.dialect, event.id))
+                await session.commit()
+            except IntegrityError:
+                await session.rollback()
+                return jsonify({"status": "error", "message": "Already registered for this event"}), 400
+            await run_blocking(announce, event)
+
+            return jsonify({
+                "status": "success",
+                "registration": registration.to_dict(),
+                "event": event.to_dict(),
+                "student": student
+            }), 201
+        except Exception as e:
+            await session.rollback()
+            return jsonify({"status": "error", "message": str(e)}), 500
+
+def announce(event):
+    sync.events_changed(event.id, shared=False)
+    sync.seats_changed(event)
+
+flask_app = WsgiToAsgi(sync.app)
+_async_routes = quart_app.url_map.bind("localhost")
+
+def _has_idempotency_key(scope):
+    name = idempotency.HEADER.lower().encode()
+    return any(header == name for header, _ in scope["headers"])
+
+async def app(scope, receive, send):
+    """Dispatch to the async handlers when a route matches, else to Flask.
+
+    Requests carrying an Idempotency-Key always go to Flask, whose routes
+    implement the key handling.
+    """
+    if scope["type"] == "http":
+        try:
+            _async_routes.match(scope["path"], scope["method"])
+        except HTTPException:
+            await flask_app(scope, receive, send)
+            return
+        if _has_idempotency_key(scope):
+            await flask_app(scope, receive, send)
+            return
+    await quart_app(scope, receive, send)
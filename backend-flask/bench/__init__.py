@@ -0,0 +1,10 @@
+"""Benchmarks for the Flask backend. Run modules from backend-flask/:
+
+- ``python -m bench.seed`` seeds a database at a given scale
+- ``python -m bench.run`` benchmarks every route and prints a JSON report
+- ``python -m bench.login_storm`` measures bcrypt login load
+- ``python -m bench.serialization`` compares to_dict() against the schema serializers
+- ``python -m bench.waiting_room`` simulates a registration burst with and without admission control
+- ``python -m bench.payload`` compares response sizes across shapes, formats and compression
+- ``python -m bench.payments`` measures payment outbox worker throughput
+"""
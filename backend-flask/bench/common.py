@@ -0,0 +1,81 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of ``samples`` (None when empty)"""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+def summarize(latencies, elapsed):
+    """Throughput and latency percentiles (ms) for a list of request durations"""
+    return {
+        "requests": len(latencies),
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else None,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2) if latencies else None,
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2) if latencies else None,
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2) if latencies else None,
+    }
+
+def use_database(url=None):
+    """Point the app at ``url`` (or a throwaway SQLite file) before it is imported"""
+    os.environ["DATABASE_URL"] = url or "sqlite:///" + os.path.join(tempfile.mkdtemp(), "bench.db")
+    # Keep benchmark output free of per-request slow logs
+    os.environ.setdefault("SLOW_REQUEST_MS", "0")
+    return os.environ["DATABASE_URL"]
+
+def serve(app, port):
+    """Serve ``app`` with a quiet threaded WSGI server in a daemon thread"""
+    from werkzeug.serving import WSGIRequestHandler, make_server
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_request(self, *args, **kwargs):
+            pass
+
+    server = make_server("127.0.0.1", port, app, threaded=True, request_handler=QuietHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+class AsgiServer:
+    """Hypercorn serving asgi:app in a subprocess, stopped with ``shutdown()``"""
+
+    def __init__(self, port, workers=1):
+        backend = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "hypercorn", "asgi:app", "--bind", f"127.0.0.1:{port}", "--workers", str(workers)],
+            cwd=backend, env=os.environ.copy(), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                urllib.request.urlopen(f"http://127.0.0.1:{port}/health").read()
+                return
+            except OSError:
+                if self.process.poll() is not None or time.monotonic() > deadline:
+                    self.shutdown()
+                    raise RuntimeError("hypercorn did not start; is requirements-async.txt installed?")
+                time.sleep(0.1)
+
+    def shutdown(self):
+        self.process.terminate()
+        self.process.wait()
+
+def http_request(url, payload=None, method=None):
+    """Send a JSON request and return its duration in seconds"""
+    data = json.dumps(payload).encode("utf-8") if payload is not None else None
+    req = urllib.request.Request(url, data=data, method=method, headers={"Content-Type": "application/json"})
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req) as response:
+            response.read()
+    except urllib.error.HTTPError as e:
+        e.read()
+    return time.perf_counter() - start
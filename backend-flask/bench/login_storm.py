@@ -0,0 +1,73 @@
+"""Login storm benchmark.
+
+Serves the app with a threaded WSGI server on a throwaway SQLite database,
+hammers /student/login from many clients and meanwhile measures latency of a
+cheap endpoint. Compare PASSWORD_HASH_WORKERS=0 (inline bcrypt) against the
+hashing thread pool:
+
+    PASSWORD_HASH_WORKERS=0 python -m bench.login_storm
+    PASSWORD_HASH_WORKERS=2 python -m bench.login_storm
+"""
+import argparse
+import json
+import threading
+import time
+from bench.common import http_request, percentile, serve, use_database
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds to run the storm")
+    parser.add_argument("--login-clients", type=int, default=32)
+    parser.add_argument("--probe-clients", type=int, default=4)
+    parser.add_argument("--probe-path", default="/branches", help="cheap endpoint to measure")
+    parser.add_argument("--port", type=int, default=5055)
+    args = parser.parse_args()
+
+    use_database()
+    from app import app
+    from models import db, Student
+
+    with app.app_context():
+        db.create_all()
+        student = Student(id="BENCH001", usn="BENCH001", name="Bench", email="bench@example.com",
+                          semester=1, branch="Computer Science", password_hash="")
+        student.set_password("password123")
+        db.session.add(student)
+        db.session.commit()
+
+    server = serve(app, args.port)
+    base = f"http://127.0.0.1:{args.port}"
+
+    logins, probes = [], []
+    deadline = time.perf_counter() + args.duration
+
+    def login_client():
+        while time.perf_counter() < deadline:
+            logins.append(http_request(f"{base}/student/login", {"usn": "BENCH001", "password": "password123"}))
+
+    def probe_client():
+        while time.perf_counter() < deadline:
+            probes.append(http_request(f"{base}{args.probe_path}"))
+
+    threads = [threading.Thread(target=login_client) for _ in range(args.login_clients)]
+    threads += [threading.Thread(target=probe_client) for _ in range(args.probe_clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    server.shutdown()
+
+    print(json.dumps({
+        "password_hash_workers": app.config["PASSWORD_HASH_WORKERS"],
+        "bcrypt_rounds": app.config["BCRYPT_ROUNDS"],
+        "duration_s": args.duration,
+        "login_throughput_rps": round(len(logins) / args.duration, 2),
+        "login_p99_ms": round(percentile(logins, 99) * 1000, 2) if logins else None,
+        "probe_path": args.probe_path,
+        "probe_requests": len(probes),
+        "probe_p50_ms": round(percentile(probes, 50) * 1000, 2) if probes else None,
+        "probe_p99_ms": round(percentile(probes, 99) * 1000, 2) if probes else None,
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
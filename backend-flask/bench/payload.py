@@ -0,0 +1,87 @@
+"""Response size benchmark for compression, MessagePack and the normalized shape.
+
+Seeds a synthetic dataset and fetches /admin/registrations (one page of
+``--limit`` rows) and /admin/events/<id>/details for the busiest event in
+every combination of shape (nested, normalized), format (JSON,
+MessagePack) and Content-Encoding (identity, gzip, br). Reports the bytes
+on the wire, the saving against nested JSON without compression and the
+median server time of ``--repeat`` requests:
+
+    python -m bench.payload --scale 100k --limit 500
+"""
+import argparse
+import json
+import statistics
+import time
+from bench.common import use_database
+
+SHAPES = ("nested", "normalized")
+FORMATS = ("json", "msgpack")
+ENCODINGS = ("identity", "gzip", "br")
+
+def measure(client, path, shape, fmt, encoding, repeat):
+    """(bytes, median ms) of ``path`` fetched as the given representation"""
+    separator = "&" if "?" in path else "?"
+    url = f"{path}{separator}shape={shape}"
+    headers = {
+        "Accept": "application/msgpack" if fmt == "msgpack" else "application/json",
+        "Accept-Encoding": encoding,
+    }
+    timings, size = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        response = client.get(url, headers=headers)
+        body = response.get_data()
+        timings.append(time.perf_counter() - start)
+        if response.status_code != 200:
+            raise RuntimeError(f"{url} returned {response.status_code}")
+        served = response.headers.get("Content-Encoding", "identity")
+        if served != encoding or (fmt == "msgpack") != (response.mimetype == "application/msgpack"):
+            raise RuntimeError(f"{url} served {response.mimetype}/{served}; is requirements.txt installed?")
+        size = len(body)
+    return size, round(statistics.median(timings) * 1000, 2)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", default="1k", help="bench.seed scale")
+    parser.add_argument("--limit", type=int, default=500, help="registrations per page")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--database-url", help="defaults to a throwaway SQLite file")
+    args = parser.parse_args()
+
+    use_database(args.database_url)
+    from app import app
+    from bench.seed import seed
+    from models import db, Event
+
+    with app.app_context():
+        seed(args.scale)
+        busiest = db.session.execute(db.select(Event.id).order_by(Event.seats_taken.desc()).limit(1)).scalar()
+
+    client = app.test_client()
+    routes = {
+        "/admin/registrations": f"/admin/registrations?limit={args.limit}",
+        "/admin/events/<id>/details": f"/admin/events/{busiest}/details",
+    }
+    report = {}
+    for route, path in routes.items():
+        rows = []
+        baseline = None
+        for shape in SHAPES:
+            for fmt in FORMATS:
+                for encoding in ENCODINGS:
+                    size, ms = measure(client, path, shape, fmt, encoding, args.repeat)
+                    baseline = baseline or size
+                    rows.append({
+                        "shape": shape,
+                        "format": fmt,
+                        "encoding": encoding,
+                        "bytes": size,
+                        "saved_pct": round(100 * (1 - size / baseline), 1),
+                        "server_ms": ms,
+                    })
+        report[route] = rows
+    print(json.dumps({"scale": args.scale, "limit": args.limit, "routes": report}, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""Payment outbox worker throughput benchmark.
+
+Seeds ``--payments`` pending registrations with their outbox rows on a
+throwaway SQLite database, then drains them with PaymentWorkers against the
+in-process FakeGateway for every combination of ``--threads`` and
+``--batch-sizes``. Reports settled payments per second and database
+statements per payment for each run. Also times POST /student/register-event
+for a paid event, which no longer waits on the gateway:
+
+    python -m bench.payments --payments 2000 --latency 0.05 --threads 1,4,16 --batch-sizes 1,20,100
+"""
+import argparse
+import json
+import time
+import uuid
+from datetime import date, time as time_of_day, timedelta
+from bench.common import percentile, use_database
+
+def seed(payments):
+    """Reset the tables and queue ``payments`` pending settlements; returns a paid event id"""
+    from sqlalchemy import insert
+    from models import db, Event, PaymentOutbox, Registration, Student
+
+    db.create_all()
+    for model in (PaymentOutbox, Registration, Student, Event):
+        db.session.execute(db.delete(model))
+    event = Event(title="Bench Paid Event", description="Paid event", date=date.today() + timedelta(days=30),
+                  time=time_of_day(10, 0), location="Main Hall", category="Technology",
+                  capacity=payments * 2, price=250, status="active", seats_taken=payments)
+    db.session.add(event)
+    db.session.flush()
+    db.session.execute(insert(Student), [{
+        "id": f"P{i:06d}", "usn": f"P{i:06d}", "name": f"Bench Student {i}", "email": f"p{i}@example.com",
+        "semester": 1, "branch": "Computer Science", "password_hash": "",
+    } for i in range(payments * 2)])
+    registrations = [{
+        "id": str(uuid.uuid4()), "event_id": event.id, "student_id": f"P{i:06d}", "amount_paid": 250,
+        "payment_status": "pending", "payment_method": "card",
+    } for i in range(payments)]
+    db.session.execute(insert(Registration), registrations)
+    db.session.execute(insert(PaymentOutbox), [
+        {"registration_id": row["id"], "amount": 250, "payment_method": "card"} for row in registrations
+    ])
+    db.session.commit()
+    return event.id
+
+def drain(app, payments, threads, batch_size, latency):
+    """Run a worker pool until every seeded payment is settled; returns the run's report"""
+    from sqlalchemy import event as sa_event
+    from models import db, Event, Registration
+    import outbox
+    from payments import FakeGateway
+
+    statements = [0]
+
+    def count_statement(*args):
+        statements[0] += 1
+
+    workers = outbox.PaymentWorkers(app, FakeGateway(latency=latency), threads=threads,
+                                    batch_size=batch_size, poll_interval=0.01)
+    with app.app_context():
+        engine = db.engine
+    sa_event.listen(engine, "before_cursor_execute", count_statement)
+    start = time.perf_counter()
+    workers.start()
+    while workers.stats["settled"] + workers.stats["failed"] < payments:
+        time.sleep(0.01)
+    elapsed = time.perf_counter() - start
+    workers.stop()
+    sa_event.remove(engine, "before_cursor_execute", count_statement)
+
+    with app.app_context():
+        paid = Registration.query.filter_by(payment_status="paid").count()
+        paid_count = db.session.query(db.func.sum(Event.paid_count)).scalar()
+    return {
+        "threads": threads,
+        "batch_size": batch_size,
+        "elapsed_s": round(elapsed, 2),
+        "payments_per_s": round(payments / elapsed, 1),
+        "batches": workers.stats["batches"],
+        "db_statements_per_payment": round(statements[0] / payments, 2),
+        "paid": paid,
+        "paid_count": paid_count,
+    }
+
+def register_latency(app, event_id, requests):
+    """p50/p95 (ms) of registering for a paid event through the Flask test client"""
+    client = app.test_client()
+    latencies = []
+    for i in range(requests):
+        # seed() registered the first ``requests`` students; use the rest
+        start = time.perf_counter()
+        client.post("/student/register-event", json={"event_id": event_id, "student_id": f"P{requests + i:06d}"})
+        latencies.append(time.perf_counter() - start)
+    return {
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--payments", type=int, default=2000)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per fake gateway call")
+    parser.add_argument("--threads", default="1,4,16", help="comma-separated worker thread counts")
+    parser.add_argument("--batch-sizes", default="1,20,100", help="comma-separated outbox batch sizes")
+    parser.add_argument("--register-requests", type=int, default=200)
+    args = parser.parse_args()
+
+    use_database()
+    from app import app
+
+    runs = []
+    for threads in (int(value) for value in args.threads.split(",")):
+        for batch_size in (int(value) for value in args.batch_sizes.split(",")):
+            with app.app_context():
+                seed(args.payments)
+            runs.append(drain(app, args.payments, threads, batch_size, args.latency))
+
+    with app.app_context():
+        event_id = seed(args.register_requests)
+    print(json.dumps({
+        "payments": args.payments,
+        "gateway_latency_ms": args.latency * 1000,
+        "runs": runs,
+        "register_paid_event": register_latency(app, event_id, args.register_requests),
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""Route benchmark for the Flask backend.
+
+Seeds (or reuses) a database, then drives each route with concurrent clients
+through the Flask test client, a real threaded WSGI server with ``--server``,
+or hypercorn serving asgi.py with ``--asgi``. Prints throughput, p50/p95/p99 latency and SQL queries per
+request for every route as JSON, for comparing branches:
+
+    python -m bench.run --scale 100k --clients 8 --requests 200 > before.json
+"""
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from bench.common import AsgiServer, http_request, serve, summarize, use_database
+
+def scenarios(event_ids, student_ids, rng):
+    """(name, route label, method, path factory, payload factory) per benchmarked route"""
+    event = lambda: rng.choice(event_ids)
+    student = lambda: rng.choice(student_ids)
+    return [
+        ("events", "/events", "GET", lambda: "/events?limit=50", None),
+        ("event", "/events/<int:event_id>", "GET", lambda: f"/events/{event()}", None),
+        ("categories", "/categories", "GET", lambda: "/categories", None),
+        ("student_events", "/student/events", "GET", lambda: "/student/events?limit=50", None),
+        ("student_registrations", "/student/registrations/<student_id>", "GET",
+         lambda: f"/student/registrations/{student()}", None),
+        ("register_event", "/student/register-event", "POST", lambda: "/student/register-event",
+         lambda: {"event_id": event(), "student_id": student()}),
+        ("admin_events", "/admin/events", "GET", lambda: "/admin/events?limit=50", None),
+        ("admin_event_details", "/admin/events/<int:event_id>/details", "GET",
+         lambda: f"/admin/events/{event()}/details", None),
+        ("admin_registrations", "/admin/registrations", "GET", lambda: "/admin/registrations?limit=50", None),
+        ("admin_students", "/admin/students", "GET", lambda: "/admin/students?limit=50", None),
+        ("admin_dashboard", "/admin/dashboard", "GET", lambda: "/admin/dashboard", None),
+        ("students", "/students", "GET", lambda: "/students?limit=50", None),
+    ]
+
+def run_scenario(app, base_url, scenario, clients, requests):
+    """Issue ``requests`` requests split across ``clients`` threads"""
+    _, _, method, path, payload = scenario
+    latencies = []
+    lock = threading.Lock()
+    per_client = max(1, requests // clients)
+
+    def client():
+        test_client = app.test_client() if base_url is None else None
+        samples = []
+        for _ in range(per_client):
+            body = payload() if payload else None
+            if test_client is not None:
+                start = time.perf_counter()
+                test_client.open(path(), method=method, json=body).close()
+                samples.append(time.perf_counter() - start)
+            else:
+                samples.append(http_request(base_url + path(), body, method))
+        with lock:
+            latencies.extend(samples)
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, time.perf_counter() - start
+
+def queries_per_request(before, after, route, method):
+    """Mean SQL statements per request for a route from metrics snapshots"""
+    key = (("method", method), ("route", route))
+    total, count = after.get(key, (0.0, 0))
+    previous_total, previous_count = before.get(key, (0.0, 0))
+    if count == previous_count:
+        return None
+    return round((total - previous_total) / (count - previous_count), 2)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", default="1k", help="seed scale: 1k, 100k or 1m")
+    parser.add_argument("--database-url", help="defaults to a throwaway SQLite file")
+    parser.add_argument("--clients", type=int, default=4, help="concurrent clients per route")
+    parser.add_argument("--requests", type=int, default=200, help="requests per route")
+    parser.add_argument("--routes", help="comma-separated scenario names to run (default: all)")
+    parser.add_argument("--server", action="store_true", help="drive a real threaded WSGI server")
+    parser.add_argument("--asgi", action="store_true", help="drive hypercorn serving asgi:app (needs requirements-async.txt)")
+    parser.add_argument("--port", type=int, default=5056)
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    url = use_database(args.database_url)
+    from app import app
+    from bench.seed import seed
+    from models import db, Event, Student, Registration
+    import metrics
+
+    with app.app_context():
+        seed(args.scale)
+        event_ids = [row[0] for row in db.session.query(Event.id).filter_by(status="active").limit(1000)]
+        student_ids = [row[0] for row in db.session.query(Student.id).limit(1000)]
+        counts = {
+            "events": Event.query.count(),
+            "students": Student.query.count(),
+            "registrations": Registration.query.count(),
+        }
+
+    if args.asgi:
+        server = AsgiServer(args.port)
+    else:
+        server = serve(app, args.port) if args.server else None
+    base_url = f"http://127.0.0.1:{args.port}" if server else None
+    selected = set(args.routes.split(",")) if args.routes else None
+
+    results = {}
+    for scenario in scenarios(event_ids, student_ids, random.Random(7)):
+        name, route, method = scenario[:3]
+        if selected and name not in selected:
+            continue
+        before = metrics.REQUEST_QUERIES.snapshot()
+        latencies, elapsed = run_scenario(app, base_url, scenario, args.clients, args.requests)
+        results[name] = summarize(latencies, elapsed)
+        # Requests served by the hypercorn subprocess are not visible to this process's metrics
+        results[name]["queries_per_request"] = None if args.asgi else queries_per_request(
+            before, metrics.REQUEST_QUERIES.snapshot(), route, method
+        )
+        print(f"{name}: {results[name]}", file=sys.stderr)
+
+    if server:
+        server.shutdown()
+
+    report = json.dumps({
+        "database": url.split("@")[-1],
+        "scale": args.scale,
+        "rows": counts,
+        "mode": "asgi" if args.asgi else "wsgi" if server else "test_client",
+        "clients": args.clients,
+        "requests_per_route": args.requests,
+        "routes": results,
+    }, indent=2)
+    if args.output:
+        with open(args.output, "w") as output:
+            output.write(report + "\n")
+    else:
+        print(report)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Seed a database with a synthetic dataset for benchmarking.
+
+Uses the models.py schema and bulk Core inserts. Scales are named by their
+registration count:
+
+    python -m bench.seed --scale 100k --database-url sqlite:///bench.db
+"""
+import argparse
+import random
+import time
+from datetime import date, datetime, timedelta
+from bench.common import use_database
+
+SCALES = {
+    # registrations: (events, students)
+    "1k": (1_000, 20, 200),
+    "100k": (100_000, 500, 5_000),
+    "1m": (1_000_000, 2_000, 50_000),
+}
+CATEGORIES = ["Technology", "Cultural", "Career", "Sports", "Workshop", "Music"]
+BATCH_SIZE = 10_000
+
+def seed(scale, seed_value=42):
+    """Create the schema and insert events, students and registrations.
+
+    Must run inside an app context. Returns the row counts inserted, or
+    None when the database already holds events.
+    """
+    from sqlalchemy import insert
+    from migrations import rebuild_event_stats, run_migrations
+    from models import db, Event, Student, Registration
+    import passwords
+
+    registrations, event_count, student_count = SCALES[scale]
+    rng = random.Random(seed_value)
+    db.create_all()
+    run_migrations()
+    if Event.query.first() is not None:
+        return None
+
+    today = date.today()
+    events = [{
+        "id": i + 1,
+        "title": f"Bench Event {i + 1}",
+        "description": "Synthetic benchmark event. " * 8,
+        "date": today + timedelta(days=rng.randint(-60, 120)),
+        "time": datetime.strptime(f"{rng.randint(8, 18):02d}:00", "%H:%M").time(),
+        "duration": rng.randint(1, 8),
+        "location": f"Hall {rng.randint(1, 20)}",
+        "category": rng.choice(CATEGORIES),
+        "capacity": registrations // event_count * 2,
+        "price": rng.choice([0, 0, 100, 250, 500, 1500]),
+        "organizer": "Bench Club",
+        "status": "active" if rng.random() < 0.9 else "inactive",
+        "tags": rng.sample(CATEGORIES, 2),
+    } for i in range(event_count)]
+    db.session.execute(insert(Event), events)
+
+    # One shared hash keeps seeding fast; every student's password is "password123"
+    password_hash = passwords.hash_password("password123")
+    students = [{
+        "id": f"BENCH{i:06d}",
+        "usn": f"BENCH{i:06d}",
+        "name": f"Bench Student {i}",
+        "email": f"bench{i}@example.com",
+        "phone": "",
+        "semester": rng.randint(1, 8),
+        "branch": "Computer Science",
+        "password_hash": password_hash,
+        "is_active": True,
+    } for i in range(student_count)]
+    for start in range(0, len(students), BATCH_SIZE):
+        db.session.execute(insert(Student), students[start:start + BATCH_SIZE])
+
+    # Registration n pairs student n % S with event (n // S) % E, which keeps
+    # (event_id, student_id) unique while spreading rows across events
+    now = datetime.utcnow()
+    for start in range(0, registrations, BATCH_SIZE):
+        batch = []
+        for n in range(start, min(start + BATCH_SIZE, registrations)):
+            event = events[(n // student_count) % event_count]
+            paid = event["price"] > 0 and rng.random() < 0.8
+            batch.append({
+                "id": f"bench-{n:08d}",
+                "event_id": event["id"],
+                "student_id": students[n % student_count]["id"],
+                "amount_paid": event["price"],
+                "payment_status": "paid" if paid or event["price"] == 0 else "pending",
+                "payment_method": "card",
+                "registered_at": now - timedelta(minutes=rng.randint(0, 60 * 24 * 60)),
+            })
+        db.session.execute(insert(Registration), batch)
+
+    rebuild_event_stats()
+    db.session.commit()
+    return {"events": event_count, "students": student_count, "registrations": registrations}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", choices=sorted(SCALES), default="1k")
+    parser.add_argument("--database-url", help="defaults to a throwaway SQLite file")
+    args = parser.parse_args()
+
+    url = use_database(args.database_url)
+    from app import app
+
+    with app.app_context():
+        start = time.perf_counter()
+        counts = seed(args.scale)
+    if counts is None:
+        print(f"{url} already contains data, nothing seeded")
+        return
+    print(f"Seeded {counts} into {url} in {time.perf_counter() - start:.1f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Serialization micro-benchmark.
+
+Times building the /events response body for N events two ways: ORM
+objects through to_dict() and the stdlib JSON encoder (the old path), and
+tuple rows through the serializers.py schema plus the fast encoder. Each
+path is split into fetch+build and encode time, best of ``--repeat`` runs:
+
+    python -m bench.serialization --rows 10000,100000
+"""
+import argparse
+import json
+import time
+from datetime import date, time as time_of_day, timedelta
+from bench.common import use_database
+
+def seed_events(count):
+    from sqlalchemy import insert
+    from models import db, Event
+
+    db.create_all()
+    db.session.execute(db.delete(Event))
+    today = date.today()
+    db.session.execute(insert(Event), [{
+        "title": f"Bench Event {i}",
+        "description": "Synthetic benchmark event. " * 8,
+        "date": today + timedelta(days=i % 365),
+        "time": time_of_day(8 + i % 10, 0),
+        "duration": 2,
+        "location": f"Hall {i % 20}",
+        "category": "Technology",
+        "capacity": 100,
+        "price": (0, 100, 250)[i % 3],
+        "organizer": "Bench Club",
+        "status": "active",
+        "tags": ["Technology", "Career"],
+    } for i in range(count)])
+    db.session.commit()
+
+def orm_path():
+    from models import db, Event
+
+    start = time.perf_counter()
+    events = Event.query.filter_by(status="active").order_by(Event.date, Event.id).all()
+    items = []
+    for event in events:
+        event_dict = event.to_dict()
+        event_dict['price_formatted'] = f"₹{event.price:.2f}" if event.price > 0 else "Free"
+        items.append(event_dict)
+    built = time.perf_counter()
+    body = json.dumps(items, sort_keys=True)
+    done = time.perf_counter()
+    db.session.expunge_all()
+    return built - start, done - built, len(body)
+
+def schema_path(app):
+    from models import db, Event
+    import serializers
+
+    start = time.perf_counter()
+    columns, encode = serializers.PUBLIC_EVENT.plan()
+    stmt = db.select(*columns).where(Event.status == "active").order_by(Event.date, Event.id)
+    items = [encode(row) for row in db.session.execute(stmt)]
+    built = time.perf_counter()
+    body = app.json.dumps(items)
+    done = time.perf_counter()
+    return built - start, done - built, len(body)
+
+def best(runs):
+    """Fastest build and encode times in ms, plus the body size"""
+    return {
+        "build_ms": round(min(run[0] for run in runs) * 1000, 2),
+        "encode_ms": round(min(run[1] for run in runs) * 1000, 2),
+        "total_ms": round(min(run[0] + run[1] for run in runs) * 1000, 2),
+        "body_bytes": runs[0][2],
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", default="10000,100000", help="comma-separated event counts")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    use_database()
+    from app import app
+    import serializers
+
+    results = {}
+    with app.app_context():
+        for count in [int(value) for value in args.rows.split(",")]:
+            seed_events(count)
+            old = best([orm_path() for _ in range(args.repeat)])
+            new = best([schema_path(app) for _ in range(args.repeat)])
+            results[count] = {
+                "to_dict_stdlib_json": old,
+                "schema_fast_json": new,
+                "speedup": round(old["total_ms"] / new["total_ms"], 2) if new["total_ms"] else None,
+            }
+
+    print(json.dumps({
+        "encoder": "orjson" if serializers.orjson else "json",
+        "repeat": args.repeat,
+        "rows": results,
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
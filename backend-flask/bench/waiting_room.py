@@ -0,0 +1,121 @@
+"""Registration burst benchmark for the admission gate.
+
+Simulates ``--clients`` students all trying to register for one event of
+``--capacity`` seats at the same moment, in-process through the Flask test
+client on a throwaway SQLite database. Clients told to queue (429) retry
+until they get a final answer. Runs once with ADMISSION_ENABLED off and
+once with it on, and reports requests, database statements and time for
+each; both runs must end with exactly ``--capacity`` registrations:
+
+    python -m bench.waiting_room --clients 10000 --capacity 100
+"""
+import argparse
+import json
+import threading
+import time
+from collections import Counter, deque
+from datetime import date, time as time_of_day, timedelta
+from bench.common import use_database
+
+def seed(clients, capacity):
+    from sqlalchemy import insert
+    from models import db, Event, Registration, Student, WaitlistEntry
+
+    db.create_all()
+    for model in (WaitlistEntry, Registration, Student, Event):
+        db.session.execute(db.delete(model))
+    db.session.execute(insert(Student), [{
+        "id": f"B{i:06d}", "usn": f"B{i:06d}", "name": f"Bench Student {i}", "email": f"b{i}@example.com",
+        "semester": 1, "branch": "Computer Science", "password_hash": "",
+    } for i in range(clients)])
+    event = Event(title="Bench Opening", description="Popular event", date=date.today() + timedelta(days=30),
+                  time=time_of_day(10, 0), location="Main Hall", category="Technology",
+                  capacity=capacity, price=0, status="active")
+    db.session.add(event)
+    db.session.commit()
+    return event.id
+
+def burst(app, event_id, clients, workers):
+    """Drive every client to a final response; returns the run's report"""
+    from sqlalchemy import event as sa_event
+    from models import db, Event, Registration
+
+    pending = deque(f"B{i:06d}" for i in range(clients))
+    lock = threading.Lock()
+    statements = [0]
+    finals, retries = Counter(), [0]
+
+    def count_statement(*args):
+        statements[0] += 1
+
+    def worker():
+        client = app.test_client()
+        while True:
+            with lock:
+                if not pending:
+                    return
+                student_id = pending.popleft()
+            response = client.post("/student/register-event", json={"event_id": event_id, "student_id": student_id})
+            with lock:
+                if response.status_code == 429:
+                    retries[0] += 1
+                    pending.append(student_id)  # back of the line, as a client honouring Retry-After would
+                else:
+                    finals[response.status_code] += 1
+
+    with app.app_context():
+        engine = db.engine
+    sa_event.listen(engine, "before_cursor_execute", count_statement)
+    start = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    sa_event.remove(engine, "before_cursor_execute", count_statement)
+
+    with app.app_context():
+        registered = Registration.query.filter_by(event_id=event_id).count()
+        seats_taken = db.session.get(Event, event_id).seats_taken
+    return {
+        "requests": clients + retries[0],
+        "queued_retries": retries[0],
+        "final_status": dict(sorted(finals.items())),
+        "db_statements": statements[0],
+        "db_statements_per_client": round(statements[0] / clients, 2),
+        "elapsed_s": round(elapsed, 2),
+        "registered": registered,
+        "seats_taken": seats_taken,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=10000)
+    parser.add_argument("--capacity", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=32, help="concurrent request threads")
+    args = parser.parse_args()
+
+    use_database()
+    import app as app_module
+    from admission import create
+
+    app = app_module.app
+    results = {}
+    for enabled in (False, True):
+        app.config["ADMISSION_ENABLED"] = enabled
+        app_module.registration_gate = create(app.config)
+        with app.app_context():
+            event_id = seed(args.clients, args.capacity)
+        results["admission" if enabled else "no_admission"] = burst(app, event_id, args.clients, args.workers)
+
+    print(json.dumps({
+        "clients": args.clients,
+        "capacity": args.capacity,
+        "workers": args.workers,
+        "margin": app.config["ADMISSION_MARGIN"],
+        "runs": results,
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import deque
+
+# Live seat availability for /events/stream. Writers publish small deltas
+# ({"id", "available_spots", "is_full"}) after commit; every delta gets a
+# version, and clients resume from the last version they saw. A bounded
+# buffer of recent deltas is kept for replay; a client that fell further
+# behind (or saw versions from another process lifetime) gets a reset and
+# refetches its list.
+#
+# Broadcaster fans out inside one process, to both threads (Flask) and
+# asyncio tasks (asgi.py); with several processes each one also publishes
+# the seat changes app.seat_watcher picks up from the database, but its
+# versions are its own. RedisBroadcaster publishes through a Redis stream
+# instead, so every worker process sees every worker's deltas under one
+# sequence of versions.
+
+logger = logging.getLogger(__name__)
+
+def sse(event, data, version):
+    """Format one server-sent event"""
+    return f"id: {version}\nevent: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+class Broadcaster:
+    """In-process fan-out of versioned deltas with a replay buffer"""
+
+    shared = False  # whether every process sees what one publishes
+
+    def __init__(self, size):
+        self._entries = deque(maxlen=size)
+        self._latest = {}  # event id -> its last delta
+        self._version = 0
+        self._floor = 0  # oldest version clients can resume from
+        self._condition = threading.Condition()
+        self._async_waiters = set()
+
+    @property
+    def version(self):
+        self._start()
+        return self._version
+
+    def _start(self):
+        """Hook for subclasses that feed the buffer from elsewhere"""
+
+    def publish(self, delta):
+        with self._condition:
+            # The same seats announced twice (e.g. by the writer and by
+            # app.seat_watcher) would only wake every client for nothing
+            if self._latest.get(delta["id"]) == delta:
+                return
+            self._append(self._version + 1, delta)
+
+    def _append(self, version, delta):
+        with self._condition:
+            if len(self._entries) == self._entries.maxlen:
+                self._floor = self._entries[0][0]
+            self._entries.append((version, delta))
+            self._latest[delta["id"]] = delta
+            self._version = version
+            self._condition.notify_all()
+            waiters = list(self._async_waiters)
+        for loop, event in waiters:
+            loop.call_soon_threadsafe(event.set)
+
+    def changes_since(self, version):
+        """Return (latest version, changes), with changes None when ``version`` cannot be replayed.
+
+        Several deltas for one event collapse into its latest one.
+        """
+        with self._condition:
+            latest = self._version
+            if version == latest:
+                return latest, []
+            if version > latest or version < self._floor:
+                return latest, None
+            changes = {}
+            for entry_version, delta in self._entries:
+                if entry_version > version:
+                    changes.pop(delta["id"], None)
+                    changes[delta["id"]] = delta
+            return latest, list(changes.values())
+
+    def wait(self, version, timeout):
+        """Block until something newer than ``version`` is published or ``timeout`` passes"""
+        self._start()
+        with self._condition:
+            self._condition.wait_for(lambda: self._version != version, timeout)
+        return self.changes_since(version)
+
+    async def wait_async(self, version, timeout):
+        """Asyncio flavour of wait() that does not hold a thread"""
+        self._start()
+        waiter = (asyncio.get_running_loop(), asyncio.Event())
+        with self._condition:
+            if self._version != version:
+                return self.changes_since(version)
+            self._async_waiters.add(waiter)
+        try:
+            await asyncio.wait_for(waiter[1].wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            with self._condition:
+                self._async_waiters.discard(waiter)
+        return self.changes_since(version)
+
+    def sse_stream(self, since, keepalive, duration, retry):
+        """Server-sent events from ``since`` onwards, for a WSGI response body.
+
+        A WSGI stream holds a request thread, so it ends after ``duration``
+        seconds; the ``retry`` hint (milliseconds) tells EventSource to
+        reconnect soon after, resuming from Last-Event-ID.
+        """
+        yield f"retry: {retry}\n\n"
+        yield sse("ready", {"version": since}, since)
+        deadline = time.monotonic() + duration
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            latest, changes = self.wait(since, min(keepalive, remaining))
+            yield self._sse_message(since, latest, changes)
+            since = latest
+
+    async def sse_stream_async(self, since, keepalive):
+        """Asyncio flavour of sse_stream()"""
+        yield sse("ready", {"version": since}, since)
+        while True:
+            latest, changes = await self.wait_async(since, keepalive)
+            yield self._sse_message(since, latest, changes)
+            since = latest
+
+    @staticmethod
+    def _sse_message(since, latest, changes):
+        if changes is None:
+            return sse("reset", {"version": latest}, latest)
+        if changes:
+            return sse("seats", changes, latest)
+        return ": keepalive\n\n"
+
+class RedisBroadcaster(Broadcaster):
+    """Broadcaster fed from a Redis stream shared by every worker.
+
+    Works with any server speaking the Redis protocol, including a local
+    stand-in such as fakeredis' TCP server. Stream entry ids give a global
+    order; the reader thread starts lazily so it runs in each forked worker.
+    """
+
+    shared = True
+
+    def __init__(self, size, url, stream="events:seats"):
+        super().__init__(size)
+        import redis
+        self._client = redis.Redis.from_url(url)
+        self._stream = stream
+        self._reader = None
+        self._reader_lock = threading.Lock()
+
+    @staticmethod
+    def _version_of(entry_id):
+        milliseconds, sequence = entry_id.decode().split("-")
+        return int(milliseconds) * 1_000_000 + int(sequence)
+
+    def publish(self, delta):
+        self._start()
+        self._client.xadd(self._stream, {"delta": json.dumps(delta)}, maxlen=self._entries.maxlen, approximate=True)
+
+    def _start(self):
+        if self._reader is not None:
+            return
+        with self._reader_lock:
+            if self._reader is not None:
+                return
+            last = self._client.xrevrange(self._stream, count=1)
+            last_id = last[0][0] if last else b"0-0"
+            with self._condition:
+                self._version = self._floor = self._version_of(last_id)
+            self._reader = threading.Thread(target=self._read, args=(last_id,), daemon=True)
+            self._reader.start()
+
+    def _read(self, last_id):
+        while True:
+            try:
+                for _, entries in self._client.xread({self._stream: last_id}, block=5000) or []:
+                    for entry_id, fields in entries:
+                        self._append(self._version_of(entry_id), json.loads(fields[b"delta"]))
+                        last_id = entry_id
+            except Exception:
+                logger.exception("Seat stream reader failed, retrying")
+                time.sleep(1)
+
+def create(config):
+    """Broadcaster for the app config: Redis-backed when BROADCAST_REDIS_URL is set"""
+    if config["BROADCAST_REDIS_URL"]:
+        return RedisBroadcaster(config["STREAM_BUFFER_SIZE"], config["BROADCAST_REDIS_URL"])
+    return Broadcaster(config["STREAM_BUFFER_SIZE"])
@@ -0,0 +1,158 @@
+import csv
+import io
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+from itertools import islice
+from sqlalchemy import insert
+from models import db, Event, Student, Registration
+from validation import parse_student, parse_event
+import passwords
+
+# Bulk import/export shared by the /admin/import and /admin/export routes and
+# the init_db.py CLI. Imports validate every row with the same rules as the
+# single-item endpoints and insert valid rows in executemany batches, one
+# commit per batch. Exports stream rows from a server-side cursor.
+
+IMPORT_BATCH_SIZE = 500
+EXPORT_BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 100
+
+EXPORT_COLUMNS = {
+    "students": ["id", "usn", "name", "email", "phone", "semester", "branch", "is_active", "created_at"],
+    "events": ["id", "title", "description", "date", "time", "duration", "location", "category",
+               "capacity", "price", "image", "organizer", "status", "tags", "created_at"],
+    "registrations": ["id", "event_id", "student_id", "amount_paid", "payment_status", "payment_method",
+                      "transaction_id", "special_requirements", "registered_at"],
+}
+EXPORT_MODELS = {"students": Student, "events": Event, "registrations": Registration}
+
+def detect_format(filename=None, content_type=None):
+    """Guess csv/ndjson from a file name or Content-Type, defaulting to csv"""
+    if filename and filename.endswith((".ndjson", ".jsonl")):
+        return "ndjson"
+    if content_type and ("ndjson" in content_type or "jsonl" in content_type):
+        return "ndjson"
+    return "csv"
+
+def read_rows(stream, fmt):
+    """Yield one dict per CSV/NDJSON row, or None for an unparseable line"""
+    if fmt == "csv":
+        yield from csv.DictReader(stream)
+        return
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield row if isinstance(row, dict) else None
+
+def _batches(rows, size):
+    numbered = enumerate(rows, start=1)
+    while True:
+        batch = list(islice(numbered, size))
+        if not batch:
+            return
+        yield batch
+
+def _validate(batch, parse, result):
+    valid = []
+    for line, row in batch:
+        values, message = parse(row) if row is not None else (None, "Invalid row")
+        if message:
+            _record_error(result, line, message)
+        else:
+            valid.append((line, values))
+    return valid
+
+def _record_error(result, line, message):
+    result["error_count"] += 1
+    if len(result["errors"]) < MAX_REPORTED_ERRORS:
+        result["errors"].append({"row": line, "message": message})
+
+def import_students(rows, batch_size=IMPORT_BATCH_SIZE):
+    """Import student rows; returns {"imported", "error_count", "errors"}"""
+    result = {"imported": 0, "error_count": 0, "errors": []}
+    for batch in _batches(rows, batch_size):
+        valid = _validate(batch, parse_student, result)
+        if not valid:
+            continue
+
+        # One lookup per batch for USNs/emails that already exist
+        ids = [values["id"] for _, values in valid] + [values["usn"] for _, values in valid]
+        emails = [values["email"] for _, values in valid]
+        existing = db.session.query(Student.id, Student.usn, Student.email).filter(
+            Student.id.in_(ids) | Student.usn.in_(ids) | Student.email.in_(emails)
+        ).all()
+        taken = {value for row in existing for value in row}
+
+        new_students = []
+        for line, values in valid:
+            keys = {values["id"], values["usn"], values["email"]}
+            if keys & taken:
+                _record_error(result, line, "USN or email already exists")
+                continue
+            taken |= keys
+            new_students.append(values)
+        if not new_students:
+            continue
+
+        hashes = passwords.hash_passwords([values.pop("password") for values in new_students])
+        for values, password_hash in zip(new_students, hashes):
+            values["password_hash"] = password_hash
+            values["is_active"] = True
+        db.session.execute(insert(Student), new_students)
+        db.session.commit()
+        result["imported"] += len(new_students)
+    return result
+
+def import_events(rows, batch_size=IMPORT_BATCH_SIZE):
+    """Import event rows; returns {"imported", "error_count", "errors"}"""
+    result = {"imported": 0, "error_count": 0, "errors": []}
+    for batch in _batches(rows, batch_size):
+        new_events = [values for _, values in _validate(batch, parse_event, result)]
+        if not new_events:
+            continue
+        db.session.execute(insert(Event), new_events)
+        db.session.commit()
+        result["imported"] += len(new_events)
+    return result
+
+IMPORTERS = {"students": import_students, "events": import_events}
+
+def _export_value(value, fmt):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, time):
+        return value.strftime('%H:%M')
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, list) and fmt == "csv":
+        return ";".join(str(item) for item in value)
+    return value
+
+def export_rows(kind, fmt, batch_size=EXPORT_BATCH_SIZE):
+    """Yield ``kind`` rows as CSV or NDJSON text chunks, one chunk per batch"""
+    model = EXPORT_MODELS[kind]
+    names = EXPORT_COLUMNS[kind]
+    query = db.session.query(*[getattr(model, name) for name in names]).order_by(model.id)
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer) if fmt == "csv" else None
+    if writer:
+        writer.writerow(names)
+    for count, row in enumerate(query.yield_per(batch_size), start=1):
+        values = [_export_value(value, fmt) for value in row]
+        if writer:
+            writer.writerow(values)
+        else:
+            buffer.write(json.dumps(dict(zip(names, values))) + "\n")
+        if count % batch_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
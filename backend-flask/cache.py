@@ -0,0 +1,115 @@
+from collections import OrderedDict
+import threading
+import time
+
+class TTLCache:
+    """Thread-safe in-process cache whose entries expire after ``ttl`` seconds.
+
+    A ttl of 0 disables caching: ``set`` is a no-op and ``get`` always misses.
+    """
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            return value
+
+    def set(self, key, value):
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+class LRUCache:
+    """Thread-safe in-process cache holding at most ``maxsize`` entries.
+
+    The least recently used entry is evicted when the cache is full. With a
+    ``ttl``, entries also expire that many seconds after being set.
+    """
+
+    def __init__(self, maxsize, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._entries:
+                return None
+            value, expires_at = self._entries[key]
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        if self.maxsize <= 0:
+            return
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+class VersionedCache:
+    """Cache whose keys are scoped to a data version.
+
+    ``bump()`` moves every key to a new version so stale entries are never
+    read again and age out through the backing store's eviction policy.
+    ``bump(scope)`` only moves keys stored under that scope (e.g. one event).
+    A read that started before a bump stores its result under the old
+    version, so it can never be served after the bump.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.version = 0
+        self._scopes = {}
+        self._lock = threading.Lock()
+
+    def _key(self, key, scope):
+        return (self.version, self._scopes.get(scope, 0), scope, key)
+
+    def key(self, key, scope=None):
+        """Return the versioned key to pass to ``get``/``set``"""
+        with self._lock:
+            return self._key(key, scope)
+
+    def get(self, versioned_key):
+        return self.store.get(versioned_key)
+
+    def set(self, versioned_key, value):
+        self.store.set(versioned_key, value)
+
+    def bump(self, scope=None):
+        with self._lock:
+            if scope is None:
+                self.version += 1
+                self._scopes.clear()
+            else:
+                self._scopes[scope] = self._scopes.get(scope, 0) + 1
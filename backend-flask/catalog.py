@@ -0,0 +1,99 @@
+import logging
+import threading
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+from models import CatalogVersion
+
+# Catalog cache versions shared through the database. The catalog cache is
+# per process, so a write handled by one worker used to leave every other
+# worker serving its cached copy. Writers now also bump a counter row in
+# catalog_versions, and readers fold the counters into their cache keys: one
+# primary-key lookup per catalog request, instead of rebuilding the response.
+#
+# The per-event counters double as a change feed: VersionWatcher polls
+# them so each process learns about seat changes other processes committed
+# (other web workers, the payment worker) without a message broker.
+#
+# Framework-agnostic: app.py runs these statements on the Flask-SQLAlchemy
+# engine, asgi.py on its async session.
+
+GLOBAL = ""  # bumped by writes that may change any catalog response
+
+logger = logging.getLogger(__name__)
+
+INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+def _scopes(scope):
+    return [GLOBAL] if scope is None else [GLOBAL, str(scope)]
+
+def versions_statement(scope=None):
+    """Select the counters a response cached under ``scope`` depends on"""
+    return select(CatalogVersion.scope, CatalogVersion.version).where(CatalogVersion.scope.in_(_scopes(scope)))
+
+def versions(rows, scope=None):
+    """Version tuple to fold into the cache key, from versions_statement() rows"""
+    found = {name: version for name, version in rows}
+    return tuple(found.get(name, 0) for name in _scopes(scope))
+
+def bump_statement(dialect, scope=None):
+    """Upsert incrementing the counter for ``scope`` (None: the whole catalog)"""
+    insert = INSERTS.get(dialect.name)
+    if insert is None:
+        raise NotImplementedError(f"catalog versions need PostgreSQL or SQLite, not {dialect.name}")
+    return insert(CatalogVersion).values(scope=_scopes(scope)[-1], version=1).on_conflict_do_update(
+        index_elements=[CatalogVersion.scope], set_={"version": CatalogVersion.version + 1}
+    )
+
+def all_versions_statement():
+    """Select every counter, for VersionWatcher"""
+    return select(CatalogVersion.scope, CatalogVersion.version)
+
+class VersionWatcher:
+    """Polls the catalog counters and reports the events whose counter moved.
+
+    ``fetch_rows()`` returns all_versions_statement() rows; ``on_change``
+    gets the ids of the events bumped since the previous poll. The first
+    poll only records where the counters stand.
+    """
+
+    def __init__(self, fetch_rows, on_change, interval=1.0):
+        self.fetch_rows = fetch_rows
+        self.on_change = on_change
+        self.interval = interval
+        self._seen = None
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def poll(self):
+        """Check the counters once; returns the changed event ids"""
+        current = {name: version for name, version in self.fetch_rows() if name != GLOBAL}
+        with self._lock:
+            seen, self._seen = self._seen, current
+        if seen is None:
+            return []
+        changed = sorted(int(name) for name, version in current.items() if seen.get(name) != version)
+        if changed:
+            self.on_change(changed)
+        return changed
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.poll()
+            except Exception:
+                logger.exception("Catalog version poll failed")
+
+    def start(self):
+        """Start polling in a daemon thread (once per process; call it after fork)"""
+        if self.interval <= 0 or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="catalog-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
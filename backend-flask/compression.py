@@ -0,0 +1,120 @@
+import zlib
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - gzip only
+    brotli = None
+
+# Negotiated response compression. Bodies of a compressible type are
+# encoded with the best Accept-Encoding the client offers: brotli when the
+# brotli package is installed, else gzip. Bodies under COMPRESS_MIN_SIZE
+# bytes go out as they are, since the headers would eat the saving.
+# Streamed responses (?stream=ndjson|json) are compressed chunk by chunk
+# and flushed after each one, so rows still reach the client as they are
+# produced. Compressed responses get a weak ETag, as the bytes differ from
+# the identity representation; If-None-Match still matches it.
+#
+# Framework-agnostic apart from init_compression(): asgi.py applies the
+# same negotiate()/encode()/finish() steps to its async routes.
+
+COMPRESSIBLE_MIMETYPES = {
+    "application/json",
+    "application/x-ndjson",
+    "application/msgpack",
+    "text/csv",
+    "text/plain",
+    "text/html",
+}
+
+def available_encodings():
+    """Supported content codings, most preferred first"""
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+def choose_encoding(accept_encodings):
+    """Best supported coding in a werkzeug Accept-Encoding header, or None"""
+    best, best_quality = None, 0
+    for encoding in available_encodings():
+        quality = accept_encodings.quality(encoding)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+def negotiate(response, accept_encodings):
+    """Coding to compress ``response`` with, or None to send it as is.
+
+    Adds ``Vary: Accept-Encoding`` to every response whose type could be
+    compressed, so shared caches keep the representations apart.
+    """
+    if response.mimetype not in COMPRESSIBLE_MIMETYPES:
+        return None
+    if response.status_code < 200 or response.status_code in (204, 206, 304):
+        return None
+    if "Content-Encoding" in response.headers or "no-transform" in response.headers.get("Cache-Control", ""):
+        return None
+    response.vary.add("Accept-Encoding")
+    return choose_encoding(accept_encodings)
+
+def encode(data, encoding, config):
+    """Compress a whole body"""
+    if encoding == "br":
+        return brotli.compress(data, quality=config["COMPRESS_BROTLI_QUALITY"])
+    compressor = zlib.compressobj(config["COMPRESS_GZIP_LEVEL"], zlib.DEFLATED, 31)  # 31: gzip container
+    return compressor.compress(data) + compressor.flush()
+
+def encode_stream(chunks, encoding, config):
+    """Compress an iterable of byte chunks, flushing after each one"""
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=config["COMPRESS_BROTLI_QUALITY"])
+        for chunk in chunks:
+            yield compressor.process(chunk) + compressor.flush()
+        yield compressor.finish()
+        return
+    compressor = zlib.compressobj(config["COMPRESS_GZIP_LEVEL"], zlib.DEFLATED, 31)
+    for chunk in chunks:
+        yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    yield compressor.flush()
+
+def finish(response, encoding):
+    """Mark ``response`` as encoded with ``encoding``"""
+    response.headers["Content-Encoding"] = encoding
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+
+def encode_cached(response, body, variants, accept_encodings, config):
+    """Compress a response whose ``body`` is cached.
+
+    ``variants`` is a dict cached alongside the body, memoizing the encoded
+    bytes per coding so hot responses are compressed once, not per request.
+    """
+    if not config["COMPRESS_ENABLED"] or len(body) < config["COMPRESS_MIN_SIZE"]:
+        return
+    encoding = negotiate(response, accept_encodings)
+    if encoding is None:
+        return
+    if encoding not in variants:
+        variants[encoding] = encode(body, encoding, config)
+    response.set_data(variants[encoding])
+    finish(response, encoding)
+
+def init_compression(app):
+    """Compress the Flask app's responses as negotiated"""
+
+    @app.after_request
+    def compress_response(response):
+        if not app.config["COMPRESS_ENABLED"] or response.direct_passthrough:
+            return response
+        encoding = negotiate(response, request.accept_encodings)
+        if encoding is None:
+            return response
+        if response.is_streamed:
+            response.response = encode_stream(response.iter_encoded(), encoding, app.config)
+            response.headers.pop("Content-Length", None)
+        else:
+            data = response.get_data()
+            if len(data) < app.config["COMPRESS_MIN_SIZE"]:
+                return response
+            response.set_data(encode(data, encoding, app.config))
+        finish(response, encoding)
+        return response
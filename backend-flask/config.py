@@ -13,8 +13,114 @@ class Config:
     
     # SQLAlchemy Configuration
     SQLALCHEMY_DATABASE_URI = DATABASE_URL
+    # Comma-separated read replicas for @replica_read GET routes (see replicas.py)
+    DATABASE_REPLICA_URLS = [url.strip() for url in os.getenv('DATABASE_REPLICA_URLS', '').split(',') if url.strip()]
+    SQLALCHEMY_BINDS = {f'replica_{i}': url for i, url in enumerate(DATABASE_REPLICA_URLS)}
+    REPLICA_STICKY_SECONDS = int(os.getenv('REPLICA_STICKY_SECONDS', '5'))  # read-your-writes window
+    REPLICA_RETRY_SECONDS = int(os.getenv('REPLICA_RETRY_SECONDS', '30'))  # how long a failed replica sits out
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # Production server (gunicorn.conf.py): worker processes x threads each
+    WEB_WORKERS = int(os.getenv('WEB_WORKERS', str((os.cpu_count() or 1) * 2 + 1)))
+    WEB_THREADS = int(os.getenv('WEB_THREADS', '4'))
+
+    # Connection pool, per worker process. Size it to WEB_THREADS so every
+    # request thread can hold a connection; the database sees at most
+    # WEB_WORKERS * (DB_POOL_SIZE + DB_MAX_OVERFLOW) connections.
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', str(WEB_THREADS)))
+    DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', '2'))
+    DB_POOL_TIMEOUT = int(os.getenv('DB_POOL_TIMEOUT', '10'))  # seconds to wait for a free connection
+    DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', '300'))
+    # 'False' drops the per-checkout ping: only connections idle longer than
+    # DB_POOL_PING_IDLE seconds are checked, and a disconnect error invalidates the pool
+    DB_POOL_PRE_PING = os.getenv('DB_POOL_PRE_PING', 'True').lower() == 'true'
+    DB_POOL_PING_IDLE = int(os.getenv('DB_POOL_PING_IDLE', '60'))
+
     SQLALCHEMY_ENGINE_OPTIONS = {
-        'pool_pre_ping': True,
-        'pool_recycle': 300,
+        'pool_pre_ping': DB_POOL_PRE_PING,
+        'pool_recycle': DB_POOL_RECYCLE,
+        'pool_size': DB_POOL_SIZE,
+        'max_overflow': DB_MAX_OVERFLOW,
+        'pool_timeout': DB_POOL_TIMEOUT,
     }
+
+    # Metrics Configuration
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'True').lower() == 'true'
+    SLOW_REQUEST_MS = int(os.getenv('SLOW_REQUEST_MS', '500'))  # 0 disables the slow-request log
+    QUERY_BUDGET = int(os.getenv('QUERY_BUDGET', '0'))  # max SQL statements per request, 0 disables
+    QUERY_BUDGETS = {}  # per-route overrides, e.g. {'/admin/events': 1}
+    QUERY_BUDGET_FAIL = os.getenv('QUERY_BUDGET_FAIL', 'False').lower() == 'true'  # raise instead of log
+
+    # Password Hashing Configuration
+    BCRYPT_ROUNDS = int(os.getenv('BCRYPT_ROUNDS', '12'))
+    # Size of the bcrypt thread pool; 0 hashes inline on the request thread
+    PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', str(max(1, (os.cpu_count() or 2) // 2))))
+
+    # Pagination Configuration
+    MAX_PAGE_SIZE = int(os.getenv('MAX_PAGE_SIZE', '500'))
+
+    # Cache Configuration (seconds, 0 disables)
+    DASHBOARD_CACHE_TTL = int(os.getenv('DASHBOARD_CACHE_TTL', '15'))
+
+    # Public catalog cache: 'lru' bounds entries by count, 'ttl' by age
+    CATALOG_CACHE_BACKEND = os.getenv('CATALOG_CACHE_BACKEND', 'lru')
+    CATALOG_CACHE_SIZE = int(os.getenv('CATALOG_CACHE_SIZE', '1024'))
+    CATALOG_CACHE_TTL = int(os.getenv('CATALOG_CACHE_TTL', '300'))
+    CATALOG_MAX_AGE = int(os.getenv('CATALOG_MAX_AGE', '30'))  # Cache-Control max-age for lists
+    # Check the catalog versions in the database on every catalog request, so a
+    # write in one worker process invalidates the others' caches (see catalog.py).
+    # 'false' saves that query on a single-process server.
+    CATALOG_CACHE_SHARED = os.getenv('CATALOG_CACHE_SHARED', 'true').lower() == 'true'
+
+    # Live seat stream (/events/stream)
+    STREAM_BUFFER_SIZE = int(os.getenv('STREAM_BUFFER_SIZE', '1000'))  # deltas kept for resuming clients
+    STREAM_KEEPALIVE = int(os.getenv('STREAM_KEEPALIVE', '15'))  # seconds between SSE keepalive comments
+    STREAM_MAX_WAIT = int(os.getenv('STREAM_MAX_WAIT', '30'))  # longest long-poll wait
+    # app.py and gunicorn hold a request thread per open stream, so there SSE
+    # responses end and long-polls return within this many seconds
+    STREAM_SYNC_MAX_WAIT = int(os.getenv('STREAM_SYNC_MAX_WAIT', '20'))
+    STREAM_RETRY_MS = int(os.getenv('STREAM_RETRY_MS', '1000'))  # SSE reconnect delay hint
+    BROADCAST_REDIS_URL = os.getenv('BROADCAST_REDIS_URL', '')  # fan out across workers, e.g. redis://localhost:6379/0
+    # Seconds between polls of catalog_versions for seat changes committed by
+    # other processes (see catalog.VersionWatcher); 0 disables
+    SEAT_POLL_INTERVAL = float(os.getenv('SEAT_POLL_INTERVAL', '1'))
+
+    # Idempotency-Key handling for registration and payment POSTs
+    IDEMPOTENCY_TTL = int(os.getenv('IDEMPOTENCY_TTL', str(24 * 3600)))  # seconds a stored response is replayed
+    IDEMPOTENCY_WAIT = float(os.getenv('IDEMPOTENCY_WAIT', '10'))  # how long a duplicate waits for the first
+    IDEMPOTENCY_LOCK_TIMEOUT = int(os.getenv('IDEMPOTENCY_LOCK_TIMEOUT', '60'))  # unfinished claims older than this are dropped
+
+    # Admission control and waitlist for /student/register-event (see admission.py)
+    ADMISSION_ENABLED = os.getenv('ADMISSION_ENABLED', 'true').lower() == 'true'
+    ADMISSION_MARGIN = int(os.getenv('ADMISSION_MARGIN', '4'))  # concurrent attempts admitted beyond the free seats
+    ADMISSION_QUEUE_TTL = float(os.getenv('ADMISSION_QUEUE_TTL', '30'))  # a queued client must retry within this
+    ADMISSION_RETRY_AFTER = float(os.getenv('ADMISSION_RETRY_AFTER', '1'))  # Retry-After sent to queued clients
+    ADMISSION_REFRESH_SECONDS = float(os.getenv('ADMISSION_REFRESH_SECONDS', '5'))  # reload free seats from the DB
+
+    # Signed student session tokens (see sessions.py); SECRET_KEY signs them
+    SESSION_TTL = int(os.getenv('SESSION_TTL', str(12 * 3600)))  # seconds a login stays valid
+    SESSION_REQUIRED = os.getenv('SESSION_REQUIRED', 'false').lower() == 'true'  # reject student routes without a token
+    PRINCIPAL_CACHE_SIZE = int(os.getenv('PRINCIPAL_CACHE_SIZE', '4096'))  # students kept in memory
+    PRINCIPAL_CACHE_TTL = int(os.getenv('PRINCIPAL_CACHE_TTL', '300'))  # seconds before a cached student is reloaded
+
+    # POST /student/register-events
+    REGISTRATION_BATCH_MAX = int(os.getenv('REGISTRATION_BATCH_MAX', '20'))  # events per batch
+
+    # Payment settlement through the outbox (see outbox.py and payments.py)
+    PAYMENT_GATEWAY = os.getenv('PAYMENT_GATEWAY', 'fake')
+    PAYMENT_WORKERS = int(os.getenv('PAYMENT_WORKERS', '2'))  # worker threads; python worker.py runs them
+    PAYMENT_BATCH_SIZE = int(os.getenv('PAYMENT_BATCH_SIZE', '20'))  # outbox rows claimed per batch
+    PAYMENT_POLL_INTERVAL = float(os.getenv('PAYMENT_POLL_INTERVAL', '1'))  # idle wait between outbox polls
+    PAYMENT_LEASE_SECONDS = int(os.getenv('PAYMENT_LEASE_SECONDS', '60'))  # a claimed batch must finish within this
+    PAYMENT_MAX_ATTEMPTS = int(os.getenv('PAYMENT_MAX_ATTEMPTS', '5'))  # then the payment is marked failed
+    PAYMENT_RETRY_BASE = float(os.getenv('PAYMENT_RETRY_BASE', '2'))  # first retry delay, doubled per attempt
+    PAYMENT_RETRY_MAX = float(os.getenv('PAYMENT_RETRY_MAX', '300'))  # longest retry delay
+    FAKE_GATEWAY_LATENCY = float(os.getenv('FAKE_GATEWAY_LATENCY', '0.2'))  # seconds per fake gateway call
+    FAKE_GATEWAY_FAILURE_RATE = float(os.getenv('FAKE_GATEWAY_FAILURE_RATE', '0'))  # share of calls that time out
+    FAKE_GATEWAY_DECLINE_RATE = float(os.getenv('FAKE_GATEWAY_DECLINE_RATE', '0'))  # share of charges declined
+
+    # Response compression (see compression.py); brotli needs the brotli package
+    COMPRESS_ENABLED = os.getenv('COMPRESS_ENABLED', 'true').lower() == 'true'
+    COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', '1024'))  # smaller bodies are sent as is
+    COMPRESS_GZIP_LEVEL = int(os.getenv('COMPRESS_GZIP_LEVEL', '6'))
+    COMPRESS_BROTLI_QUALITY = int(os.getenv('COMPRESS_BROTLI_QUALITY', '5'))  # 11 is too slow for dynamic bodies
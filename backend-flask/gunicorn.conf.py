@@ -0,0 +1,37 @@
+# Production launcher: gunicorn -c gunicorn.conf.py app:app
+# Pre-forks WEB_WORKERS processes with WEB_THREADS request threads each.
+# Each worker owns its own connection pool (see pool.py and the DB_POOL_*
+# settings in config.py); engines inherited from the master are disposed
+# in the child right after fork.
+import os
+from config import Config
+
+bind = os.getenv("BIND", "0.0.0.0:5000")
+workers = Config.WEB_WORKERS
+worker_class = "gthread"
+threads = Config.WEB_THREADS
+timeout = int(os.getenv("WEB_TIMEOUT", "30"))
+graceful_timeout = int(os.getenv("WEB_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.getenv("WEB_KEEPALIVE", "5"))
+# Recycle workers now and then to bound memory growth
+max_requests = int(os.getenv("WEB_MAX_REQUESTS", "10000"))
+max_requests_jitter = max_requests // 10
+# Import the app once in the master so workers share its memory pages
+preload_app = os.getenv("WEB_PRELOAD", "True").lower() == "true"
+accesslog = os.getenv("WEB_ACCESS_LOG", "-")
+
+def on_starting(server):
+    # Same schema bootstrap as `python app.py`, once in the master
+    from app import app
+    from migrations import run_migrations
+    from models import db
+    with app.app_context():
+        db.create_all()
+        run_migrations()
+
+def post_fork(server, worker):
+    # Each worker polls for seat changes committed by the others (and by
+    # worker.py); without BROADCAST_REDIS_URL this is how its stream and
+    # admission gate hear about them
+    from app import seat_watcher
+    seat_watcher.start()
@@ -0,0 +1,151 @@
+import functools
+import hashlib
+import threading
+import time
+from datetime import datetime, timedelta
+from flask import current_app, g, jsonify, make_response, request
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from models import db, IdempotencyKey
+
+# Idempotency-Key support for POST routes that must not run twice. The
+# first request with a key claims a row in idempotency_keys in its own
+# transaction, runs the view and stores the response; repeats with the same
+# key and body get that stored response without running the view again.
+# A duplicate that arrives while the first is still running waits for it
+# (IDEMPOTENCY_WAIT seconds) and then replays its result. 5xx and 429
+# (queued, see admission.py) responses are not stored, so the key can be
+# retried. Rows expire after IDEMPOTENCY_TTL.
+#
+# The request hash covers the session's student as well as the body, so a
+# key another student already used is refused (422) rather than replaying
+# their response.
+
+HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+POLL_INTERVAL = 0.05
+PURGE_INTERVAL = 600  # seconds between opportunistic purges per process
+
+keys = IdempotencyKey.__table__
+_inflight = {}  # (route, key) -> threading.Event set when that request finishes
+_inflight_lock = threading.Lock()
+_last_purge = 0.0
+
+def _error(message, status):
+    return jsonify({"status": "error", "message": message}), status
+
+def purge_expired(connection=None):
+    """Delete expired keys; returns how many were removed"""
+    statement = delete(keys).where(keys.c.expires_at < datetime.utcnow())
+    if connection is not None:
+        return connection.execute(statement).rowcount
+    with db.engine.begin() as connection:
+        return connection.execute(statement).rowcount
+
+def _claim(key, route, request_hash):
+    """Insert the in-progress row; returns True if this request owns the key"""
+    global _last_purge
+    now = datetime.utcnow()
+    try:
+        with db.engine.begin() as connection:
+            if time.monotonic() - _last_purge > PURGE_INTERVAL:
+                _last_purge = time.monotonic()
+                purge_expired(connection)
+            connection.execute(insert(keys).values(
+                key=key, route=route, request_hash=request_hash, created_at=now,
+                expires_at=now + timedelta(seconds=current_app.config["IDEMPOTENCY_TTL"]),
+            ))
+        return True
+    except IntegrityError:
+        return False
+
+def _load(key, route):
+    with db.engine.connect() as connection:
+        return connection.execute(select(keys).where(keys.c.key == key, keys.c.route == route)).first()
+
+def _release_abandoned(key, route):
+    """Drop a claim whose request never finished (e.g. the worker died)"""
+    cutoff = datetime.utcnow() - timedelta(seconds=current_app.config["IDEMPOTENCY_LOCK_TIMEOUT"])
+    with db.engine.begin() as connection:
+        connection.execute(delete(keys).where(
+            keys.c.key == key, keys.c.route == route, keys.c.status_code.is_(None), keys.c.created_at < cutoff
+        ))
+
+def _request_hash():
+    """sha256 of the calling student (see app.student_session) and the body"""
+    principal = g.get("session_student_id")
+    prefix = principal.encode() + b"\0" if principal else b""
+    return hashlib.sha256(prefix + request.get_data()).hexdigest()
+
+def _replay(row):
+    response = current_app.response_class(row.response_body, status=row.status_code, mimetype=row.mimetype)
+    response.headers[REPLAYED_HEADER] = "true"
+    return response
+
+def _run(view, args, kwargs, key, route):
+    done = threading.Event()
+    with _inflight_lock:
+        _inflight[(route, key)] = done
+    response = None
+    try:
+        response = make_response(view(*args, **kwargs))
+    finally:
+        # The view has committed (or failed); free its connection before
+        # writing the key from a separate one
+        db.session.close()
+        with db.engine.begin() as connection:
+            match = (keys.c.key == key) & (keys.c.route == route)
+            stored = response is not None and response.status_code < 500 and response.status_code != 429
+            if stored and not response.is_streamed:
+                connection.execute(update(keys).where(match).values(
+                    status_code=response.status_code, response_body=response.get_data(), mimetype=response.mimetype
+                ))
+            else:
+                connection.execute(delete(keys).where(match))
+        with _inflight_lock:
+            _inflight.pop((route, key), None)
+        done.set()
+    return response
+
+def idempotent(view):
+    """Honour an Idempotency-Key header on this view"""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        key = request.headers.get(HEADER)
+        if not key:
+            return view(*args, **kwargs)
+        if len(key) > MAX_KEY_LENGTH:
+            return _error(f"{HEADER} must be at most {MAX_KEY_LENGTH} characters", 400)
+
+        route = request.url_rule.rule
+        request_hash = _request_hash()
+        deadline = time.monotonic() + current_app.config["IDEMPOTENCY_WAIT"]
+        while True:
+            if _claim(key, route, request_hash):
+                return _run(view, args, kwargs, key, route)
+
+            row = _load(key, route)
+            if row is None:
+                continue  # the first request failed and released the key; try again
+            if row.request_hash != request_hash:
+                return _error(f"{HEADER} was already used with a different request", 422)
+            if row.status_code is not None:
+                if row.expires_at < datetime.utcnow():
+                    purge_expired()
+                    continue
+                return _replay(row)
+
+            # Same request still in flight: wait for it rather than run twice
+            if time.monotonic() >= deadline:
+                _release_abandoned(key, route)
+                response = make_response(_error("A request with this Idempotency-Key is still in progress", 409))
+                response.headers["Retry-After"] = "1"
+                return response
+            with _inflight_lock:
+                done = _inflight.get((route, key))
+            if done is not None:
+                done.wait(max(0.0, deadline - time.monotonic()))
+            else:
+                time.sleep(POLL_INTERVAL)
+    return wrapper
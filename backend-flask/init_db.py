@@ -1,7 +1,13 @@
 from app import create_app, db
 from models import Event, Student, Registration
+from migrations import run_migrations, rebuild_event_stats
 from datetime import datetime, date, time
+import argparse
+import json
+import sys
 import uuid
+import bulk
+import idempotency
 
 def init_database():
     app = create_app()
@@ -9,6 +15,10 @@ def init_database():
     with app.app_context():
         db.create_all()
 
+        applied = run_migrations()
+        if applied:
+            print(f"Applied migrations: {', '.join(applied)}")
+
         if Event.query.first() is None:
             print("Creating sample events...")
             
@@ -114,5 +124,78 @@ def init_database():
             print("Database already contains data. Skipping sample data creation.")
         print("Database initialization completed!")
 
+def import_file(kind, path, fmt=None, batch_size=bulk.IMPORT_BATCH_SIZE):
+    """Bulk import students or events from a CSV/NDJSON file"""
+    app = create_app()
+    fmt = fmt or bulk.detect_format(filename=path)
+
+    with app.app_context():
+        db.create_all()
+        run_migrations()
+        with open(path, encoding="utf-8-sig", newline="") as stream:
+            result = bulk.IMPORTERS[kind](bulk.read_rows(stream, fmt), batch_size=batch_size)
+        print(json.dumps(result, indent=2))
+
+def export_file(kind, path=None, fmt=None):
+    """Export students, events or registrations to a file or stdout"""
+    app = create_app()
+    fmt = fmt or bulk.detect_format(filename=path)
+
+    with app.app_context():
+        output = open(path, "w", encoding="utf-8", newline="") if path else sys.stdout
+        try:
+            for chunk in bulk.export_rows(kind, fmt):
+                output.write(chunk)
+        finally:
+            if path:
+                output.close()
+
+def rebuild_stats():
+    """Rebuild the denormalized event stats from the registrations table"""
+    app = create_app()
+
+    with app.app_context():
+        rebuild_event_stats()
+        db.session.commit()
+        print("Event stats rebuilt.")
+
+def purge_idempotency_keys():
+    """Delete expired Idempotency-Key records"""
+    app = create_app()
+
+    with app.app_context():
+        removed = idempotency.purge_expired()
+        print(f"Removed {removed} expired idempotency keys.")
+
+def main():
+    parser = argparse.ArgumentParser(description="Initialize the database or bulk import/export data")
+    subparsers = parser.add_subparsers(dest="command")
+
+    import_parser = subparsers.add_parser("import", help="import students or events")
+    import_parser.add_argument("type", choices=sorted(bulk.IMPORTERS))
+    import_parser.add_argument("path")
+    import_parser.add_argument("--format", choices=["csv", "ndjson"])
+    import_parser.add_argument("--batch-size", type=int, default=bulk.IMPORT_BATCH_SIZE)
+
+    export_parser = subparsers.add_parser("export", help="export students, events or registrations")
+    export_parser.add_argument("type", choices=sorted(bulk.EXPORT_MODELS))
+    export_parser.add_argument("--output", help="file to write (default: stdout)")
+    export_parser.add_argument("--format", choices=["csv", "ndjson"])
+
+    subparsers.add_parser("rebuild-stats", help="recompute event registration counts and revenue")
+    subparsers.add_parser("purge-idempotency", help="delete expired Idempotency-Key records")
+
+    args = parser.parse_args()
+    if args.command == "rebuild-stats":
+        rebuild_stats()
+    elif args.command == "purge-idempotency":
+        purge_idempotency_keys()
+    elif args.command == "import":
+        import_file(args.type, args.path, args.format, max(1, args.batch_size))
+    elif args.command == "export":
+        export_file(args.type, args.output, args.format)
+    else:
+        init_database()
+
 if __name__ == "__main__":
-    init_database()
+    main()
@@ -0,0 +1,119 @@
+from datetime import date, datetime
+import base64
+import json
+import re
+from sqlalchemy import tuple_
+from models import Event, Student
+
+# Keyset pagination, filtering and field projection for the list endpoints.
+# Framework-agnostic so the sync Flask app and the async ASGI app share it:
+# callers pass the request's query parameters and get back either parsed
+# args or an error message. Statements may be legacy Query objects or 2.0
+# select() constructs.
+
+def parse_list_params(params, cursor_columns, max_page_size):
+    """Parse limit/cursor/fields/date range query parameters.
+
+    ``cursor_columns`` are the keyset columns the cursor must match. Returns
+    (args, None) on success or (None, message) on bad input.
+    """
+    args = {"limit": None, "cursor": None, "fields": None, "date_from": None, "date_to": None}
+
+    limit = params.get("limit")
+    if limit:
+        if not limit.isdigit() or int(limit) < 1:
+            return None, "limit must be a positive integer"
+        args["limit"] = min(int(limit), max_page_size)
+
+    cursor = params.get("cursor")
+    if cursor:
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+            if not isinstance(values, list) or len(values) != len(cursor_columns):
+                raise ValueError("cursor does not match the sort key")
+            args["cursor"] = [_column_value(c, v) for c, v in zip(cursor_columns, values)]
+        except Exception:
+            return None, "Invalid cursor"
+
+    fields = params.get("fields")
+    if fields:
+        args["fields"] = {field.strip() for field in fields.split(",") if field.strip()}
+
+    for key in ("date_from", "date_to"):
+        value = params.get(key)
+        if value:
+            if not re.match(r"^\d{4}-\d{2}-\d{2}$", value):
+                return None, f"{key} must be in YYYY-MM-DD format"
+            args[key] = datetime.strptime(value, "%Y-%m-%d").date()
+
+    return args, None
+
+def _cursor_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+def _column_value(column, value):
+    python_type = column.type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    return value
+
+def keyset(stmt, args, columns, descending=False):
+    """Order ``stmt`` by ``columns`` and skip rows up to the cursor"""
+    stmt = stmt.order_by(*[column.desc() if descending else column.asc() for column in columns])
+    if args["cursor"] is not None:
+        position = tuple_(*columns)
+        values = tuple_(*args["cursor"])
+        stmt = stmt.filter(position < values if descending else position > values)
+    return stmt
+
+def page_statement(stmt, args, columns, descending=False):
+    """Keyset-order ``stmt`` and fetch one row past the page to detect more"""
+    stmt = keyset(stmt, args, columns, descending)
+    if args["limit"] is not None:
+        stmt = stmt.limit(args["limit"] + 1)
+    return stmt
+
+def split_page(rows, args, key):
+    """Trim rows fetched with page_statement to the page; return (rows, next_cursor).
+
+    ``key`` maps a row to its values for the keyset columns.
+    """
+    if args["limit"] is None or len(rows) <= args["limit"]:
+        return rows, None
+    rows = rows[:args["limit"]]
+    next_cursor = json.dumps([_cursor_value(value) for value in key(rows[-1])])
+    return rows, base64.urlsafe_b64encode(next_cursor.encode("utf-8")).decode("ascii")
+
+def filter_events(stmt, params, args, allow_status=True):
+    """Apply the category/date range/status filters to an Event statement"""
+    category = params.get("category")
+    if category:
+        stmt = stmt.filter(Event.category == category)
+    if args["date_from"]:
+        stmt = stmt.filter(Event.date >= args["date_from"])
+    if args["date_to"]:
+        stmt = stmt.filter(Event.date <= args["date_to"])
+    status = params.get("status")
+    if allow_status and status:
+        stmt = stmt.filter(Event.status == status)
+    return stmt
+
+def filter_students(stmt, params):
+    """Apply the branch/semester filters to a Student statement"""
+    branch = params.get("branch")
+    if branch:
+        stmt = stmt.filter(Student.branch == branch)
+    semester = params.get("semester", type=int)
+    if semester:
+        stmt = stmt.filter(Student.semester == semester)
+    return stmt
+
+def project(item, fields):
+    """Keep only the requested ``fields`` of a response dict"""
+    if fields is None:
+        return item
+    return {key: value for key, value in item.items() if key in fields}
@@ -0,0 +1,177 @@
+import threading
+import time
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from serializers import FastJSONProvider
+
+# Per-request instrumentation: SQL statement count, DB time, JSON encoding
+# time and total latency per route, exported as Prometheus histograms on
+# /metrics. Statements are counted through SQLAlchemy cursor events on every
+# engine, so routes served from any bind are covered.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 500)
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised when QUERY_BUDGET_FAIL is set and a route exceeds its query budget"""
+
+class Histogram:
+    """Thread-safe Prometheus-style histogram with one series per label set"""
+
+    def __init__(self, name, documentation, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {"buckets": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series["buckets"][i] += 1
+            series["sum"] += value
+            series["count"] += 1
+
+    def snapshot(self):
+        """Return {labels: (sum, count)} for every series"""
+        with self._lock:
+            return {key: (series["sum"], series["count"]) for key, series in self._series.items()}
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                labels = ",".join(f'{name}="{value}"' for name, value in key)
+                prefix = labels + "," if labels else ""
+                for bound, count in zip(self.buckets, series["buckets"]):
+                    lines.append(f'{self.name}_bucket{{{prefix}le="{bound}"}} {count}')
+                lines.append(f'{self.name}_bucket{{{prefix}le="+Inf"}} {series["count"]}')
+                lines.append(f"{self.name}_sum{{{labels}}} {series['sum']}")
+                lines.append(f"{self.name}_count{{{labels}}} {series['count']}")
+        return "\n".join(lines)
+
+REQUEST_LATENCY = Histogram("http_request_duration_seconds", "Total request latency.", LATENCY_BUCKETS)
+REQUEST_QUERIES = Histogram("http_request_db_queries", "SQL statements executed per request.", QUERY_BUCKETS)
+REQUEST_DB_TIME = Histogram("http_request_db_seconds", "Time spent executing SQL per request.", LATENCY_BUCKETS)
+REQUEST_SERIALIZATION = Histogram(
+    "http_request_serialization_seconds", "Time spent encoding JSON or MessagePack per request.", LATENCY_BUCKETS
+)
+POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a pooled database connection.", LATENCY_BUCKETS
+)
+HISTOGRAMS = [REQUEST_LATENCY, REQUEST_QUERIES, REQUEST_DB_TIME, REQUEST_SERIALIZATION, POOL_CHECKOUT_WAIT]
+
+def _stats():
+    if has_request_context():
+        return g.get("request_stats")
+    return None
+
+# The start time rides on the statement's execution context rather than a
+# per-connection stack: a statement that raises never reaches
+# after_cursor_execute, and a stack entry it left behind would pair every
+# later statement on that connection with the wrong start.
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context.metrics_query_start = time.perf_counter()
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = getattr(context, "metrics_query_start", None)
+    elapsed = time.perf_counter() - start if start is not None else 0.0
+    stats = _stats()
+    if stats is not None:
+        stats["queries"] += 1
+        stats["db_time"] += elapsed
+        if stats["statements"] is not None:
+            stats["statements"].append((elapsed, statement))
+
+class TimedJSONProvider(FastJSONProvider):
+    """JSON provider that adds encoding time to the current request's stats"""
+
+    def dumps(self, obj, **kwargs):
+        start = time.perf_counter()
+        try:
+            return super().dumps(obj, **kwargs)
+        finally:
+            stats = _stats()
+            if stats is not None:
+                stats["serialization_time"] += time.perf_counter() - start
+
+    def packb(self, obj):
+        start = time.perf_counter()
+        try:
+            return super().packb(obj)
+        finally:
+            stats = _stats()
+            if stats is not None:
+                stats["serialization_time"] += time.perf_counter() - start
+
+def _route():
+    rule = request.url_rule
+    return rule.rule if rule is not None else "<unmatched>"
+
+def init_metrics(app):
+    """Install request hooks recording per-route query and latency stats"""
+    app.json_provider_class = TimedJSONProvider
+    app.json = TimedJSONProvider(app)
+
+    @app.before_request
+    def start_request_stats():
+        if not app.config["METRICS_ENABLED"]:
+            return
+        g.request_stats = {
+            "start": time.perf_counter(),
+            "queries": 0,
+            "db_time": 0.0,
+            "serialization_time": 0.0,
+            "statements": [] if app.config["SLOW_REQUEST_MS"] > 0 else None,
+        }
+
+    @app.after_request
+    def check_query_budget(response):
+        stats = _stats()
+        budget = app.config["QUERY_BUDGETS"].get(_route(), app.config["QUERY_BUDGET"])
+        if stats is not None and budget and stats["queries"] > budget:
+            message = f"{request.method} {_route()} ran {stats['queries']} queries (budget {budget})"
+            if app.config["QUERY_BUDGET_FAIL"]:
+                raise QueryBudgetExceeded(message)
+            app.logger.warning("Query budget exceeded: %s", message)
+        return response
+
+    # Teardown runs after a streamed body has been fully sent, so streamed
+    # routes are measured end to end
+    @app.teardown_request
+    def record_request_stats(exc):
+        stats = _stats()
+        if stats is None:
+            return
+        g.request_stats = None
+        total = time.perf_counter() - stats["start"]
+        labels = {"route": _route(), "method": request.method}
+        REQUEST_LATENCY.observe(total, **labels)
+        REQUEST_QUERIES.observe(stats["queries"], **labels)
+        REQUEST_DB_TIME.observe(stats["db_time"], **labels)
+        REQUEST_SERIALIZATION.observe(stats["serialization_time"], **labels)
+
+        slow_ms = app.config["SLOW_REQUEST_MS"]
+        if slow_ms > 0 and total * 1000 >= slow_ms:
+            statements = "\n".join(
+                f"  {elapsed * 1000:.1f} ms: {statement}"
+                for elapsed, statement in sorted(stats["statements"], reverse=True)[:10]
+            )
+            app.logger.warning(
+                "Slow request %s %s: %.1f ms, %d queries, %.1f ms in DB\n%s",
+                request.method, request.full_path, total * 1000, stats["queries"],
+                stats["db_time"] * 1000, statements
+            )
+
+def render():
+    """Render every histogram in the Prometheus text exposition format"""
+    return "\n".join(histogram.render() for histogram in HISTOGRAMS) + "\n"
@@ -0,0 +1,169 @@
+import logging
+from sqlalchemy import inspect, text
+from models import db, Event, PaymentOutbox, Registration
+import search
+
+# Schema upgrades for databases created before a column/constraint existed.
+# db.create_all() only creates missing tables, so every step here must be
+# idempotent and safe to run on both fresh and existing databases.
+
+logger = logging.getLogger(__name__)
+
+def add_event_seats_taken():
+    """Add events.seats_taken and backfill it from existing registrations"""
+    columns = [column['name'] for column in inspect(db.engine).get_columns('events')]
+    if 'seats_taken' in columns:
+        return False
+    db.session.execute(text("ALTER TABLE events ADD COLUMN seats_taken INTEGER NOT NULL DEFAULT 0"))
+    db.session.execute(text(
+        "UPDATE events SET seats_taken = "
+        "(SELECT COUNT(*) FROM registrations WHERE registrations.event_id = events.id)"
+    ))
+    return True
+
+def add_event_stats_columns():
+    """Add events.paid_count/revenue and rebuild all event stats"""
+    columns = [column['name'] for column in inspect(db.engine).get_columns('events')]
+    if 'paid_count' in columns:
+        return False
+    db.session.execute(text("ALTER TABLE events ADD COLUMN paid_count INTEGER NOT NULL DEFAULT 0"))
+    db.session.execute(text("ALTER TABLE events ADD COLUMN revenue NUMERIC(12, 2) NOT NULL DEFAULT 0"))
+    rebuild_event_stats()
+    return True
+
+def remove_duplicate_registrations():
+    """Delete all but one registration per (event_id, student_id); returns the rows removed.
+
+    Each pair keeps its paid registration if it has one, else its earliest.
+    Removed rows are logged, so any payments they carried can be refunded.
+    """
+    duplicates = db.session.execute(text(
+        "SELECT id, event_id, student_id, payment_status, amount_paid FROM ("
+        " SELECT id, event_id, student_id, payment_status, amount_paid, ROW_NUMBER() OVER ("
+        "  PARTITION BY event_id, student_id"
+        "  ORDER BY CASE WHEN payment_status = 'paid' THEN 0 ELSE 1 END, registered_at, id"
+        " ) AS copy FROM registrations"
+        ") ranked WHERE copy > 1"
+    )).all()
+    if not duplicates:
+        return []
+    for row in duplicates:
+        logger.warning(
+            "Removing duplicate registration %s (event %s, student %s, %s, amount %s)",
+            row.id, row.event_id, row.student_id, row.payment_status, row.amount_paid
+        )
+    ids = [row.id for row in duplicates]
+    db.session.execute(db.delete(PaymentOutbox).where(PaymentOutbox.registration_id.in_(ids)))
+    db.session.execute(db.delete(Registration).where(Registration.id.in_(ids)))
+    rebuild_event_stats()
+    return duplicates
+
+def add_registration_unique_constraint():
+    """Prevent a student from holding two registrations for the same event.
+
+    Databases written before the constraint may hold duplicates, which
+    would make the index creation fail; they are removed first.
+    """
+    indexes = [index['name'] for index in inspect(db.engine).get_indexes('registrations')]
+    constraints = [c['name'] for c in inspect(db.engine).get_unique_constraints('registrations')]
+    if 'uq_registration_event_student' in indexes + constraints:
+        return False
+    remove_duplicate_registrations()
+    db.session.execute(text(
+        "CREATE UNIQUE INDEX uq_registration_event_student ON registrations (event_id, student_id)"
+    ))
+    return True
+
+def add_hot_lookup_indexes():
+    """Create the indexes declared on Event and Registration if missing"""
+    created = False
+    for model in (Event, Registration):
+        existing = {index['name'] for index in inspect(db.engine).get_indexes(model.__tablename__)}
+        for index in model.__table__.indexes:
+            if index.name not in existing:
+                index.create(db.session.connection())
+                created = True
+    return created
+
+def add_event_search_index():
+    """Create the full-text index behind /events/search (see search.py)"""
+    dialect = db.engine.dialect.name
+    if dialect == 'postgresql':
+        columns = [column['name'] for column in inspect(db.engine).get_columns('events')]
+        if 'search_vector' in columns:
+            return False
+        db.session.execute(text(
+            f"ALTER TABLE events ADD COLUMN search_vector tsvector "
+            f"GENERATED ALWAYS AS ({search.SEARCH_VECTOR_SQL}) STORED"
+        ))
+        db.session.execute(text("CREATE INDEX ix_events_search_vector ON events USING GIN (search_vector)"))
+        return True
+    if dialect != 'sqlite':
+        return False
+    # The triggers go with the events table, so recreate the index if they are missing
+    triggers = db.session.execute(text(
+        "SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'events' AND name LIKE :prefix"
+    ), {"prefix": f"{search.FTS_TABLE}_a_"}).scalar()
+    if triggers == 3 and search.detect_backend(db.session.connection()) == 'fts5':
+        return False
+
+    # External-content FTS5 table: the text lives only in events, the
+    # triggers keep the index in step with every insert, edit and delete
+    names = ", ".join(search.FTS_COLUMNS)
+    new_values = ", ".join(f"new.{name}" for name in search.FTS_COLUMNS)
+    old_values = ", ".join(f"old.{name}" for name in search.FTS_COLUMNS)
+    fts = search.FTS_TABLE
+    if not db.session.execute(text("SELECT sqlite_compileoption_used('ENABLE_FTS5')")).scalar():
+        return False  # SQLite built without FTS5: search falls back to LIKE
+    db.session.execute(text(f"DROP TABLE IF EXISTS {fts}"))
+    db.session.execute(text(
+        f"CREATE VIRTUAL TABLE {fts} USING fts5({names}, content='events', content_rowid='id')"
+    ))
+    db.session.execute(text(
+        f"CREATE TRIGGER {fts}_ai AFTER INSERT ON events BEGIN "
+        f"INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new_values}); END"
+    ))
+    db.session.execute(text(
+        f"CREATE TRIGGER {fts}_ad AFTER DELETE ON events BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.id, {old_values}); END"
+    ))
+    # Only text edits reindex, not the seat counter updates on every registration
+    db.session.execute(text(
+        f"CREATE TRIGGER {fts}_au AFTER UPDATE OF {names} ON events BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.id, {old_values}); "
+        f"INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new_values}); END"
+    ))
+    db.session.execute(text(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')"))
+    return True
+
+def rebuild_event_stats():
+    """Recompute seats_taken, paid_count and revenue for every event from registrations.
+
+    Registrations whose payment failed hold no seat.
+    """
+    registrations = Registration.__table__
+    per_event = registrations.c.event_id == Event.__table__.c.id
+    paid = db.and_(per_event, registrations.c.payment_status == 'paid')
+    seated = db.and_(per_event, db.func.coalesce(registrations.c.payment_status, '') != 'failed')
+    db.session.execute(db.update(Event.__table__).values(
+        seats_taken=db.select(db.func.count()).where(seated).scalar_subquery(),
+        paid_count=db.select(db.func.count()).where(paid).scalar_subquery(),
+        revenue=db.select(db.func.coalesce(db.func.sum(registrations.c.amount_paid), 0)).where(paid).scalar_subquery(),
+    ))
+
+MIGRATIONS = [
+    add_event_seats_taken,
+    add_event_stats_columns,
+    add_registration_unique_constraint,
+    add_hot_lookup_indexes,
+    add_event_search_index,
+]
+
+def run_migrations():
+    """Apply every pending migration in order and commit"""
+    applied = []
+    for migration in MIGRATIONS:
+        if migration():
+            applied.append(migration.__name__)
+    db.session.commit()
+    return applied
@@ -1,12 +1,18 @@
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
 import uuid
-import bcrypt
+import passwords
+from replicas import RoutingSession
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 
 class Event(db.Model):
     __tablename__ = 'events'
+    __table_args__ = (
+        db.Index('ix_events_status_date_id', 'status', 'date', 'id'),  # active listings, keyset order
+        db.Index('ix_events_date_id', 'date', 'id'),  # admin listing, dashboard date ranges
+        db.Index('ix_events_category', 'category'),  # /categories DISTINCT, category filter
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
@@ -22,11 +28,17 @@ class Event(db.Model):
     organizer = db.Column(db.String(200))
     status = db.Column(db.String(50), default='active')
     tags = db.Column(db.JSON)  # Store as JSON array
+    # Registration stats maintained in the same transaction as registration
+    # writes; rebuild with `python init_db.py rebuild-stats`
+    seats_taken = db.Column(db.Integer, nullable=False, default=0, server_default='0')  # registration count
+    paid_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    revenue = db.Column(db.Numeric(12, 2), nullable=False, default=0, server_default='0')  # sum of paid amounts
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
     registrations = db.relationship('Registration', backref='event', lazy=True, cascade='all, delete-orphan')
+    waitlist = db.relationship('WaitlistEntry', backref='event', lazy=True, cascade='all, delete-orphan')
     
     def to_dict(self):
         return {
@@ -65,12 +77,16 @@ class Student(db.Model):
     
     # Relationships
     registrations = db.relationship('Registration', backref='student', lazy=True, cascade='all, delete-orphan')
+    waitlist_entries = db.relationship('WaitlistEntry', backref='student', lazy=True, cascade='all, delete-orphan')
     
     def set_password(self, password):
-        self.password_hash = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        self.password_hash = passwords.hash_password(password)
     
     def check_password(self, password):
-        return bcrypt.checkpw(password.encode('utf-8'), self.password_hash.encode('utf-8'))
+        return passwords.check_password(password, self.password_hash)
+    
+    def password_needs_rehash(self):
+        return passwords.needs_rehash(self.password_hash)
     
     def to_dict(self):
         return {
@@ -88,6 +104,13 @@ class Student(db.Model):
 
 class Registration(db.Model):
     __tablename__ = 'registrations'
+    __table_args__ = (
+        db.UniqueConstraint('event_id', 'student_id', name='uq_registration_event_student'),
+        db.Index('ix_registrations_event_payment', 'event_id', 'payment_status'),  # per-event counts/revenue
+        db.Index('ix_registrations_student_id', 'student_id'),  # student registrations and counts
+        db.Index('ix_registrations_registered_at_id', 'registered_at', 'id'),  # recent registrations, keyset order
+        db.Index('ix_registrations_payment_status', 'payment_status'),  # paid revenue totals
+    )
     
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     event_id = db.Column(db.Integer, db.ForeignKey('events.id'), nullable=False)
@@ -113,3 +136,67 @@ class Registration(db.Model):
             'registered_at': self.registered_at.isoformat() if self.registered_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
+
+class WaitlistEntry(db.Model):
+    __tablename__ = 'waitlist_entries'
+    __table_args__ = (
+        db.UniqueConstraint('event_id', 'student_id', name='uq_waitlist_event_student'),
+        db.Index('ix_waitlist_event_created_id', 'event_id', 'created_at', 'id'),  # promotion order
+        db.Index('ix_waitlist_student_id', 'student_id'),  # a student's waitlist
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    event_id = db.Column(db.Integer, db.ForeignKey('events.id'), nullable=False)
+    student_id = db.Column(db.String(20), db.ForeignKey('students.id'), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'event_id': self.event_id,
+            'student_id': self.student_id,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+
+class PaymentOutbox(db.Model):
+    __tablename__ = 'payment_outbox'
+    __table_args__ = (
+        db.Index('ix_payment_outbox_status_available_id', 'status', 'available_at', 'id'),  # worker claims
+        db.Index('ix_payment_outbox_registration_id', 'registration_id'),  # cancellation cleanup
+    )
+
+    # Payment settlement written in the registration's transaction and
+    # drained by the workers in outbox.py
+    id = db.Column(db.Integer, primary_key=True)
+    registration_id = db.Column(db.String(36), db.ForeignKey('registrations.id', ondelete='CASCADE'), nullable=False)
+    amount = db.Column(db.Numeric(10, 2), nullable=False)
+    payment_method = db.Column(db.String(50), default='card')
+    status = db.Column(db.String(20), nullable=False, default='pending')  # pending, done, failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    available_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)  # next attempt, or lease expiry
+    last_error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    processed_at = db.Column(db.DateTime)
+
+class IdempotencyKey(db.Model):
+    __tablename__ = 'idempotency_keys'
+    __table_args__ = (
+        db.Index('ix_idempotency_keys_expires_at', 'expires_at'),  # TTL purge
+    )
+
+    key = db.Column(db.String(255), primary_key=True)  # client's Idempotency-Key header
+    route = db.Column(db.String(100), primary_key=True)
+    request_hash = db.Column(db.String(64), nullable=False)  # sha256 of the session student and body
+    status_code = db.Column(db.Integer)  # None while the first request is still running
+    response_body = db.Column(db.LargeBinary)
+    mimetype = db.Column(db.String(100))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False)
+
+class CatalogVersion(db.Model):
+    __tablename__ = 'catalog_versions'
+
+    # Catalog cache invalidation counters shared by every worker process
+    # (see catalog.py): scope '' covers the whole catalog, an event id one event
+    scope = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
@@ -0,0 +1,298 @@
+from collections import defaultdict
+from datetime import datetime, timedelta
+import logging
+import random
+import threading
+import uuid
+from sqlalchemy import select, update
+from models import db, Event, PaymentOutbox, Registration
+import catalog
+import payments
+import waitlist
+
+# Transactional outbox for payment settlement. A paid registration commits as
+# 'pending' together with a payment_outbox row, so the request never waits on
+# the gateway. PaymentWorkers threads then drain the outbox in batches:
+#
+#   1. claim: pick due rows (SKIP LOCKED on Postgres) and push their
+#      available_at out by a lease, committing straight away;
+#   2. settle: call the gateway for each row with no transaction open;
+#   3. apply: in one transaction, mark the registrations paid (with their
+#      transaction ids and the event's paid_count/revenue), reschedule
+#      transient failures with exponential backoff and give up on declines
+#      or after PAYMENT_MAX_ATTEMPTS. Giving up marks the registration
+#      'failed' (kept, with the outbox row's last_error, as the record) and
+#      releases its seat to the event's waitlist.
+#
+# The batch also bumps the shared catalog version of every event it touched
+# (catalog.py), so web processes, whose caches, admission gates and seat
+# streams this process cannot reach, pick the change up from the database.
+#
+# A worker that dies mid-batch leaves its rows to be claimed again once the
+# lease runs out; the registration id is the gateway reference, so the retry
+# cannot charge twice. A registration cancelled while its charge was in
+# flight is refunded.
+
+PENDING = "pending"
+DONE = "done"
+FAILED = "failed"
+
+logger = logging.getLogger(__name__)
+
+def settlement(registration):
+    """Outbox row settling ``registration``; add it in the registration's transaction"""
+    if registration.id is None:
+        registration.id = str(uuid.uuid4())
+    return PaymentOutbox(
+        registration_id=registration.id,
+        amount=registration.amount_paid,
+        payment_method=registration.payment_method,
+    )
+
+def backoff(attempts, base, cap):
+    """Seconds before retrying after ``attempts`` tries: exponential, jittered, at most ``cap``"""
+    delay = min(cap, base * 2 ** (attempts - 1))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+def claim(batch_size, lease, now=None):
+    """Lease up to ``batch_size`` due outbox rows and commit.
+
+    Returns rows of (id, registration_id, amount, payment_method, attempts),
+    ``attempts`` already counting this one.
+    """
+    now = now or datetime.utcnow()
+    ids = db.session.execute(
+        select(PaymentOutbox.id)
+        .where(PaymentOutbox.status == PENDING, PaymentOutbox.available_at <= now)
+        .order_by(PaymentOutbox.available_at, PaymentOutbox.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    ).scalars().all()
+    if not ids:
+        db.session.rollback()
+        return []
+
+    # Conditional on still being due, so two workers on a database without
+    # SKIP LOCKED (SQLite) cannot both take a row
+    stmt = (
+        update(PaymentOutbox)
+        .where(PaymentOutbox.id.in_(ids), PaymentOutbox.status == PENDING, PaymentOutbox.available_at <= now)
+        .values(available_at=now + timedelta(seconds=lease), attempts=PaymentOutbox.attempts + 1)
+        .execution_options(synchronize_session=False)
+    )
+    columns = (PaymentOutbox.id, PaymentOutbox.registration_id, PaymentOutbox.amount,
+               PaymentOutbox.payment_method, PaymentOutbox.attempts)
+    if db.engine.dialect.update_returning:
+        claimed = db.session.execute(stmt.returning(*columns)).all()
+    else:
+        leased = [row_id for row_id in ids if db.session.execute(stmt.where(PaymentOutbox.id == row_id)).rowcount]
+        claimed = db.session.execute(select(*columns).where(PaymentOutbox.id.in_(leased))).all() if leased else []
+    db.session.commit()
+    return sorted(claimed, key=lambda message: message.id)
+
+def settle(messages, gateway):
+    """Charge every claimed message; returns (message, transaction_id, error, retryable) tuples"""
+    outcomes = []
+    for message in messages:
+        try:
+            transaction_id = gateway.charge(message.registration_id, message.amount, message.payment_method)
+            outcomes.append((message, transaction_id, None, False))
+        except payments.PaymentDeclined as e:
+            outcomes.append((message, None, str(e) or "Payment declined", False))
+        except Exception as e:
+            outcomes.append((message, None, str(e) or type(e).__name__, True))
+    return outcomes
+
+def apply(outcomes, max_attempts, retry_base, retry_max, now=None, shared_versions=True):
+    """Record a batch of outcomes in one transaction and commit.
+
+    Returns (counts, refunds, changed): how many messages were settled,
+    retried and failed, the (transaction_id, amount) charges to refund
+    because their registration was cancelled meanwhile, and the ids of the
+    events whose seats or payment stats the batch changed.
+    """
+    now = now or datetime.utcnow()
+    counts = {"settled": 0, "retried": 0, "failed": 0}
+    refunds, done = [], []
+    event_stats = defaultdict(lambda: [0, 0])  # event_id -> [paid_count, revenue]
+    released = defaultdict(int)  # event_id -> seats given back
+
+    registrations = {row.id: row for row in db.session.execute(
+        select(Registration.id, Registration.event_id, Registration.amount_paid, Registration.payment_status)
+        .where(Registration.id.in_([message.registration_id for message, *_ in outcomes]))
+    )} if outcomes else {}
+
+    for message, transaction_id, error, retryable in outcomes:
+        if transaction_id is not None:
+            registration = registrations.get(message.registration_id)
+            if registration is None:
+                refunds.append((transaction_id, message.amount))
+            elif registration.payment_status == 'pending':
+                paid = db.session.execute(
+                    update(Registration)
+                    .where(Registration.id == registration.id, Registration.payment_status == 'pending')
+                    .values(payment_status='paid', transaction_id=transaction_id, updated_at=now)
+                    .execution_options(synchronize_session=False)
+                ).rowcount
+                if paid:
+                    event_stats[registration.event_id][0] += 1
+                    event_stats[registration.event_id][1] += registration.amount_paid
+            done.append(message.id)
+            counts["settled"] += 1
+        elif retryable and message.attempts < max_attempts:
+            db.session.execute(
+                update(PaymentOutbox).where(PaymentOutbox.id == message.id)
+                .values(available_at=now + timedelta(seconds=backoff(message.attempts, retry_base, retry_max)),
+                        last_error=error)
+                .execution_options(synchronize_session=False)
+            )
+            counts["retried"] += 1
+        else:
+            db.session.execute(
+                update(PaymentOutbox).where(PaymentOutbox.id == message.id)
+                .values(status=FAILED, last_error=error, processed_at=now)
+                .execution_options(synchronize_session=False)
+            )
+            failed = db.session.execute(
+                update(Registration)
+                .where(Registration.id == message.registration_id, Registration.payment_status == 'pending')
+                .values(payment_status='failed', updated_at=now)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            # A failed registration holds no seat
+            registration = registrations.get(message.registration_id)
+            if failed and registration is not None:
+                released[registration.event_id] += 1
+            counts["failed"] += 1
+
+    if done:
+        db.session.execute(
+            update(PaymentOutbox).where(PaymentOutbox.id.in_(done))
+            .values(status=DONE, last_error=None, processed_at=now)
+            .execution_options(synchronize_session=False)
+        )
+    for event_id, (paid_count, revenue) in event_stats.items():
+        db.session.execute(
+            update(Event).where(Event.id == event_id)
+            .values(paid_count=Event.paid_count + paid_count, revenue=Event.revenue + revenue)
+            .execution_options(synchronize_session=False)
+        )
+    for event_id, seats in released.items():
+        db.session.execute(
+            update(Event).where(Event.id == event_id, Event.seats_taken >= seats)
+            .values(seats_taken=Event.seats_taken - seats)
+            .execution_options(synchronize_session=False)
+        )
+        # The freed seats go to the head of the waitlist in the same transaction
+        waitlist.promote(event_id)
+    changed = sorted(set(event_stats) | set(released))
+    if shared_versions:
+        for event_id in changed:
+            db.session.execute(catalog.bump_statement(db.engine.dialect, event_id))
+    db.session.commit()
+    return counts, refunds, changed
+
+class PaymentWorkers:
+    """Pool of threads draining the payment outbox"""
+
+    def __init__(self, app, gateway, threads=2, batch_size=20, poll_interval=1.0, lease=60,
+                 max_attempts=5, retry_base=2.0, retry_max=300.0, on_change=None):
+        self.app = app
+        self.gateway = gateway
+        # Called in the app context, after commit, with the ids of the events
+        # a batch changed (cache invalidation, seat stream)
+        self.on_change = on_change
+        self.threads = threads
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.lease = lease  # seconds a claimed batch has to finish before others may retake it
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.stats = {"batches": 0, "settled": 0, "retried": 0, "failed": 0, "refunded": 0}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads = []
+
+    def run_once(self):
+        """Claim, settle and record one batch; returns the number of messages handled"""
+        with self.app.app_context():
+            messages = claim(self.batch_size, self.lease)
+            if not messages:
+                return 0
+            outcomes = settle(messages, self.gateway)
+            counts, refunds, changed = apply(
+                outcomes, self.max_attempts, self.retry_base, self.retry_max,
+                shared_versions=self.app.config["CATALOG_CACHE_SHARED"],
+            )
+            if changed and self.on_change is not None:
+                try:
+                    self.on_change(changed)
+                except Exception:
+                    # The batch is committed; caches and streams catch up on their own
+                    logger.exception("Change hook failed for events %s", changed)
+
+        refunded = 0
+        for transaction_id, amount in refunds:
+            try:
+                self.gateway.refund(transaction_id, amount)
+                refunded += 1
+            except Exception:
+                # The registration is gone, so nothing will retry this
+                logger.exception("Refund of %s for a cancelled registration failed", transaction_id)
+        with self._lock:
+            self.stats["batches"] += 1
+            self.stats["refunded"] += refunded
+            for name, count in counts.items():
+                self.stats[name] += count
+        return len(messages)
+
+    def drain(self):
+        """Run batches until nothing is due; returns the number of messages handled"""
+        total = 0
+        while True:
+            handled = self.run_once()
+            if not handled:
+                return total
+            total += handled
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                handled = self.run_once()
+            except Exception:
+                logger.exception("Payment outbox batch failed")
+                handled = 0
+            if not handled:
+                self._stop.wait(self.poll_interval)
+
+    def start(self):
+        """Start the worker threads (daemons, so they never block shutdown)"""
+        self._stop.clear()
+        for i in range(self.threads):
+            thread = threading.Thread(target=self._run, name=f"payment-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout=None):
+        """Ask the threads to finish their current batch and wait for them"""
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+def create(app, gateway, on_change=None):
+    """PaymentWorkers configured from the app config"""
+    config = app.config
+    return PaymentWorkers(
+        app,
+        gateway,
+        on_change=on_change,
+        threads=config["PAYMENT_WORKERS"],
+        batch_size=config["PAYMENT_BATCH_SIZE"],
+        poll_interval=config["PAYMENT_POLL_INTERVAL"],
+        lease=config["PAYMENT_LEASE_SECONDS"],
+        max_attempts=config["PAYMENT_MAX_ATTEMPTS"],
+        retry_base=config["PAYMENT_RETRY_BASE"],
+        retry_max=config["PAYMENT_RETRY_MAX"],
+    )
@@ -0,0 +1,73 @@
+from concurrent.futures import ThreadPoolExecutor
+from itertools import repeat
+import threading
+import bcrypt
+from flask import current_app
+
+# bcrypt is CPU-bound by design. Hashing runs in a bounded thread pool so a
+# burst of logins occupies at most PASSWORD_HASH_WORKERS cores instead of
+# every request thread. bcrypt releases the GIL while hashing, so threads
+# run in parallel without forking child processes out of a multithreaded
+# worker, which can deadlock on locks held by other threads at fork time.
+# The pool is created lazily, after any server fork.
+
+_executor = None
+_executor_lock = threading.Lock()
+
+def _hash(password, rounds):
+    return bcrypt.hashpw(password, bcrypt.gensalt(rounds=rounds))
+
+def _check(password, password_hash):
+    return bcrypt.checkpw(password, password_hash)
+
+def _get_executor():
+    """Return the shared pool, or None when hashing runs inline"""
+    global _executor
+    workers = current_app.config["PASSWORD_HASH_WORKERS"]
+    if workers <= 0:
+        return None
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+    return _executor
+
+def _run(func, *args):
+    executor = _get_executor()
+    if executor is None:
+        return func(*args)
+    return executor.submit(func, *args).result()
+
+def hash_password(password):
+    """Hash a password with the configured BCRYPT_ROUNDS cost"""
+    rounds = current_app.config["BCRYPT_ROUNDS"]
+    return _run(_hash, password.encode('utf-8'), rounds).decode('utf-8')
+
+def hash_passwords(plain_passwords):
+    """Hash many passwords at once, spreading them across the pool"""
+    rounds = current_app.config["BCRYPT_ROUNDS"]
+    encoded = [password.encode('utf-8') for password in plain_passwords]
+    executor = _get_executor()
+    if executor is None:
+        hashes = map(_hash, encoded, repeat(rounds))
+    else:
+        hashes = executor.map(_hash, encoded, repeat(rounds))
+    return [password_hash.decode('utf-8') for password_hash in hashes]
+
+def check_password(password, password_hash):
+    """Verify a password against a stored bcrypt hash"""
+    return _run(_check, password.encode('utf-8'), password_hash.encode('utf-8'))
+
+def needs_rehash(password_hash):
+    """True when a hash was made with a cost other than BCRYPT_ROUNDS"""
+    # bcrypt hashes look like $2b$<cost>$<salt+digest>
+    parts = password_hash.split('$')
+    return len(parts) < 4 or parts[2] != f"{current_app.config['BCRYPT_ROUNDS']:02d}"
+
+def shutdown():
+    """Stop the hashing pool (e.g. before forking or at exit)"""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown()
+            _executor = None
@@ -0,0 +1,89 @@
+import random
+import threading
+import time
+import uuid
+
+# Payment gateway interface used by the outbox workers (outbox.py) and
+# /payment/process. A gateway charges an amount under a caller-chosen
+# ``reference`` and must treat a repeated reference as the same charge, so a
+# worker that retries after a timeout or crash never bills a student twice.
+#
+# Only the in-process FakeGateway ships here; a real provider is a subclass
+# registered in GATEWAYS and selected with PAYMENT_GATEWAY.
+
+class PaymentDeclined(Exception):
+    """The gateway refused the charge; retrying will not help"""
+
+class GatewayError(Exception):
+    """The gateway could not be reached or failed; the charge may be retried"""
+
+class PaymentGateway:
+    """Interface every payment provider implements"""
+
+    def charge(self, reference, amount, payment_method):
+        """Charge ``amount`` and return the provider's transaction id.
+
+        Raises PaymentDeclined or GatewayError.
+        """
+        raise NotImplementedError
+
+    def refund(self, transaction_id, amount):
+        """Refund a settled charge; raises GatewayError"""
+        raise NotImplementedError
+
+class FakeGateway(PaymentGateway):
+    """In-process gateway for development, tests and benchmarks.
+
+    Sleeps ``latency`` seconds per call to stand in for the network round
+    trip, fails ``failure_rate`` of calls with GatewayError and declines
+    ``decline_rate`` of new charges.
+    """
+
+    def __init__(self, latency=0.0, failure_rate=0.0, decline_rate=0.0, seed=None):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.decline_rate = decline_rate
+        self.charges = {}  # reference -> (transaction_id, amount)
+        self.refunds = []  # (transaction_id, amount)
+        self.calls = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _call(self):
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            self.calls += 1
+            if self._random.random() < self.failure_rate:
+                raise GatewayError("Gateway timed out")
+
+    def charge(self, reference, amount, payment_method):
+        self._call()
+        with self._lock:
+            if reference in self.charges:
+                return self.charges[reference][0]
+            if self._random.random() < self.decline_rate:
+                raise PaymentDeclined("Card declined")
+            transaction_id = f"TXN_{uuid.uuid4().hex[:8].upper()}"
+            self.charges[reference] = (transaction_id, amount)
+            return transaction_id
+
+    def refund(self, transaction_id, amount):
+        self._call()
+        with self._lock:
+            self.refunds.append((transaction_id, amount))
+
+GATEWAYS = {"fake": FakeGateway}
+
+def create(config):
+    """Payment gateway named by PAYMENT_GATEWAY"""
+    name = config["PAYMENT_GATEWAY"]
+    if name not in GATEWAYS:
+        raise ValueError(f"Unknown PAYMENT_GATEWAY {name!r}; expected one of: {', '.join(sorted(GATEWAYS))}")
+    if name == "fake":
+        return FakeGateway(
+            latency=config["FAKE_GATEWAY_LATENCY"],
+            failure_rate=config["FAKE_GATEWAY_FAILURE_RATE"],
+            decline_rate=config["FAKE_GATEWAY_DECLINE_RATE"],
+        )
+    return GATEWAYS[name]()
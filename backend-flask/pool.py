@@ -0,0 +1,89 @@
+import os
+import time
+from sqlalchemy import event
+from sqlalchemy.exc import DisconnectionError
+from sqlalchemy.pool import QueuePool
+import metrics
+
+# Connection pool plumbing: checkout wait timing for /metrics, the optional
+# idle-only ping that replaces pool_pre_ping, and engine disposal in forked
+# workers so no two processes ever share a pooled socket.
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection"""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            metrics.POOL_CHECKOUT_WAIT.observe(time.perf_counter() - start)
+
+SIZING_OPTIONS = ("pool_size", "max_overflow", "pool_timeout")
+
+def _without_sizing(options):
+    return {key: value for key, value in options.items() if key not in SIZING_OPTIONS}
+
+def engine_options(app):
+    """Engine options for the app's database URL, with the timed pool where it applies"""
+    options = dict(app.config["SQLALCHEMY_ENGINE_OPTIONS"])
+    url = app.config["SQLALCHEMY_DATABASE_URI"]
+    if url.startswith("sqlite") and (url.endswith(":memory:") or url.rstrip("/") == "sqlite:"):
+        # In-memory SQLite runs on a single static connection; there is no pool to size
+        return _without_sizing(options)
+    options["poolclass"] = TimedQueuePool
+    return options
+
+def async_engine_options(url, options):
+    """Engine options for asgi.py; aiosqlite engines are unpooled"""
+    if url.startswith("sqlite"):
+        return _without_sizing(options)
+    return dict(options)
+
+def _ping_idle_connections(engine, idle_seconds):
+    """Ping only connections that sat in the pool longer than ``idle_seconds``"""
+
+    @event.listens_for(engine, "checkin")
+    def mark_checkin(dbapi_connection, connection_record):
+        connection_record.info["checked_in"] = time.monotonic()
+
+    @event.listens_for(engine, "checkout")
+    def ping_if_idle(dbapi_connection, connection_record, connection_proxy):
+        checked_in = connection_record.info.get("checked_in")
+        if checked_in is None or time.monotonic() - checked_in < idle_seconds:
+            return
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute("SELECT 1")
+        except Exception:
+            # The pool retries the checkout with a fresh connection
+            raise DisconnectionError("idle connection failed its ping")
+        finally:
+            try:
+                cursor.close()
+            except Exception:
+                pass
+
+    @event.listens_for(engine, "handle_error")
+    def invalidate_on_disconnect(context):
+        # Connections opened alongside a dead one are likely dead too
+        if context.is_disconnect:
+            context.invalidate_pool_on_disconnect = True
+
+def init_pool(app, db):
+    """Install pool listeners and fork handling on the app's engines"""
+    with app.app_context():
+        engines = list(db.engines.values())
+
+    if not app.config["DB_POOL_PRE_PING"] and app.config["DB_POOL_PING_IDLE"] > 0:
+        for engine in engines:
+            _ping_idle_connections(engine, app.config["DB_POOL_PING_IDLE"])
+
+    def dispose_after_fork():
+        # close=False drops the inherited connections without closing the
+        # parent's sockets; the child opens its own on first checkout
+        for engine in engines:
+            engine.dispose(close=False)
+
+    if hasattr(os, "register_at_fork"):
+        os.register_at_fork(after_in_child=dispose_after_fork)
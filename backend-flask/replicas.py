@@ -0,0 +1,113 @@
+import functools
+import itertools
+import threading
+import time
+from flask import current_app, g, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.sql.dml import UpdateBase
+
+# Read-replica routing. Each DATABASE_REPLICA_URLS entry becomes a
+# Flask-SQLAlchemy bind named replica_<n> (SQLALCHEMY_BINDS in config.py). Routes decorated with
+# @replica_read send their GET queries to a healthy replica, round-robin;
+# everything else, and any INSERT/UPDATE/DELETE, uses the primary.
+#
+# Read-your-writes: a successful response from a @read_your_writes route
+# carries X-Read-Primary-Until (epoch seconds). The client that made the
+# write echoes it back and reads from the primary until then; everyone else
+# keeps reading from the replicas. Cached catalog responses are keyed by
+# the catalog versions read on the same replica (catalog.py), so a lagging
+# replica cannot pin a stale copy in the cache.
+
+REPLICA_PREFIX = "replica_"
+PRIMARY_UNTIL_HEADER = "X-Read-Primary-Until"
+SAFE_METHODS = ("GET", "HEAD")
+
+_counter = itertools.count()
+_lock = threading.Lock()
+_down_until = {}
+
+def replica_read(view):
+    """Mark a view as safe to serve from a read replica"""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        g.replica_read = True
+        return view(*args, **kwargs)
+    return wrapper
+
+def read_your_writes(view):
+    """Give the client of a successful write a token to read it back from the primary"""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        response = current_app.make_response(view(*args, **kwargs))
+        if response.status_code < 400 and _replica_keys(current_app.extensions["sqlalchemy"].engines):
+            response.headers[PRIMARY_UNTIL_HEADER] = primary_token(current_app.config["REPLICA_STICKY_SECONDS"])
+        return response
+    return wrapper
+
+def _replica_keys(engines):
+    return sorted(key for key in engines if key and key.startswith(REPLICA_PREFIX))
+
+def mark_down(key, seconds):
+    """Take a replica out of rotation for ``seconds``"""
+    with _lock:
+        _down_until[key] = time.monotonic() + seconds
+
+def _client_sticky():
+    value = request.headers.get(PRIMARY_UNTIL_HEADER)
+    if not value:
+        return False
+    try:
+        remaining = float(value) - time.time()
+    except ValueError:
+        return False
+    # Ignore tokens further out than the window we would have issued
+    return 0 < remaining <= current_app.config["REPLICA_STICKY_SECONDS"]
+
+def _read_engine(engines):
+    """Pick a replica engine for the current request, or None for the primary"""
+    if not has_request_context() or not g.get("replica_read") or request.method not in SAFE_METHODS:
+        return None
+    if _client_sticky():
+        return None
+    chosen = g.get("replica_bind")
+    if chosen is None:
+        keys = _replica_keys(engines)
+        if not keys:
+            return None
+        now = time.monotonic()
+        start = next(_counter)
+        healthy = [keys[(start + i) % len(keys)] for i in range(len(keys))]
+        healthy = [key for key in healthy if _down_until.get(key, 0) <= now]
+        if not healthy:
+            return None
+        # Keep one request on one replica so its reads are consistent
+        chosen = g.replica_bind = healthy[0]
+    return engines[chosen]
+
+def primary_token(sticky_seconds):
+    """The read-your-writes token for a write committed now"""
+    return f"{time.time() + sticky_seconds:.3f}"
+
+class RoutingSession(Session):
+    """Session that sends reads from @replica_read views to a replica"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and not isinstance(clause, UpdateBase):
+            engine = _read_engine(self._db.engines)
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+def init_replicas(app, db):
+    """Watch replica health"""
+    with app.app_context():
+        replicas = {key: db.engines[key] for key in _replica_keys(db.engines)}
+
+    for key, engine in replicas.items():
+        def on_error(context, key=key):
+            if context.is_disconnect or isinstance(context.sqlalchemy_exception, OperationalError):
+                app.logger.warning("Replica %s failed, routing reads elsewhere: %s", key, context.original_exception)
+                mark_down(key, app.config["REPLICA_RETRY_SECONDS"])
+        event.listen(engine, "handle_error", on_error)
@@ -0,0 +1,154 @@
+from datetime import date, timedelta
+import re
+from sqlalchemy import Text, case, column, func, inspect, literal, literal_column, or_, select, table, text
+from models import Event
+
+# Full-text, faceted event search for /events/search.
+#
+# Title, description, location, organizer and tags are indexed per dialect:
+# PostgreSQL gets a weighted tsvector generated column with a GIN index,
+# SQLite an FTS5 table kept in sync by triggers (see migrations.py). Any
+# other database, or SQLite built without FTS5, falls back to LIKE matching
+# without ranking. Every search term matches as a prefix, so results make
+# sense while the user is still typing.
+
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(location, '') || ' ' || coalesce(organizer, '') "
+    "|| ' ' || coalesce(tags::text, '')), 'C')"
+)
+
+FTS_TABLE = "events_fts"
+FTS_COLUMNS = ("title", "description", "location", "organizer", "tags")
+FTS_WEIGHTS = (10.0, 4.0, 2.0, 2.0, 2.0)  # bm25 weight per FTS_COLUMNS entry
+
+MAX_TERMS = 8
+MAX_OFFSET = 1000
+
+DATE_BUCKETS = ("past", "this_week", "this_month", "later")
+PRICE_BANDS = ("free", "under_500", "500_to_999", "1000_plus")
+
+def terms(q):
+    """Split a raw query into at most MAX_TERMS lower-cased word tokens"""
+    return re.findall(r"\w+", (q or "").lower())[:MAX_TERMS]
+
+def detect_backend(connection):
+    """Return "postgresql", "fts5" or "like" for the search index this database has"""
+    dialect = connection.dialect.name
+    if dialect == "postgresql":
+        columns = {c["name"] for c in inspect(connection).get_columns("events")}
+        return "postgresql" if "search_vector" in columns else "like"
+    if dialect == "sqlite":
+        found = connection.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": FTS_TABLE}
+        ).first()
+        return "fts5" if found else "like"
+    return "like"
+
+def match(stmt, backend, words):
+    """Restrict an Event select to rows matching every term.
+
+    Returns (stmt, rank) where higher ``rank`` means a better match.
+    """
+    if not words:
+        return stmt, literal(0.0)
+
+    if backend == "postgresql":
+        vector = literal_column("events.search_vector")
+        query = func.to_tsquery("english", " & ".join(f"{word}:*" for word in words))
+        return stmt.where(vector.op("@@")(query)), func.ts_rank_cd(vector, query)
+
+    if backend == "fts5":
+        fts = table(FTS_TABLE, column("rowid"), column(FTS_TABLE))
+        query = " ".join(f'"{word}"*' for word in words)
+        stmt = stmt.join(fts, fts.c.rowid == Event.id).where(fts.c[FTS_TABLE].op("MATCH")(query))
+        # bm25() is lower-is-better
+        return stmt, -func.bm25(literal_column(FTS_TABLE), *FTS_WEIGHTS)
+
+    fields = [Event.title, Event.description, Event.location, Event.organizer, Event.tags.cast(Text)]
+    for word in words:
+        pattern = f"%{word}%"
+        stmt = stmt.where(or_(*[field.ilike(pattern) for field in fields]))
+    return stmt, literal(0.0)
+
+def date_bucket(today=None):
+    """CASE expression naming each event's DATE_BUCKETS entry"""
+    today = today or date.today()
+    return case(
+        (Event.date < today, "past"),
+        (Event.date < today + timedelta(days=7), "this_week"),
+        (Event.date < today + timedelta(days=30), "this_month"),
+        else_="later",
+    )
+
+def price_band():
+    """CASE expression naming each event's PRICE_BANDS entry"""
+    price = func.coalesce(Event.price, 0)
+    return case(
+        (price <= 0, "free"),
+        (price < 500, "under_500"),
+        (price < 1000, "500_to_999"),
+        else_="1000_plus",
+    )
+
+def parse_search_params(params, max_page_size):
+    """Parse q/category/date/price/limit/offset. Returns (args, None) or (None, message)."""
+    args = {
+        "q": (params.get("q") or "").strip(),
+        "category": params.get("category") or None,
+        "date": params.get("date") or None,
+        "price": params.get("price") or None,
+        "limit": 20,
+        "offset": 0,
+    }
+    if args["date"] and args["date"] not in DATE_BUCKETS:
+        return None, f"date must be one of: {', '.join(DATE_BUCKETS)}"
+    if args["price"] and args["price"] not in PRICE_BANDS:
+        return None, f"price must be one of: {', '.join(PRICE_BANDS)}"
+    for key, upper in (("limit", max_page_size), ("offset", MAX_OFFSET)):
+        value = params.get(key)
+        if value:
+            if not value.isdigit() or (key == "limit" and int(value) < 1):
+                return None, f"{key} must be a {'positive' if key == 'limit' else 'non-negative'} integer"
+            args[key] = min(int(value), upper)
+    return args, None
+
+def search(session, args, columns, backend, today=None):
+    """Run one search and return (rows, facets, total).
+
+    ``rows`` are the requested page as tuples of ``columns`` followed by the
+    rank. Facet counts cover every active event matching ``q``, ignoring the
+    category/date/price filters so each facet still lists its alternatives;
+    ``total`` counts the matches with the filters applied. Both come from one
+    grouped query. Date buckets are relative to ``today``.
+    """
+    words = terms(args["q"])
+    bucket, band = date_bucket(today), price_band()
+    matched, rank = match(select(Event.id).where(Event.status == "active"), backend, words)
+
+    grouped = matched.with_only_columns(
+        Event.category, bucket.label("bucket"), band.label("band"), func.count().label("count"),
+        maintain_column_froms=True,
+    ).group_by(Event.category, bucket, band)
+    facets = {"category": {}, "date": dict.fromkeys(DATE_BUCKETS, 0), "price": dict.fromkeys(PRICE_BANDS, 0)}
+    total = 0
+    for category, row_bucket, row_band, count in session.execute(grouped):
+        facets["category"][category] = facets["category"].get(category, 0) + count
+        facets["date"][row_bucket] += count
+        facets["price"][row_band] += count
+        if (args["category"] in (None, category) and args["date"] in (None, row_bucket)
+                and args["price"] in (None, row_band)):
+            total += count
+
+    page = matched
+    if args["category"]:
+        page = page.where(Event.category == args["category"])
+    if args["date"]:
+        page = page.where(bucket == args["date"])
+    if args["price"]:
+        page = page.where(band == args["price"])
+    page = page.with_only_columns(*columns, rank.label("rank"), maintain_column_froms=True).order_by(
+        rank.desc(), Event.date, Event.id
+    ).limit(args["limit"]).offset(args["offset"])
+    return session.execute(page).all(), facets, total
@@ -0,0 +1,178 @@
+from flask import has_request_context, request
+from flask.json.provider import DefaultJSONProvider
+from models import Event, Student
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - stdlib json fallback
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - JSON only
+    msgpack = None
+
+MSGPACK_MIMETYPE = "application/msgpack"
+MSGPACK_MIMETYPES = (MSGPACK_MIMETYPE, "application/x-msgpack")
+
+# Schema-driven serializers for the read-heavy list routes. A schema maps
+# response keys to columns (plus converters) and computed keys to the
+# columns they derive from. For a set of requested fields it compiles, once,
+# the minimal column list to SELECT and an encoder turning each result tuple
+# into the response dict: no ORM objects, identity map or to_dict() per row.
+# Output matches the models' to_dict() plus the keys the routes add.
+
+def _iso(value):
+    return value.isoformat() if value else None
+
+def _hhmm(value):
+    return value.strftime('%H:%M') if value else None
+
+def _money(value):
+    return float(value) if value else 0.0
+
+def _list(value):
+    return value or []
+
+def _price_formatted(price):
+    return f"₹{price:.2f}" if price > 0 else "Free"
+
+class Schema:
+    """Column-level serializer for one model's response dicts"""
+
+    def __init__(self, fields, computed=None):
+        self.fields = fields  # key -> (column, converter or None)
+        self.computed = computed or {}  # key -> (source columns, function)
+        self._plans = {}
+
+    def extend(self, fields=None, computed=None):
+        """Return a schema with extra direct and computed keys"""
+        return Schema({**self.fields, **(fields or {})}, {**self.computed, **(computed or {})})
+
+    def plan(self, fields=None):
+        """Return (columns, encode) for the requested ``fields`` (None for all)"""
+        key = frozenset(fields) if fields is not None else None
+        plan = self._plans.get(key)
+        if plan is None:
+            plan = self._plans[key] = self._compile(fields)
+        return plan
+
+    def _compile(self, fields):
+        names = [name for name in (*self.fields, *self.computed) if fields is None or name in fields]
+        columns, index = [], {}
+
+        def source(column):
+            if column.key not in index:
+                index[column.key] = len(columns)
+                columns.append(column)
+            return index[column.key]
+
+        direct = [(name, source(self.fields[name][0]), self.fields[name][1]) for name in names if name in self.fields]
+        computed = [
+            (name, [source(column) for column in self.computed[name][0]], self.computed[name][1])
+            for name in names if name in self.computed
+        ]
+
+        def encode(row):
+            item = {name: convert(row[i]) if convert else row[i] for name, i, convert in direct}
+            for name, indexes, function in computed:
+                item[name] = function(*[row[i] for i in indexes])
+            return item
+
+        return columns, encode
+
+EVENT = Schema({
+    'id': (Event.id, None),
+    'title': (Event.title, None),
+    'description': (Event.description, None),
+    'date': (Event.date, _iso),
+    'time': (Event.time, _hhmm),
+    'duration': (Event.duration, None),
+    'location': (Event.location, None),
+    'category': (Event.category, None),
+    'capacity': (Event.capacity, None),
+    'price': (Event.price, _money),
+    'image': (Event.image, None),
+    'organizer': (Event.organizer, None),
+    'status': (Event.status, None),
+    'tags': (Event.tags, _list),
+    'created_at': (Event.created_at, _iso),
+    'updated_at': (Event.updated_at, _iso),
+})
+
+# /events
+PUBLIC_EVENT = EVENT.extend(computed={
+    'price_formatted': ((Event.price,), _price_formatted),
+})
+
+# /student/events and /events/<id>
+STUDENT_EVENT = PUBLIC_EVENT.extend(computed={
+    'available_spots': ((Event.capacity, Event.seats_taken), lambda capacity, taken: max(0, capacity - taken)),
+    'is_full': ((Event.capacity, Event.seats_taken), lambda capacity, taken: capacity - taken <= 0),
+})
+
+# /admin/events
+ADMIN_EVENT = PUBLIC_EVENT.extend(
+    fields={'revenue': (Event.revenue, _money)},
+    computed={'registration_count': ((Event.seats_taken,), lambda taken: taken)},
+)
+
+STUDENT = Schema({
+    'id': (Student.id, None),
+    'name': (Student.name, None),
+    'email': (Student.email, None),
+    'phone': (Student.phone, None),
+    'usn': (Student.usn, None),
+    'semester': (Student.semester, None),
+    'branch': (Student.branch, None),
+    'is_active': (Student.is_active, None),
+    'created_at': (Student.created_at, _iso),
+    'updated_at': (Student.updated_at, _iso),
+})
+
+def wants_msgpack(req):
+    """Whether ``req`` asked for MessagePack and it is installed.
+
+    Asked for with ``?format=msgpack`` or an Accept header preferring
+    application/msgpack over application/json.
+    """
+    if msgpack is None:
+        return False
+    if req.args.get("format") == "msgpack":
+        return True
+    return req.accept_mimetypes.best_match(("application/json",) + MSGPACK_MIMETYPES) in MSGPACK_MIMETYPES
+
+class FastJSONProvider(DefaultJSONProvider):
+    """JSON provider encoding with orjson when it is installed.
+
+    Keys stay sorted so bodies and ETags are stable. Dates, decimals and
+    other types orjson does not handle natively go through Flask's usual
+    conversions, so responses mean the same as with the stdlib encoder.
+    """
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None:
+            return super().dumps(obj, **kwargs)
+        option = (
+            orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+            | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+        )
+        if kwargs.get("indent"):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option).decode("utf-8")
+
+    def packb(self, obj):
+        """Encode ``obj`` as MessagePack, converting other types as dumps() does"""
+        return msgpack.packb(obj, default=self.default, use_bin_type=True)
+
+    def response(self, *args, **kwargs):
+        """jsonify(), answering in MessagePack when the request negotiated it"""
+        if msgpack is None or not has_request_context():
+            return super().response(*args, **kwargs)
+        if wants_msgpack(request):
+            obj = self._prepare_response_obj(args, kwargs)
+            response = self._app.response_class(self.packb(obj), mimetype=MSGPACK_MIMETYPE)
+        else:
+            response = super().response(*args, **kwargs)
+        response.vary.add("Accept")
+        return response
@@ -0,0 +1,76 @@
+import base64
+import hashlib
+import hmac
+import json
+import time
+
+# Stateless student session tokens. /student/login issues a token signed
+# with HMAC-SHA256 over SECRET_KEY that carries the student id, the active
+# flag at login and an expiry, so authenticated routes verify who is calling
+# without a database round trip or another bcrypt check:
+#
+#     v1.<base64url(claims JSON)>.<base64url(signature)>
+#
+# Tokens cannot be revoked one by one. Deactivating a student evicts them
+# from the principal cache and marks them inactive there, which rejects
+# their tokens in that process at once; other processes stop accepting them
+# when their cached principal expires (PRINCIPAL_CACHE_TTL) or the token
+# does (SESSION_TTL). Framework-agnostic: the Flask and ASGI apps share it.
+
+VERSION = "v1"
+SCHEME = "Bearer"
+
+def _b64encode(data):
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+def _b64decode(text):
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+def _sign(secret, message):
+    return hmac.new(secret.encode("utf-8"), message.encode("ascii"), hashlib.sha256).digest()
+
+def issue(secret, student_id, is_active, ttl, now=None):
+    """Return (token, expires_at) for a student session lasting ``ttl`` seconds"""
+    now = int(now if now is not None else time.time())
+    claims = {"sub": student_id, "act": bool(is_active), "iat": now, "exp": now + ttl}
+    payload = _b64encode(json.dumps(claims, separators=(",", ":"), sort_keys=True).encode("utf-8"))
+    message = f"{VERSION}.{payload}"
+    return f"{message}.{_b64encode(_sign(secret, message))}", claims["exp"]
+
+def verify(secret, token, now=None):
+    """Return the claims of a valid, unexpired token, else None"""
+    try:
+        version, payload, signature = token.split(".")
+        if version != VERSION:
+            return None
+        if not hmac.compare_digest(_b64decode(signature), _sign(secret, f"{version}.{payload}")):
+            return None
+        claims = json.loads(_b64decode(payload))
+    except (ValueError, TypeError):
+        return None
+    if not isinstance(claims, dict) or not isinstance(claims.get("sub"), str):
+        return None
+    if claims.get("exp", 0) <= (now if now is not None else time.time()):
+        return None
+    return claims
+
+def authenticate(authorization, secret, cached_principal):
+    """Resolve an Authorization header to a student id without touching the database.
+
+    ``cached_principal(student_id)`` returns the principal dict if it is
+    cached, else None. Returns (student_id, None) for a valid session,
+    (None, None) when no token was sent and (None, message) when the token
+    is rejected.
+    """
+    if not authorization:
+        return None, None
+    scheme, _, token = authorization.partition(" ")
+    if scheme != SCHEME or not token:
+        return None, "Authorization must be a Bearer session token"
+    claims = verify(secret, token.strip())
+    if claims is None:
+        return None, "Invalid or expired session"
+    principal = cached_principal(claims["sub"])
+    if not claims.get("act") or (principal is not None and not principal.get("is_active")):
+        return None, "Account is deactivated"
+    return claims["sub"], None
@@ -0,0 +1,118 @@
+import contextlib
+import os
+import tempfile
+from datetime import date, time as time_of_day, timedelta
+import pytest
+
+# The app reads its config at import time, so point it at a throwaway
+# database first. TEST_DATABASE_URL runs the suite against e.g. Postgres.
+# SQLite serializes writers, so the concurrency tests need generous lock
+# and pool waits.
+os.environ["DATABASE_URL"] = (
+    os.getenv("TEST_DATABASE_URL") or "sqlite:///" + os.path.join(tempfile.mkdtemp(), "test.db") + "?timeout=60"
+)
+os.environ.setdefault("DB_POOL_TIMEOUT", "60")
+os.environ.setdefault("SLOW_REQUEST_MS", "0")
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+os.environ.setdefault("PASSWORD_HASH_WORKERS", "0")
+os.environ.setdefault("FAKE_GATEWAY_LATENCY", "0")
+
+@pytest.fixture(scope="session")
+def app():
+    from app import app
+    from migrations import run_migrations
+    from models import db
+    with app.app_context():
+        db.create_all()
+        run_migrations()
+    return app
+
+@pytest.fixture
+def database(app, monkeypatch):
+    """Empty tables and fresh in-process caches for every test"""
+    import admission
+    import app as app_module
+    from cache import LRUCache
+    from models import db
+    with app.app_context():
+        for table in reversed(db.metadata.sorted_tables):
+            db.session.execute(table.delete())
+        db.session.commit()
+    app_module.catalog_cache.bump()
+    app_module.dashboard_cache.clear()
+    monkeypatch.setattr(app_module, "principal_cache", LRUCache(app.config["PRINCIPAL_CACHE_SIZE"]))
+    monkeypatch.setattr(app_module, "registration_gate", admission.create(app.config))
+    return db
+
+@pytest.fixture
+def client(app, database):
+    return app.test_client()
+
+@pytest.fixture
+def make_event(app, database):
+    """Insert an active event; returns its id"""
+    from models import Event
+
+    def make_event(**values):
+        values = {
+            "title": "Test Event", "description": "An event", "date": date.today() + timedelta(days=30),
+            "time": time_of_day(10, 0), "location": "Main Hall", "category": "Technology",
+            "capacity": 100, "price": 0, "status": "active", **values,
+        }
+        with app.app_context():
+            event = Event(**values)
+            database.session.add(event)
+            database.session.commit()
+            return event.id
+    return make_event
+
+@pytest.fixture
+def make_students(app, database):
+    """Insert ``count`` students; returns their ids"""
+    from models import Student
+
+    def make_students(count, prefix="S"):
+        ids = [f"{prefix}{i:06d}" for i in range(count)]
+        with app.app_context():
+            database.session.execute(database.insert(Student), [{
+                "id": student_id, "usn": student_id, "name": f"Student {student_id}",
+                "email": f"{student_id.lower()}@example.com", "semester": 1,
+                "branch": "Computer Science", "password_hash": "", "is_active": True,
+            } for student_id in ids])
+            database.session.commit()
+        return ids
+    return make_students
+
+@pytest.fixture
+def count_queries(app, database):
+    """Context manager collecting the SQL statements run inside it"""
+    from sqlalchemy import event
+
+    @contextlib.contextmanager
+    def count_queries():
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        with app.app_context():
+            engine = database.engine
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+    return count_queries
+
+@pytest.fixture
+def write_elsewhere(app, database):
+    """Update an event the way another worker process would: no local cache bump"""
+    import catalog
+    from models import Event
+
+    def write_elsewhere(event_id, **values):
+        with app.app_context():
+            with database.engine.begin() as connection:
+                connection.execute(database.update(Event).where(Event.id == event_id).values(**values))
+                connection.execute(catalog.bump_statement(connection.dialect, event_id))
+    return write_elsewhere
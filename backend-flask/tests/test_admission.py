@@ -0,0 +1,38 @@
+import threading
+import idempotency
+
+def register(client, event_id, student_id, key=None):
+    headers = {idempotency.HEADER: key} if key else {}
+    return client.post("/student/register-event", json={"event_id": event_id, "student_id": student_id}, headers=headers)
+
+def test_full_event_still_answers_registered_students(client, make_event, make_students):
+    event_id = make_event(capacity=1)
+    first, second = make_students(2)
+    assert register(client, event_id, first, key="attempt-1").status_code == 201
+
+    # The gate now knows the event is full
+    assert register(client, event_id, second).get_json()["message"] == "Event is full"
+    duplicate = register(client, event_id, first)
+    assert duplicate.status_code == 400
+    assert duplicate.get_json()["message"] == "Already registered for this event"
+    retry = register(client, event_id, first, key="attempt-1")
+    assert retry.status_code == 201
+    assert retry.headers[idempotency.REPLAYED_HEADER] == "true"
+
+def test_concurrent_retries_of_one_key_replay_past_the_gate(app, make_event, make_students):
+    event_id = make_event(capacity=1)
+    student_id, = make_students(1)
+    start = threading.Barrier(10)
+    statuses = []
+
+    def attempt():
+        client = app.test_client()
+        start.wait()
+        statuses.append(register(client, event_id, student_id, key="same-attempt").status_code)
+
+    threads = [threading.Thread(target=attempt) for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert statuses == [201] * 10
@@ -0,0 +1,66 @@
+import asyncio
+import pytest
+import idempotency
+
+def get(path, **kwargs):
+    import asgi
+
+    async def request():
+        return await asgi.quart_app.test_client().get(path, **kwargs)
+    return asyncio.run(request())
+
+def test_cors_exposes_the_same_headers_as_the_sync_app(client):
+    exposed = get("/health").headers["Access-Control-Expose-Headers"]
+    sync_exposed = client.get("/health", headers={"Origin": "http://localhost:3000"}).headers["Access-Control-Expose-Headers"]
+    assert idempotency.REPLAYED_HEADER in exposed
+    assert sorted(exposed.split(", ")) == sorted(sync_exposed.split(", "))
+
+def register(event_id, student_id):
+    """POST /student/register-event to the async app; returns (status, body)"""
+    import asgi
+
+    async def request():
+        response = await asgi.quart_app.test_client().post(
+            "/student/register-event", json={"event_id": event_id, "student_id": student_id}
+        )
+        return response.status_code, await response.get_json()
+    return asyncio.run(request())
+
+def test_full_event_still_answers_registered_students(make_event, make_students):
+    event_id = make_event(capacity=1)
+    first, second = make_students(2)
+    assert register(event_id, first)[0] == 201
+    # The gate learned from that commit that the event is full
+    assert register(event_id, second) == (400, {"status": "error", "message": "Event is full", "waitlist": True})
+    assert register(event_id, first)[1]["message"] == "Already registered for this event"
+
+def test_catalog_routes_negotiate_msgpack(client, make_event):
+    msgpack = pytest.importorskip("msgpack")
+    event_id = make_event()
+    as_json = client.get(f"/events/{event_id}")
+    as_msgpack = get(f"/events/{event_id}", headers={"Accept": "application/msgpack"})
+    assert as_msgpack.mimetype == "application/msgpack"
+    assert msgpack.unpackb(asyncio.run(as_msgpack.get_data())) == as_json.get_json()
+    # Shared with the sync app's cache, with its own ETag
+    assert as_msgpack.headers["ETag"] != as_json.headers["ETag"]
+    assert get(f"/events/{event_id}", headers={
+        "Accept": "application/msgpack", "If-None-Match": as_msgpack.headers["ETag"]
+    }).status_code == 304
+
+def test_registration_casts_event_id_and_publishes_off_the_loop(make_event, make_students, monkeypatch):
+    import threading
+    import app as app_module
+    event_id = make_event(capacity=5)
+    student_id, = make_students(1)
+    publishers = []
+    monkeypatch.setattr(app_module.seat_updates, "publish", lambda delta: publishers.append(threading.current_thread()))
+    status, body = register(str(event_id), student_id)
+    assert (status, body["event"]["id"]) == (201, event_id)
+    # The (possibly Redis) publish ran on an executor thread
+    assert publishers and threading.main_thread() not in publishers
+    assert register("abc", student_id) == (400, {"status": "error", "message": "event_id must be an integer"})
+
+def test_async_routes_follow_app_config(app, make_event, make_students, monkeypatch):
+    monkeypatch.setitem(app.config, "SESSION_REQUIRED", True)
+    student_id, = make_students(1)
+    assert register(make_event(), student_id) == (401, {"status": "error", "message": "Login required"})
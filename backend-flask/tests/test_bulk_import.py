@@ -0,0 +1,31 @@
+import json
+from models import db, Event, Student
+
+def _ndjson(rows):
+    return "\n".join(json.dumps(row) for row in rows) + "\n"
+
+def _event(**values):
+    return {"title": "Imported", "description": "An event", "date": "2026-11-01", "time": "10:00",
+            "location": "Main Hall", "category": "Technology", "capacity": 50, "price": 100, **values}
+
+def test_ndjson_values_of_the_wrong_type_are_row_errors(app, client):
+    rows = [_event(title="First"), _event(date=20261101), _event(title="Free", price=0.0), _event(price=None)]
+    response = client.post("/admin/import?type=events&format=ndjson&batch_size=1", data=_ndjson(rows))
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["imported"] == 2
+    assert body["errors"] == [{"row": 2, "message": "date must be a string"},
+                              {"row": 4, "message": "price is required"}]
+    with app.app_context():
+        assert db.session.execute(db.select(Event.title, Event.price).order_by(Event.title)).all() == [
+            ("First", 100), ("Free", 0)]
+
+def test_numeric_usn_is_a_row_error(app, client):
+    student = {"usn": "1XX22CS001", "name": "Student", "email": "s@example.com", "password": "secret123",
+               "semester": 3, "branch": "Computer Science"}
+    rows = [{**student, "usn": 12345}, student]
+    response = client.post("/admin/import?type=students&format=ndjson", data=_ndjson(rows))
+    body = response.get_json()
+    assert (body["imported"], body["errors"]) == (1, [{"row": 1, "message": "usn must be a string"}])
+    with app.app_context():
+        assert db.session.scalars(db.select(Student.usn)).all() == ["1XX22CS001"]
@@ -0,0 +1,59 @@
+import pytest
+import catalog
+from models import db, Event
+
+def test_event_sees_other_workers_writes(client, make_event, write_elsewhere):
+    event_id = make_event(capacity=10)
+    first = client.get(f"/events/{event_id}")
+    assert first.get_json()["available_spots"] == 10
+    # Cached: revalidation is a 304
+    assert client.get(f"/events/{event_id}", headers={"If-None-Match": first.headers["ETag"]}).status_code == 304
+
+    write_elsewhere(event_id, seats_taken=4)
+    second = client.get(f"/events/{event_id}", headers={"If-None-Match": first.headers["ETag"]})
+    assert second.status_code == 200
+    assert second.get_json()["available_spots"] == 6
+
+def test_catalog_lists_see_other_workers_writes(app, client, make_event):
+    make_event(title="First")
+    assert [event["title"] for event in client.get("/events").get_json()] == ["First"]
+
+    make_event(title="Second")  # inserted behind this process's back
+    with app.app_context():
+        with db.engine.begin() as connection:
+            connection.execute(catalog.bump_statement(connection.dialect))
+    assert sorted(event["title"] for event in client.get("/events").get_json()) == ["First", "Second"]
+
+def test_unshared_cache_skips_the_version_query(app, client, make_event, count_queries, monkeypatch):
+    monkeypatch.setitem(app.config, "CATALOG_CACHE_SHARED", False)
+    event_id = make_event()
+    client.get(f"/events/{event_id}")
+    with count_queries() as statements:
+        assert client.get(f"/events/{event_id}").status_code == 200
+    assert statements == []
+
+@pytest.mark.parametrize("scope", [None, 7])
+def test_bump_statement_counts_up(app, database, scope):
+    with app.app_context():
+        for expected in (1, 2):
+            with db.engine.begin() as connection:
+                connection.execute(catalog.bump_statement(connection.dialect, scope))
+                rows = connection.execute(catalog.versions_statement(scope)).all()
+            assert catalog.versions(rows, scope)[-1] == expected
+
+@pytest.mark.parametrize("path", ["/events", "/events/{event_id}", "/categories", "/events/search?q=hackathon"])
+def test_catalog_routes_negotiate_msgpack(client, make_event, path):
+    msgpack = pytest.importorskip("msgpack")
+    path = path.format(event_id=make_event(title="Hackathon"))
+    as_json = client.get(path)
+    as_msgpack = client.get(path, headers={"Accept": "application/msgpack"})
+    assert as_msgpack.mimetype == "application/msgpack"
+    assert msgpack.unpackb(as_msgpack.data) == as_json.get_json()
+    for response in (as_json, as_msgpack):
+        assert "Accept" in [value.strip() for value in response.headers["Vary"].split(",")]
+    assert as_msgpack.headers["ETag"] != as_json.headers["ETag"]
+
+    # Each representation revalidates against its own ETag
+    cached = client.get(path, headers={"Accept": "application/msgpack", "If-None-Match": as_msgpack.headers["ETag"]})
+    assert cached.status_code == 304
+    assert client.get(path, headers={"If-None-Match": as_msgpack.headers["ETag"]}).status_code == 200
@@ -0,0 +1,45 @@
+import threading
+import time
+import app as app_module
+
+def test_sse_response_ends_and_resumes(app, client, monkeypatch):
+    monkeypatch.setitem(app.config, "STREAM_SYNC_MAX_WAIT", 1)
+    monkeypatch.setitem(app.config, "STREAM_KEEPALIVE", 1)
+    seat_updates = app_module.seat_updates
+    since = seat_updates.version
+    threading.Timer(0.2, seat_updates.publish, [{"id": 1, "available_spots": 3, "is_full": False}]).start()
+
+    started = time.monotonic()
+    response = client.get("/events/stream", headers={"Accept": "text/event-stream", "Last-Event-ID": str(since)})
+    body = response.get_data(as_text=True)
+    assert time.monotonic() - started < 3  # the request thread is given back
+    assert body.startswith(f"retry: {app.config['STREAM_RETRY_MS']}\n\n")
+    assert f"id: {since + 1}\nevent: seats\n" in body
+
+    # The reconnect resumes where the last response stopped
+    resumed = client.get("/events/stream?wait=5", headers={"Last-Event-ID": str(since + 1)})
+    assert resumed.get_json()["changes"] == []
+
+def test_long_poll_is_capped(app, client, monkeypatch):
+    monkeypatch.setitem(app.config, "STREAM_SYNC_MAX_WAIT", 0)
+    since = app_module.seat_updates.version
+    started = time.monotonic()
+    response = client.get(f"/events/stream?since={since}&wait=30")
+    assert time.monotonic() - started < 1
+    assert response.get_json() == {"version": since, "changes": [], "reset": False}
+
+def test_seat_watcher_announces_other_processes_writes(client, make_event, make_students, write_elsewhere):
+    event_id = make_event(capacity=10)
+    student_id, = make_students(1)
+    watcher, seat_updates = app_module.seat_watcher, app_module.seat_updates
+    watcher.poll()  # records where the counters stand
+    since = seat_updates.version
+
+    write_elsewhere(event_id, seats_taken=10)
+    assert watcher.poll() == [event_id]
+    assert seat_updates.changes_since(since)[1] == [{"id": event_id, "available_spots": 0, "is_full": True}]
+    # The admission gate heard it too: turned away without reserving
+    response = client.post("/student/register-event", json={"event_id": event_id, "student_id": student_id})
+    assert response.get_json()["message"] == "Event is full"
+    assert app_module.registration_gate.stats["full"] == 1
+    assert watcher.poll() == []
@@ -0,0 +1,26 @@
+import idempotency
+import sessions
+from models import db, Registration
+
+def session_headers(app, student_id, key):
+    token, _ = sessions.issue(app.config["SECRET_KEY"], student_id, True, 3600)
+    return {"Authorization": f"Bearer {token}", idempotency.HEADER: key}
+
+def test_same_key_and_body_from_another_student_is_not_replayed(app, client, make_event, make_students):
+    event_id = make_event()
+    first, second = make_students(2)
+    body = {"event_id": event_id}  # the session names the student
+
+    created = client.post("/student/register-event", json=body, headers=session_headers(app, first, "shared-key"))
+    assert created.status_code == 201
+    other = client.post("/student/register-event", json=body, headers=session_headers(app, second, "shared-key"))
+    assert other.status_code == 422
+    assert idempotency.REPLAYED_HEADER not in other.headers
+    assert first not in other.get_data(as_text=True)
+
+    # The owner's retry still replays
+    retry = client.post("/student/register-event", json=body, headers=session_headers(app, first, "shared-key"))
+    assert retry.headers[idempotency.REPLAYED_HEADER] == "true"
+    assert retry.get_json()["registration"]["student_id"] == first
+    with app.app_context():
+        assert db.session.query(Registration).filter_by(event_id=event_id).count() == 1
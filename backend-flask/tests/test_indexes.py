@@ -0,0 +1,53 @@
+import pytest
+from sqlalchemy import select, text
+from models import db, Registration
+
+# The hot registration lookups must be served from an index, not a full
+# table scan, on a realistically sized table.
+
+def plan(connection, stmt):
+    """(full scans, index accesses) on registrations in ``stmt``'s query plan"""
+    sql = str(stmt.compile(dialect=connection.dialect, compile_kwargs={"literal_binds": True}))
+    if connection.dialect.name == "postgresql":
+        nodes, pending = [], [connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}").scalar()[0]["Plan"]]
+        while pending:
+            node = pending.pop()
+            pending.extend(node.get("Plans", []))
+            if node.get("Relation Name") == "registrations" or node.get("Index Name", "").startswith(("ix_registrations", "uq_registration")):
+                nodes.append(node["Node Type"])
+        return [node for node in nodes if node == "Seq Scan"], [node for node in nodes if "Index" in node]
+    details = [row[3] for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}")]
+    details = [detail for detail in details if " registrations" in detail]
+    return [detail for detail in details if "USING" not in detail], [detail for detail in details if "INDEX" in detail]
+
+@pytest.mark.slow
+def test_hot_registration_queries_use_indexes(app, database):
+    from bench.seed import seed
+
+    with app.app_context():
+        seed("100k")
+        database.session.commit()
+        student_id, event_id = database.session.execute(
+            select(Registration.student_id, Registration.event_id).limit(1)
+        ).one()
+        queries = {
+            "student registrations": select(Registration).where(Registration.student_id == student_id),
+            "event registrations": select(Registration).where(Registration.event_id == event_id),
+            "event paid registrations": select(Registration).where(
+                Registration.event_id == event_id, Registration.payment_status == 'paid'
+            ),
+            "registrations page": select(Registration).order_by(
+                Registration.registered_at.desc(), Registration.id.desc()
+            ).limit(50),
+            "duplicate check": select(Registration.id).where(
+                Registration.event_id == event_id, Registration.student_id == student_id
+            ),
+        }
+        with db.engine.connect() as connection:
+            connection.execute(text("ANALYZE"))
+            connection.commit()
+            assert connection.execute(select(db.func.count()).select_from(Registration)).scalar() == 100_000
+            for name, stmt in queries.items():
+                scans, index_accesses = plan(connection, stmt)
+                assert not scans, f"{name} scans the whole table: {scans}"
+                assert index_accesses, f"{name} uses no index"
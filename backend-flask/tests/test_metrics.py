@@ -0,0 +1,31 @@
+import time
+import pytest
+from flask import g
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from models import db
+
+def test_failed_statements_leave_nothing_on_the_connection(app, database):
+    with app.app_context():
+        with db.engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+            before = {key: list(value) if isinstance(value, list) else value for key, value in connection.info.items()}
+            for _ in range(3):
+                with pytest.raises(OperationalError):
+                    connection.execute(text("SELECT * FROM no_such_table"))
+                connection.rollback()
+            connection.execute(text("SELECT 1"))
+            assert connection.info == before
+
+def test_failed_statement_does_not_skew_later_timings(app, database):
+    with app.test_request_context("/health"):
+        app.preprocess_request()
+        with pytest.raises(OperationalError):
+            db.session.execute(text("SELECT * FROM no_such_table"))
+        db.session.rollback()
+        time.sleep(0.2)
+        db.session.execute(text("SELECT 1"))
+        stats = g.request_stats
+        assert stats["queries"] == 1
+        # Timed from its own start, not from the failed statement's
+        assert stats["db_time"] < 0.1
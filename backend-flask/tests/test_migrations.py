@@ -0,0 +1,61 @@
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import MetaData, inspect
+import migrations
+from models import Event, PaymentOutbox, Registration, Student
+
+UNIQUE = "uq_registration_event_student"
+
+@pytest.fixture
+def registrations_without_unique(app, database):
+    """The registrations table as it was before uq_registration_event_student"""
+    with app.app_context():
+        engine = database.engine
+    with engine.begin() as connection:
+        if engine.dialect.name == "postgresql":
+            connection.exec_driver_sql(f"ALTER TABLE registrations DROP CONSTRAINT {UNIQUE}")
+        else:
+            # SQLite cannot drop a table constraint; recreate the table without it
+            metadata = MetaData()
+            Event.__table__.to_metadata(metadata)
+            Student.__table__.to_metadata(metadata)
+            bare = Registration.__table__.to_metadata(metadata)
+            bare.constraints = {constraint for constraint in bare.constraints if constraint.name != UNIQUE}
+            connection.exec_driver_sql("DROP TABLE registrations")
+            bare.create(connection)
+    yield
+    with engine.begin() as connection:
+        if engine.dialect.name == "postgresql":
+            connection.exec_driver_sql(f"DROP INDEX IF EXISTS {UNIQUE}")
+            connection.exec_driver_sql(f"ALTER TABLE registrations ADD CONSTRAINT {UNIQUE} UNIQUE (event_id, student_id)")
+        else:
+            connection.exec_driver_sql("DROP TABLE registrations")
+            Registration.__table__.create(connection)
+
+def test_unique_constraint_migration_removes_duplicates(app, database, make_event, make_students,
+                                                        registrations_without_unique):
+    event_id = make_event(price=100)
+    first, second = make_students(2)
+    earlier = datetime.utcnow() - timedelta(days=1)
+    with app.app_context():
+        pending = Registration(event_id=event_id, student_id=first, amount_paid=100, payment_status='pending',
+                               registered_at=earlier)
+        paid = Registration(event_id=event_id, student_id=first, amount_paid=100, payment_status='paid')
+        other = Registration(event_id=event_id, student_id=second, amount_paid=100, payment_status='pending')
+        database.session.add_all([pending, paid, other])
+        database.session.flush()
+        database.session.add(PaymentOutbox(registration_id=pending.id, amount=100))
+        database.session.commit()
+        pending_id, paid_id, other_id = pending.id, paid.id, other.id
+
+        assert migrations.add_registration_unique_constraint()
+        database.session.commit()
+
+        remaining = {registration.id for registration in Registration.query.all()}
+        assert remaining == {paid_id, other_id}
+        assert PaymentOutbox.query.filter_by(registration_id=pending_id).count() == 0
+        event = database.session.get(Event, event_id)
+        assert (event.seats_taken, event.paid_count, float(event.revenue)) == (2, 1, 100.0)
+        assert UNIQUE in {index["name"] for index in inspect(database.engine).get_indexes("registrations")}
+        # Already applied: nothing more to do
+        assert not migrations.add_registration_unique_constraint()
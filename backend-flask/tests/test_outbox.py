@@ -0,0 +1,78 @@
+import app as app_module
+import outbox
+from payments import FakeGateway
+from migrations import rebuild_event_stats
+from models import db, Event, PaymentOutbox, Registration
+
+def workers_for(app, gateway):
+    return outbox.create(app, gateway, on_change=app_module.payments_changed)
+
+def test_declined_payment_frees_the_seat_for_the_waitlist(app, client, make_event, make_students):
+    event_id = make_event(capacity=1, price=100)
+    first, second = make_students(2)
+    assert client.post("/student/register-event", json={"event_id": event_id, "student_id": first}).status_code == 201
+    assert client.post("/student/waitlist", json={"event_id": event_id, "student_id": second}).status_code == 201
+    assert client.get(f"/events/{event_id}").get_json()["available_spots"] == 0  # now cached
+    since = app_module.seat_updates.version
+
+    workers = workers_for(app, FakeGateway(decline_rate=1))
+    assert workers.run_once() == 1
+    assert workers.stats["failed"] == 1
+
+    with app.app_context():
+        registrations = {
+            registration.student_id: registration
+            for registration in db.session.query(Registration).filter_by(event_id=event_id)
+        }
+        # The failed registration stays on record, without its seat
+        assert registrations[first].payment_status == "failed"
+        assert registrations[second].payment_status == "pending"
+        assert db.session.get(Event, event_id).seats_taken == 1
+        failed, = db.session.query(PaymentOutbox).filter_by(registration_id=registrations[first].id)
+        assert failed.status == outbox.FAILED and failed.last_error
+        assert db.session.query(PaymentOutbox).filter_by(registration_id=registrations[second].id).one().status == "pending"
+        # A stats rebuild agrees
+        rebuild_event_stats()
+        assert db.session.get(Event, event_id).seats_taken == 1
+        db.session.rollback()
+
+    assert client.get(f"/events/{event_id}").get_json()["available_spots"] == 0
+    # The seat went straight to the waitlist: nothing to tell stream clients
+    assert app_module.seat_updates.changes_since(since)[1] == []
+
+def test_failed_registration_can_be_removed_and_retried(app, client, make_event, make_students):
+    event_id = make_event(capacity=1, price=100)
+    student_id, = make_students(1)
+    registration = client.post("/student/register-event", json={"event_id": event_id, "student_id": student_id})
+    workers_for(app, FakeGateway(decline_rate=1)).drain()
+    assert client.get(f"/events/{event_id}").get_json()["available_spots"] == 1
+
+    registration_id = registration.get_json()["registration"]["id"]
+    assert client.delete(f"/student/registrations/{registration_id}").status_code == 200
+    with app.app_context():
+        assert db.session.get(Event, event_id).seats_taken == 0  # not released twice
+    assert client.post("/student/register-event", json={"event_id": event_id, "student_id": student_id}).status_code == 201
+
+def test_settled_payment_refreshes_the_dashboard(app, client, make_event, make_students):
+    event_id = make_event(price=100)
+    student_id, = make_students(1)
+    client.post("/student/register-event", json={"event_id": event_id, "student_id": student_id})
+    assert client.get("/admin/dashboard").get_json()["total_revenue"] == 0.0
+
+    workers_for(app, FakeGateway()).drain()
+    assert client.get("/admin/dashboard").get_json()["total_revenue"] == 100.0
+
+def test_web_processes_see_the_payment_workers_changes(app, client, make_event, make_students):
+    event_id = make_event(capacity=1, price=100)
+    first, second = make_students(2)
+    client.post("/student/register-event", json={"event_id": event_id, "student_id": first})
+    assert client.post("/student/register-event", json={"event_id": event_id, "student_id": second}).status_code == 400
+    app_module.seat_watcher.poll()
+    since = app_module.seat_updates.version
+
+    # As in a separate `python worker.py`: no hook into this process
+    outbox.create(app, FakeGateway(decline_rate=1)).drain()
+
+    assert app_module.seat_watcher.poll() == [event_id]
+    assert app_module.seat_updates.changes_since(since)[1] == [{"id": event_id, "available_spots": 1, "is_full": False}]
+    assert client.post("/student/register-event", json={"event_id": event_id, "student_id": second}).status_code == 201
@@ -0,0 +1,15 @@
+from concurrent.futures import ThreadPoolExecutor
+import passwords
+
+def test_pooled_hashing_runs_on_threads(app, monkeypatch):
+    monkeypatch.setitem(app.config, "PASSWORD_HASH_WORKERS", 2)
+    passwords.shutdown()
+    try:
+        with app.app_context():
+            hashed = passwords.hash_passwords(["first-secret", "second-secret"])
+            assert passwords.check_password("second-secret", hashed[1])
+            assert not passwords.check_password("first-secret", hashed[1])
+            # No child processes forked from the threaded server worker
+            assert isinstance(passwords._get_executor(), ThreadPoolExecutor)
+    finally:
+        passwords.shutdown()
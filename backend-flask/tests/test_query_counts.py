@@ -0,0 +1,45 @@
+import pytest
+from models import Registration
+
+# Listing routes must run the same number of statements however many
+# registrations they return, i.e. no per-row (N+1) lookups.
+
+def seed_registrations(app, database, make_event, make_students, count):
+    """``count`` registrations: one student on ``count`` events and ``count`` students on one event"""
+    busy_event = make_event(title="Busy Event")
+    event_ids = [make_event(title=f"Event {i}") for i in range(count)]
+    student_ids = make_students(count)
+    with app.app_context():
+        database.session.add_all(
+            [Registration(event_id=busy_event, student_id=student_id, amount_paid=0, payment_status='paid')
+             for student_id in student_ids]
+            + [Registration(event_id=event_id, student_id=student_ids[0], amount_paid=0, payment_status='paid')
+               for event_id in event_ids]
+        )
+        database.session.commit()
+    return busy_event, student_ids[0]
+
+ROUTES = [
+    "/admin/events",
+    "/admin/registrations",
+    "/admin/registrations?shape=normalized",
+    "/admin/students",
+    "/admin/events/{event_id}/details",
+    "/student/registrations/{student_id}",
+]
+
+@pytest.mark.parametrize("route", ROUTES)
+def test_listing_query_count_is_constant(app, database, client, make_event, make_students, count_queries, route):
+    counts = []
+    for n in (1, 50):
+        with app.app_context():
+            for table in reversed(database.metadata.sorted_tables):
+                database.session.execute(table.delete())
+            database.session.commit()
+        event_id, student_id = seed_registrations(app, database, make_event, make_students, n)
+        path = route.format(event_id=event_id, student_id=student_id)
+        with count_queries() as statements:
+            response = client.get(path)
+        assert response.status_code == 200, response.get_data(as_text=True)
+        counts.append(len(statements))
+    assert counts[0] == counts[1], f"{path}: {counts[0]} queries for 1 registration, {counts[1]} for 50"
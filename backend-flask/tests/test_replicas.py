@@ -0,0 +1,49 @@
+import pytest
+from sqlalchemy import create_engine
+import replicas
+from models import Registration
+from replicas import PRIMARY_UNTIL_HEADER
+
+@pytest.fixture
+def replica(app, database, monkeypatch, tmp_path):
+    """A second SQLite file routed as replica_0: same schema, none of the primary's rows"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    database.metadata.create_all(engine)
+    with app.app_context():
+        monkeypatch.setitem(database.engines, "replica_0", engine)
+    monkeypatch.setattr(replicas, "_down_until", {})
+    yield engine
+    engine.dispose()
+
+def registrations(client, student_id, **headers):
+    return client.get(f"/student/registrations/{student_id}", headers=headers).get_json()
+
+def test_only_the_writing_student_reads_from_the_primary(app, database, client, replica, make_event, make_students):
+    event_id = make_event()
+    first, second = make_students(2)
+    with app.app_context():
+        database.session.add(Registration(event_id=event_id, student_id=second, amount_paid=0, payment_status='paid'))
+        database.session.commit()
+    write = client.post("/student/register-event", json={"event_id": event_id, "student_id": first})
+    assert write.status_code == 201
+    token = write.headers[PRIMARY_UNTIL_HEADER]
+
+    assert registrations(client, first) == []  # the replica has not caught up
+    assert len(registrations(client, first, **{PRIMARY_UNTIL_HEADER: token})) == 1
+    # Nobody else is sent to the primary by that write
+    assert registrations(client, second) == []
+
+def test_login_issues_no_primary_token(client, replica):
+    student = {"usn": "1KS21CS001", "name": "Asha", "email": "asha@example.com", "password": "secret",
+               "semester": 3, "branch": "Computer Science"}
+    assert client.post("/student/register", json=student).status_code == 201
+    login = client.post("/student/login", json={"usn": student["usn"], "password": student["password"]})
+    assert login.status_code == 200
+    assert PRIMARY_UNTIL_HEADER not in login.headers
+
+def test_failed_replica_falls_back_to_the_primary(client, replica, make_event, make_students):
+    event_id = make_event()
+    student_id, = make_students(1)
+    client.post("/student/register-event", json={"event_id": event_id, "student_id": student_id})
+    replicas.mark_down("replica_0", 60)
+    assert len(registrations(client, student_id)) == 1
@@ -0,0 +1,16 @@
+from datetime import date, timedelta
+import app as app_module
+
+def test_cached_search_moves_to_the_next_day(client, make_event, monkeypatch):
+    make_event(title="Hackathon", date=date.today() + timedelta(days=3))
+    first = client.get("/events/search?q=hackathon&date=this_week").get_json()
+    assert first["total"] == 1 and first["facets"]["date"]["this_week"] == 1
+
+    class Later(date):
+        @classmethod
+        def today(cls):
+            return date.today() + timedelta(days=5)
+
+    monkeypatch.setattr(app_module, "date", Later)
+    later = client.get("/events/search?q=hackathon&date=this_week").get_json()
+    assert later["total"] == 0 and later["facets"]["date"]["past"] == 1
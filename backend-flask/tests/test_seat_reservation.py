@@ -0,0 +1,34 @@
+import threading
+import time
+import pytest
+from models import db, Event, Registration
+
+@pytest.mark.parametrize("admission", [False, True], ids=["ungated", "gated"])
+def test_concurrent_registrations_never_oversell(app, database, make_event, make_students, monkeypatch, admission):
+    monkeypatch.setitem(app.config, "ADMISSION_ENABLED", admission)
+    event_id = make_event(capacity=20)
+    student_ids = make_students(200)
+    start = threading.Barrier(len(student_ids))
+    statuses = []
+
+    def register(student_id):
+        client = app.test_client()
+        start.wait()
+        while True:
+            response = client.post("/student/register-event", json={"event_id": event_id, "student_id": student_id})
+            if response.status_code != 429:
+                break
+            time.sleep(0.01)  # queued by the gate: retry, as clients do
+        statuses.append(response.status_code)
+
+    threads = [threading.Thread(target=register, args=(student_id,)) for student_id in student_ids]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert statuses.count(201) == 20
+    assert statuses.count(400) == 180  # Event is full
+    with app.app_context():
+        assert db.session.query(Registration).filter_by(event_id=event_id).count() == 20
+        assert db.session.get(Event, event_id).seats_taken == 20
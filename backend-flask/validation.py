@@ -0,0 +1,129 @@
+from datetime import datetime
+import re
+
+# Validation shared by the single-item endpoints and bulk import. Each
+# parse_* function returns (values, None) on success or (None, message).
+# Rows may come from NDJSON, so text fields are type-checked rather than
+# assumed to be strings.
+
+VALID_BRANCHES = [
+    "Computer Science",
+    "Computer Science and Business Systems",
+    "Electronics and Communication Engineering",
+    "Artificial Intelligence and Data Science",
+    "Mechanical Engineering",
+    "Civil Engineering"
+]
+
+def parse_student(data):
+    """Validate a student registration; values include the plain ``password``"""
+    required_fields = ["usn", "name", "email", "password", "semester", "branch"]
+    for field in required_fields:
+        if not data.get(field):
+            return None, f"{field} is required"
+    error = _check_text(data, ["usn", "name", "email", "password", "branch"], ["phone"])
+    if error:
+        return None, error
+
+    # Validate semester (1-8)
+    try:
+        semester = int(data["semester"])
+    except (TypeError, ValueError):
+        return None, "Semester must be between 1 and 8"
+    if semester < 1 or semester > 8:
+        return None, "Semester must be between 1 and 8"
+
+    # Validate branch
+    if data["branch"] not in VALID_BRANCHES:
+        return None, "Invalid branch"
+
+    return {
+        "id": data["usn"],
+        "usn": data["usn"].strip(),
+        "name": data["name"].strip(),
+        "email": data["email"].strip(),
+        "phone": data.get("phone", ""),
+        "semester": semester,
+        "branch": data["branch"],
+        "password": data["password"],
+    }, None
+
+def _check_text(data, required, optional=()):
+    """Return an error message for the first field holding a non-string"""
+    for field in required:
+        if not isinstance(data[field], str):
+            return f"{field} must be a string"
+    for field in optional:
+        if data.get(field) is not None and not isinstance(data[field], str):
+            return f"{field} must be a string"
+    return None
+
+def parse_price(value):
+    """Parse a price, allowing "free"; raises ValueError on bad input"""
+    if value == "free" or value == "Free":
+        return 0.0
+    if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+        raise ValueError(f"invalid price: {value!r}")
+    return float(value)
+
+def parse_event(data):
+    """Validate a new event; values are Event column kwargs"""
+    required_fields = ["title", "description", "date", "time", "location", "category", "capacity"]
+    for field in required_fields:
+        if not data.get(field):
+            return None, f"{field} is required"
+    # A price of 0 is a free event, so only a missing price is an error
+    if data.get("price") is None:
+        return None, "price is required"
+    error = _check_text(data, ["title", "description", "date", "time", "location", "category"],
+                        ["image", "organizer"])
+    if error:
+        return None, error
+
+    # Validate date format
+    if not re.match(r"^\d{4}-\d{2}-\d{2}$", data["date"]):
+        return None, "date must be in YYYY-MM-DD format"
+
+    # Validate time format
+    if not re.match(r"^\d{2}:\d{2}$", data["time"]):
+        return None, "time must be in HH:MM format"
+
+    try:
+        event_date = datetime.strptime(data["date"], "%Y-%m-%d").date()
+        event_time = datetime.strptime(data["time"], "%H:%M").time()
+    except ValueError as e:
+        return None, str(e)
+
+    # Handle price - allow "free" or numeric value
+    try:
+        price = parse_price(data["price"])
+    except ValueError:
+        return None, "Invalid price format"
+
+    try:
+        capacity = int(data["capacity"])
+        duration = int(data.get("duration") or 2)
+    except (TypeError, ValueError):
+        return None, "capacity and duration must be integers"
+
+    tags = data.get("tags") or []
+    if isinstance(tags, str):
+        tags = [tag.strip() for tag in tags.split(";") if tag.strip()]
+    if not isinstance(tags, list) or not all(isinstance(tag, str) for tag in tags):
+        return None, "tags must be a list of strings"
+
+    return {
+        "title": data["title"].strip(),
+        "description": data["description"].strip(),
+        "date": event_date,
+        "time": event_time,
+        "duration": duration,
+        "location": data["location"].strip(),
+        "category": data["category"].strip(),
+        "capacity": capacity,
+        "price": price,
+        "image": data.get("image", ""),
+        "organizer": data.get("organizer", "Admin"),
+        "status": "active",
+        "tags": tags,
+    }, None
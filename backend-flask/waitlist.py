@@ -0,0 +1,115 @@
+from sqlalchemy import and_, exists, func, select, tuple_
+from models import db, Event, Registration, Student, WaitlistEntry
+import outbox
+
+# Waitlist for full events. Students queue per event in arrival order; when
+# a seat frees up (a cancellation, or an admin raising the capacity) the
+# oldest entries are promoted to registrations in the same transaction, using
+# the same conditional seat UPDATE as /student/register-event so promotion
+# can never oversell. Promoted registrations for paid events start out
+# 'pending' and settle through the payment outbox.
+
+def _registered(event_id, student_id):
+    return exists().where(Registration.event_id == event_id, Registration.student_id == student_id)
+
+def position(entry):
+    """1-based place of ``entry`` in its event's waitlist"""
+    return db.session.execute(
+        select(func.count()).select_from(WaitlistEntry).where(
+            WaitlistEntry.event_id == entry.event_id,
+            tuple_(WaitlistEntry.created_at, WaitlistEntry.id) <= tuple_(entry.created_at, entry.id),
+        )
+    ).scalar()
+
+def entries_for(student_id):
+    """A student's waitlist entries with their positions, oldest first"""
+    other = WaitlistEntry.__table__.alias("other")
+    ahead = select(func.count()).select_from(other).where(
+        other.c.event_id == WaitlistEntry.event_id,
+        tuple_(other.c.created_at, other.c.id) <= tuple_(WaitlistEntry.created_at, WaitlistEntry.id),
+    ).scalar_subquery()
+    return db.session.execute(
+        select(WaitlistEntry, ahead).where(WaitlistEntry.student_id == student_id)
+        .order_by(WaitlistEntry.created_at, WaitlistEntry.id)
+    ).all()
+
+def join(event_id, student_id):
+    """Add a student to a full event's waitlist.
+
+    Returns (entry, None), or (None, (message, status)) when the student
+    cannot join. Joining twice returns the existing entry.
+    """
+    if not db.session.get(Student, student_id):
+        return None, ("Student not found", 404)
+    event = db.session.get(Event, event_id)
+    if not event or event.status != 'active':
+        return None, ("Event not found or inactive", 404)
+    if db.session.execute(select(_registered(event_id, student_id))).scalar():
+        return None, ("Already registered for this event", 400)
+    existing = WaitlistEntry.query.filter_by(event_id=event_id, student_id=student_id).first()
+    if existing:
+        return existing, None
+    if event.seats_taken < event.capacity:
+        return None, ("Event has free seats, register instead", 400)
+    entry = WaitlistEntry(event_id=event_id, student_id=student_id)
+    db.session.add(entry)
+    db.session.flush()
+    return entry, None
+
+def promote(event_id):
+    """Fill ``event_id``'s free seats from its waitlist, oldest first.
+
+    Runs in the caller's transaction, which must commit. Entries of students
+    who have since registered are dropped. Returns the new registrations.
+    """
+    db.session.execute(db.delete(WaitlistEntry).where(
+        WaitlistEntry.event_id == event_id,
+        _registered(event_id, WaitlistEntry.student_id),
+    ).execution_options(synchronize_session=False))
+
+    event = db.session.execute(
+        select(Event.capacity, Event.seats_taken, Event.price).where(Event.id == event_id, Event.status == 'active')
+    ).first()
+    if event is None or event.seats_taken >= event.capacity:
+        return []
+
+    # SKIP LOCKED keeps concurrent promotions from picking the same students
+    entries = db.session.execute(
+        select(WaitlistEntry).where(WaitlistEntry.event_id == event_id)
+        .order_by(WaitlistEntry.created_at, WaitlistEntry.id)
+        .limit(event.capacity - event.seats_taken)
+        .with_for_update(skip_locked=True)
+    ).scalars().all()
+
+    promoted = []
+    for entry in entries:
+        reserved = db.session.execute(
+            db.update(Event)
+            .where(and_(Event.id == event_id, Event.seats_taken < Event.capacity))
+            .values(seats_taken=Event.seats_taken + 1)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if not reserved:
+            break
+        registration = Registration(
+            event_id=event_id,
+            student_id=entry.student_id,
+            amount_paid=event.price or 0,
+            payment_status='pending' if (event.price or 0) > 0 else 'paid',
+            payment_method='card',
+            special_requirements='',
+        )
+        db.session.add(registration)
+        if registration.payment_status == 'pending':
+            db.session.add(outbox.settlement(registration))
+        db.session.delete(entry)
+        promoted.append(registration)
+
+    paid = sum(1 for registration in promoted if registration.payment_status == 'paid')
+    if paid:
+        db.session.execute(
+            db.update(Event).where(Event.id == event_id)
+            .values(paid_count=Event.paid_count + paid)
+            .execution_options(synchronize_session=False)
+        )
+    return promoted
@@ -0,0 +1,42 @@
+"""Payment outbox worker: ``python worker.py`` (see outbox.py).
+
+Runs PAYMENT_WORKERS threads draining the payment outbox until interrupted.
+Production web servers (gunicorn, hypercorn) do not settle payments
+themselves, so run at least one of these next to them; several processes
+can share the outbox safely. ``--once`` settles everything due and exits,
+e.g. from cron.
+"""
+import argparse
+import logging
+import signal
+import threading
+from app import app, payment_workers
+from migrations import run_migrations
+from models import db
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--once", action="store_true", help="settle every due payment, then exit")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(threadName)s %(levelname)s %(message)s")
+    # Same schema bootstrap as `python app.py`, in case the worker starts first
+    with app.app_context():
+        db.create_all()
+        run_migrations()
+
+    if args.once:
+        handled = payment_workers.drain()
+        print(f"Handled {handled} outbox rows: {payment_workers.stats}")
+        return
+
+    stopping = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stopping.set())
+    payment_workers.start()
+    logging.info("Draining the payment outbox with %d threads", payment_workers.threads)
+    stopping.wait()
+    payment_workers.stop()
+    logging.info("Stopped: %s", payment_workers.stats)
+
+if __name__ == "__main__":
+    main()
@@ -1,42 +1,145 @@
-// Generic API call helper
-const apiCall = async (endpoint, options = {}) => {
-  const baseUrl = 'http://localhost:5000';
-  const url = `${baseUrl}${endpoint}`;
+// Number of rows requested per page from the list endpoints
+export const PAGE_SIZE = 50;
+
+const API_BASE_URL = 'http://localhost:5000';
+
+// Read-your-writes token from the last write; while it is in the future the
+// backend serves our reads from the primary instead of a lagging replica
+let readPrimaryUntil = null;
+
+// Signed session token from /student/login, sent as a Bearer token so the
+// backend can identify the student without another login. Kept in
+// localStorage so a reload does not need the password again.
+const SESSION_STORAGE_KEY = 'ksEventsSession';
+let session = null;
+
+const readStoredSession = () => {
+  try {
+    return JSON.parse(localStorage.getItem(SESSION_STORAGE_KEY));
+  } catch {
+    return null;
+  }
+};
+
+const sessionValid = (candidate) => Boolean(candidate && candidate.expiresAt > Date.now() / 1000);
+
+// The logged-in student from a stored, unexpired session, or null
+export const restoreSession = () => {
+  const stored = readStoredSession();
+  if (!sessionValid(stored)) {
+    clearSession();
+    return null;
+  }
+  session = stored;
+  return stored.student;
+};
+
+export const clearSession = () => {
+  session = null;
+  localStorage.removeItem(SESSION_STORAGE_KEY);
+};
+
+// Generic API request helper, returns the parsed body and the raw response
+const apiRequest = async (endpoint, options = {}) => {
+  const url = `${API_BASE_URL}${endpoint}`;
   
-  const defaultOptions = {
-    headers: {
-      'Content-Type': 'application/json',
-    },
+  const headers = {
+    'Content-Type': 'application/json',
+    ...options.headers,
   };
+  if (sessionValid(session)) {
+    headers.Authorization = `Bearer ${session.token}`;
+  }
+  if (readPrimaryUntil && readPrimaryUntil > Date.now() / 1000) {
+    headers['X-Read-Primary-Until'] = String(readPrimaryUntil);
+  }
   
   try {
-    const response = await fetch(url, { ...defaultOptions, ...options });
+    const response = await fetch(url, { ...options, headers });
+    const token = response.headers.get('X-Read-Primary-Until');
+    if (token) {
+      readPrimaryUntil = parseFloat(token);
+    }
     const data = await response.json();
     
+    if (response.status === 401 && headers.Authorization) {
+      clearSession();  // expired or deactivated: log in again
+    }
     if (!response.ok) {
-      throw new Error(data.message || `HTTP error! status: ${response.status}`);
+      // Keep the status and body so callers can act on e.g. a 429 queue position
+      const error = new Error(data.message || `HTTP error! status: ${response.status}`);
+      error.status = response.status;
+      error.data = data;
+      throw error;
     }
     
-    return data;
+    return { data, response };
   } catch (error) {
     console.error('API call failed:', error);
     throw error;
   }
 };
 
+// Generic API call helper
+const apiCall = async (endpoint, options = {}) => {
+  const { data } = await apiRequest(endpoint, options);
+  return data;
+};
+
+// Paged list helper: fetches one page and returns { items, nextCursor }.
+// Pass the previous nextCursor as params.cursor to fetch the following page.
+const apiPage = async (endpoint, params = {}) => {
+  const query = new URLSearchParams({ limit: PAGE_SIZE });
+  Object.entries(params).forEach(([key, value]) => {
+    if (value !== undefined && value !== null && value !== '') {
+      query.set(key, value);
+    }
+  });
+  const { data, response } = await apiRequest(`${endpoint}?${query.toString()}`);
+  return { items: data, nextCursor: response.headers.get('X-Next-Cursor') };
+};
+
+// Live seat availability from /events/stream (server-sent events).
+// onChanges receives [{ id, available_spots, is_full }] deltas; onReset is
+// called when the server cannot replay what we missed and the list should
+// be refetched. EventSource reconnects by itself and resumes from the last
+// version it saw. Returns a function that closes the stream.
+export const subscribeSeats = ({ onChanges, onReset }) => {
+  const source = new EventSource(`${API_BASE_URL}/events/stream`);
+  source.addEventListener('seats', (event) => onChanges(JSON.parse(event.data)));
+  source.addEventListener('reset', () => onReset && onReset());
+  return () => source.close();
+};
+
+// Merge seat deltas into a list of events
+export const applySeatChanges = (events, changes) => {
+  const byId = new Map(changes.map(change => [change.id, change]));
+  return events.map(event => (byId.has(event.id) ? { ...event, ...byId.get(event.id) } : event));
+};
+
 // Health check
 export const healthCheck = () => apiCall('/health');
 
 // Public API endpoints
-export const getEvents = () => apiCall('/events');
+export const getEvents = (params) => apiPage('/events', params);
 export const getEvent = (id) => apiCall(`/events/${id}`);
 export const getCategories = () => apiCall('/categories');
-export const getStudents = () => apiCall('/students');
+// Ranked full-text search: returns { results, total, facets, next_offset }
+export const searchEvents = (params) => {
+  const query = new URLSearchParams();
+  Object.entries(params).forEach(([key, value]) => {
+    if (value !== undefined && value !== null && value !== '') {
+      query.set(key, value);
+    }
+  });
+  return apiCall(`/events/search?${query.toString()}`);
+};
+export const getStudents = (params) => apiPage('/students', params);
 export const getBranches = () => apiCall('/branches');
 export const getSemesters = () => apiCall('/semesters');
 
 // Admin API endpoints
-export const adminGetEvents = () => apiCall('/admin/events');
+export const adminGetEvents = (params) => apiPage('/admin/events', params);
 export const adminCreateEvent = (eventData) => apiCall('/admin/events', {
   method: 'POST',
   body: JSON.stringify(eventData),
@@ -48,9 +151,9 @@ export const adminUpdateEvent = (id, eventData) => apiCall(`/admin/events/${id}`
 export const adminDeleteEvent = (id) => apiCall(`/admin/events/${id}`, {
   method: 'DELETE',
 });
-export const adminGetRegistrations = () => apiCall('/admin/registrations');
+export const adminGetRegistrations = (params) => apiPage('/admin/registrations', params);
 export const adminGetDashboard = () => apiCall('/admin/dashboard');
-export const adminGetStudents = () => apiCall('/admin/students');
+export const adminGetStudents = (params) => apiPage('/admin/students', params);
 export const adminGetEventDetails = (id) => apiCall(`/admin/events/${id}/details`);
 
 // Student API endpoints
@@ -58,22 +161,44 @@ export const studentRegister = (studentData) => apiCall('/student/register', {
   method: 'POST',
   body: JSON.stringify(studentData),
 });
-export const studentLogin = (credentials) => apiCall('/student/login', {
+export const studentLogin = async (credentials) => {
+  const data = await apiCall('/student/login', {
+    method: 'POST',
+    body: JSON.stringify(credentials),
+  });
+  session = { token: data.token, expiresAt: data.expires_at, student: data.student };
+  localStorage.setItem(SESSION_STORAGE_KEY, JSON.stringify(session));
+  return data;
+};
+export const studentGetEvents = (params) => apiPage('/student/events', params);
+// Pass the same idempotencyKey when retrying one registration attempt so the
+// server runs it at most once
+export const studentRegisterEvent = (registrationData, idempotencyKey) => apiCall('/student/register-event', {
   method: 'POST',
-  body: JSON.stringify(credentials),
+  body: JSON.stringify(registrationData),
+  headers: idempotencyKey ? { 'Idempotency-Key': idempotencyKey } : {},
 });
-export const studentGetEvents = () => apiCall('/student/events');
-export const studentRegisterEvent = (registrationData) => apiCall('/student/register-event', {
+export const studentRegisterEvents = (batchData, idempotencyKey) => apiCall('/student/register-events', {
   method: 'POST',
-  body: JSON.stringify(registrationData),
+  body: JSON.stringify(batchData),
+  headers: idempotencyKey ? { 'Idempotency-Key': idempotencyKey } : {},
 });
 export const studentGetRegistrations = (studentId) => apiCall(`/student/registrations/${studentId}`);
 export const studentCancelRegistration = (registrationId) => apiCall(`/student/registrations/${registrationId}`, {
   method: 'DELETE',
 });
+export const studentJoinWaitlist = (waitlistData) => apiCall('/student/waitlist', {
+  method: 'POST',
+  body: JSON.stringify(waitlistData),
+});
+export const studentGetWaitlist = (studentId) => apiCall(`/student/waitlist/${studentId}`);
+export const studentLeaveWaitlist = (eventId, studentId) => apiCall(`/student/waitlist/${eventId}/${studentId}`, {
+  method: 'DELETE',
+});
 
 // Payment API endpoints
-export const processPayment = (paymentData) => apiCall('/payment/process', {
+export const processPayment = (paymentData, idempotencyKey) => apiCall('/payment/process', {
   method: 'POST',
   body: JSON.stringify(paymentData),
+  headers: idempotencyKey ? { 'Idempotency-Key': idempotencyKey } : {},
 });
\ No newline at end of file
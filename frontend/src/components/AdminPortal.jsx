@@ -16,6 +16,7 @@ const AdminPortal = () => {
   const [registrations, setRegistrations] = useState([]);
   const [students, setStudents] = useState([]);
   const [dashboard, setDashboard] = useState(null);
+  const [nextCursors, setNextCursors] = useState({});
   const [loading, setLoading] = useState(false);
   const [message, setMessage] = useState('');
   const [showEventModal, setShowEventModal] = useState(false);
@@ -42,16 +43,19 @@ const AdminPortal = () => {
           setDashboard(dashboardData);
           break;
         case 'events':
-          const eventsData = await adminGetEvents();
-          setEvents(eventsData);
+          const eventsPage = await adminGetEvents();
+          setEvents(eventsPage.items);
+          setNextCursors(cursors => ({ ...cursors, events: eventsPage.nextCursor }));
           break;
         case 'registrations':
-          const registrationsData = await adminGetRegistrations();
-          setRegistrations(registrationsData);
+          const registrationsPage = await adminGetRegistrations();
+          setRegistrations(registrationsPage.items);
+          setNextCursors(cursors => ({ ...cursors, registrations: registrationsPage.nextCursor }));
           break;
         case 'students':
-          const studentsData = await adminGetStudents();
-          setStudents(studentsData);
+          const studentsPage = await adminGetStudents();
+          setStudents(studentsPage.items);
+          setNextCursors(cursors => ({ ...cursors, students: studentsPage.nextCursor }));
           break;
         default:
           break;
@@ -63,6 +67,22 @@ const AdminPortal = () => {
     }
   };
 
+  const loadMore = async (tab) => {
+    const loaders = {
+      events: [adminGetEvents, setEvents],
+      registrations: [adminGetRegistrations, setRegistrations],
+      students: [adminGetStudents, setStudents]
+    };
+    const [fetchPage, setItems] = loaders[tab];
+    try {
+      const page = await fetchPage({ cursor: nextCursors[tab] });
+      setItems(items => [...items, ...page.items]);
+      setNextCursors(cursors => ({ ...cursors, [tab]: page.nextCursor }));
+    } catch (error) {
+      setMessage(error.message || 'Failed to load more data');
+    }
+  };
+
   const handleCreateEvent = () => {
     setEditingEvent(null);
     setEventForm({
@@ -288,6 +308,11 @@ const AdminPortal = () => {
                   ))}
                 </tbody>
               </table>
+              {nextCursors.events && (
+                <button onClick={() => loadMore('events')} className="btn-secondary btn-sm">
+                  Load more
+                </button>
+              )}
             </div>
           )}
         </div>
@@ -329,6 +354,11 @@ const AdminPortal = () => {
                   ))}
                 </tbody>
               </table>
+              {nextCursors.registrations && (
+                <button onClick={() => loadMore('registrations')} className="btn-secondary btn-sm">
+                  Load more
+                </button>
+              )}
             </div>
           )}
         </div>
@@ -368,6 +398,11 @@ const AdminPortal = () => {
                   ))}
                 </tbody>
               </table>
+              {nextCursors.students && (
+                <button onClick={() => loadMore('students')} className="btn-secondary btn-sm">
+                  Load more
+                </button>
+              )}
             </div>
           )}
         </div>
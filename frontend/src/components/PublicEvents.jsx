@@ -1,6 +1,9 @@
 import { useState, useEffect } from 'react'
 import { Link } from 'react-router-dom'
-import { getEvents, getCategories } from '../api'
+import { PAGE_SIZE, getEvents, getCategories, searchEvents, subscribeSeats, applySeatChanges } from '../api'
+
+// Wait this long after the last keystroke before searching
+const SEARCH_DELAY_MS = 150
 
 export default function PublicEvents() {
   const [events, setEvents] = useState([])
@@ -9,31 +12,73 @@ export default function PublicEvents() {
   const [error, setError] = useState(null)
   const [selectedCategory, setSelectedCategory] = useState('all')
   const [searchTerm, setSearchTerm] = useState('')
+  const [nextCursor, setNextCursor] = useState(null)
+  const [search, setSearch] = useState(null)  // { results, total, facets } while searching
+
+  const categoryParams = () => (selectedCategory === 'all' ? {} : { category: selectedCategory })
 
   useEffect(() => {
-    const loadData = async () => {
-      try {
-        const [eventsData, categoriesData] = await Promise.all([
-          getEvents(),
-          getCategories()
-        ])
-        setEvents(eventsData)
-        setCategories(categoriesData)
-      } catch (err) {
-        setError(err.message)
-      } finally {
-        setLoading(false)
-      }
+    getCategories()
+      .then(setCategories)
+      .catch(err => setError(err.message))
+  }, [])
+
+  const loadData = async () => {
+    try {
+      const page = await getEvents(categoryParams())
+      setEvents(page.items)
+      setNextCursor(page.nextCursor)
+    } catch (err) {
+      setError(err.message)
+    } finally {
+      setLoading(false)
     }
+  }
+
+  useEffect(() => {
     loadData()
-  }, [])
+  }, [selectedCategory])
 
-  const filteredEvents = events.filter(event => {
-    const matchesCategory = selectedCategory === 'all' || event.category === selectedCategory
-    const matchesSearch = event.title.toLowerCase().includes(searchTerm.toLowerCase()) ||
-                         event.description.toLowerCase().includes(searchTerm.toLowerCase())
-    return matchesCategory && matchesSearch
-  })
+  // Live seat updates mark events as full without refetching
+  useEffect(() => subscribeSeats({
+    onChanges: changes => {
+      setEvents(current => applySeatChanges(current, changes))
+      setSearch(current => current && { ...current, results: applySeatChanges(current.results, changes) })
+    },
+    onReset: loadData,
+  }), [selectedCategory])
+
+  const loadMore = async () => {
+    try {
+      const page = await getEvents({ ...categoryParams(), cursor: nextCursor })
+      setEvents(current => [...current, ...page.items])
+      setNextCursor(page.nextCursor)
+    } catch (err) {
+      setError(err.message)
+    }
+  }
+
+  // Search runs server-side as the user types; stale responses are dropped
+  useEffect(() => {
+    const q = searchTerm.trim()
+    if (!q) {
+      setSearch(null)
+      return undefined
+    }
+    let cancelled = false
+    const timer = setTimeout(() => {
+      searchEvents({ q, ...categoryParams(), limit: PAGE_SIZE })
+        .then(result => { if (!cancelled) setSearch(result) })
+        .catch(err => { if (!cancelled) setError(err.message) })
+    }, SEARCH_DELAY_MS)
+    return () => {
+      cancelled = true
+      clearTimeout(timer)
+    }
+  }, [searchTerm, selectedCategory])
+
+  const filteredEvents = search ? search.results : events
+  const categoryCount = category => (search ? ` (${search.facets.category[category] || 0})` : '')
 
   if (loading) {
     return (
@@ -100,7 +145,7 @@ export default function PublicEvents() {
                 className={`filter-btn ${selectedCategory === category ? 'active' : ''}`}
                 onClick={() => setSelectedCategory(category)}
               >
-                {category}
+                {category}{categoryCount(category)}
               </button>
             ))}
           </div>
@@ -111,7 +156,9 @@ export default function PublicEvents() {
       <div className="events-header">
         <h2>Upcoming Events</h2>
         <p className="text-muted">
-          Showing {filteredEvents.length} of {events.length} events
+          {search
+            ? `Showing ${filteredEvents.length} of ${search.total} matching events`
+            : `Showing ${filteredEvents.length} of ${events.length} events`}
         </p>
       </div>
 
@@ -148,6 +195,7 @@ export default function PublicEvents() {
               <div className="event-content">
                 <div className="event-category">
                   <span className="badge badge-info">{event.category}</span>
+                  {event.is_full && <span className="badge badge-error">Full</span>}
                 </div>
                 
                 <h3 className="event-title">{event.title}</h3>
@@ -200,6 +248,14 @@ export default function PublicEvents() {
         </div>
       )}
 
+      {nextCursor && !search && (
+        <div className="text-center mt-4">
+          <button className="btn btn-outline" onClick={loadMore}>
+            Load more events
+          </button>
+        </div>
+      )}
+
       {/* Call to Action */}
       <div className="card mt-4">
         <div className="text-center">
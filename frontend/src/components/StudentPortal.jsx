@@ -2,19 +2,31 @@ import React, { useState, useEffect } from 'react';
 import { 
   studentRegister, 
   studentLogin, 
+  restoreSession,
+  clearSession,
   studentGetEvents, 
   studentRegisterEvent, 
   studentGetRegistrations, 
   studentCancelRegistration,
+  studentJoinWaitlist,
   getBranches,
   getSemesters,
-  processPayment 
+  processPayment,
+  subscribeSeats,
+  applySeatChanges
 } from '../api';
 
+// Give up waiting in the registration queue after this many retries
+const MAX_QUEUE_RETRIES = 60;
+
+const sleep = (ms) => new Promise(resolve => setTimeout(resolve, ms));
+
 const StudentPortal = () => {
-  const [activeTab, setActiveTab] = useState('login');
-  const [currentStudent, setCurrentStudent] = useState(null);
+  // A stored session logs the student straight back in, without bcrypt
+  const [currentStudent, setCurrentStudent] = useState(restoreSession);
+  const [activeTab, setActiveTab] = useState(() => (currentStudent ? 'events' : 'login'));
   const [events, setEvents] = useState([]);
+  const [eventsCursor, setEventsCursor] = useState(null);
   const [registrations, setRegistrations] = useState([]);
   const [branches, setBranches] = useState([]);
   const [semesters, setSemesters] = useState([]);
@@ -28,6 +40,9 @@ const StudentPortal = () => {
     phone: '', semester: '', branch: ''
   });
   const [selectedEvent, setSelectedEvent] = useState(null);
+  // One key per registration attempt: resubmitting the modal cannot register twice
+  const [registrationKey, setRegistrationKey] = useState(null);
+  const [waitlistOffered, setWaitlistOffered] = useState(false);
   const [showRegistrationModal, setShowRegistrationModal] = useState(false);
 
   useEffect(() => {
@@ -38,6 +53,15 @@ const StudentPortal = () => {
     }
   }, [currentStudent]);
 
+  // Seat counts update live instead of refetching the list
+  useEffect(() => {
+    if (!currentStudent) return undefined;
+    return subscribeSeats({
+      onChanges: changes => setEvents(current => applySeatChanges(current, changes)),
+      onReset: loadEvents,
+    });
+  }, [currentStudent]);
+
   const loadBranchesAndSemesters = async () => {
     try {
       const [branchesData, semestersData] = await Promise.all([
@@ -54,8 +78,9 @@ const StudentPortal = () => {
   const loadEvents = async () => {
     try {
       setLoading(true);
-      const eventsData = await studentGetEvents();
-      setEvents(eventsData);
+      const eventsPage = await studentGetEvents();
+      setEvents(eventsPage.items);
+      setEventsCursor(eventsPage.nextCursor);
     } catch (error) {
       setMessage('Failed to load events');
     } finally {
@@ -63,6 +88,16 @@ const StudentPortal = () => {
     }
   };
 
+  const loadMoreEvents = async () => {
+    try {
+      const eventsPage = await studentGetEvents({ cursor: eventsCursor });
+      setEvents(current => [...current, ...eventsPage.items]);
+      setEventsCursor(eventsPage.nextCursor);
+    } catch (error) {
+      setMessage('Failed to load events');
+    }
+  };
+
   const loadRegistrations = async () => {
     if (!currentStudent) return;
     try {
@@ -111,18 +146,50 @@ const StudentPortal = () => {
     e.preventDefault();
     try {
       setLoading(true);
-      await studentRegisterEvent({
+      // A 429 means the event is busy: wait our turn and retry with the same key
+      let result;
+      for (let attempt = 0; ; attempt++) {
+        try {
+          result = await studentRegisterEvent({
+            event_id: selectedEvent.id,
+            student_id: currentStudent.id
+          }, registrationKey);
+          break;
+        } catch (error) {
+          if (error.status !== 429 || attempt >= MAX_QUEUE_RETRIES) throw error;
+          setMessage(`Registration is busy, you are #${error.data.queue_position} in the queue...`);
+          await sleep((error.data.retry_after || 1) * 1000);
+        }
+      }
+      // Paid events are charged in the background after registering
+      setMessage(result.registration.payment_status === 'pending'
+        ? 'Event registration successful! Your payment is being processed.'
+        : 'Event registration successful!');
+      setShowRegistrationModal(false);
+      setSelectedEvent(null);
+      loadRegistrations();
+    } catch (error) {
+      setMessage(error.message || 'Registration failed');
+      setWaitlistOffered(Boolean(error.data && error.data.waitlist));
+    } finally {
+      setLoading(false);
+    }
+  };
+
+  const handleJoinWaitlist = async () => {
+    try {
+      setLoading(true);
+      const result = await studentJoinWaitlist({
         event_id: selectedEvent.id,
         student_id: currentStudent.id
       });
-      setMessage('Event registration successful!');
+      setMessage(`You are #${result.entry.position} on the waitlist. We will register you if a seat frees up.`);
       setShowRegistrationModal(false);
       setSelectedEvent(null);
-      loadEvents();
-      loadRegistrations();
     } catch (error) {
-      setMessage(error.message || 'Registration failed');
+      setMessage(error.message || 'Could not join the waitlist');
     } finally {
+      setWaitlistOffered(false);
       setLoading(false);
     }
   };
@@ -142,6 +209,7 @@ const StudentPortal = () => {
   };
 
   const handleLogout = () => {
+    clearSession();
     setCurrentStudent(null);
     setActiveTab('login');
     setMessage('Logged out successfully');
@@ -376,18 +444,24 @@ const StudentPortal = () => {
                     <button 
                       onClick={() => {
                         setSelectedEvent(event);
+                        setRegistrationKey(crypto.randomUUID());
+                        setWaitlistOffered(event.is_full);
                         setShowRegistrationModal(true);
                       }}
-                      disabled={event.is_full}
-                      className={`btn-primary ${event.is_full ? 'disabled' : ''}`}
+                      className="btn-primary"
                     >
-                      {event.is_full ? 'Event Full' : 'Register'}
+                      {event.is_full ? 'Event Full - Join Waitlist' : 'Register'}
                     </button>
                   </div>
                 </div>
               ))}
             </div>
           )}
+          {!loading && eventsCursor && (
+            <button onClick={loadMoreEvents} className="btn-secondary">
+              Load more events
+            </button>
+          )}
         </div>
       )}
 
@@ -447,9 +521,15 @@ const StudentPortal = () => {
                 <button type="button" onClick={() => setShowRegistrationModal(false)} className="btn-secondary">
                   Cancel
                 </button>
-                <button type="submit" disabled={loading} className="btn-primary">
-                  {loading ? 'Registering...' : 'Confirm Registration'}
-                </button>
+                {waitlistOffered ? (
+                  <button type="button" onClick={handleJoinWaitlist} disabled={loading} className="btn-primary">
+                    {loading ? 'Joining...' : 'Join Waitlist'}
+                  </button>
+                ) : (
+                  <button type="submit" disabled={loading} className="btn-primary">
+                    {loading ? 'Registering...' : 'Confirm Registration'}
+                  </button>
+                )}
               </div>
             </form>
           </div>
@@ -3,10 +3,20 @@
 echo "Starting KS Events - Advanced Event Management System"
 echo
 
-echo "Starting Flask Backend Server..."
 cd backend-flask
-python app.py &
-BACKEND_PID=$!
+if [ "$1" = "--prod" ]; then
+    # Pre-forked gunicorn workers, tuned by WEB_* and DB_POOL_* env vars
+    echo "Starting Flask Backend Server (gunicorn)..."
+    gunicorn -c gunicorn.conf.py app:app &
+    BACKEND_PID=$!
+    # gunicorn workers do not settle payments; the outbox worker does
+    python worker.py &
+    PAYMENT_WORKER_PID=$!
+else
+    echo "Starting Flask Backend Server..."
+    python app.py &
+    BACKEND_PID=$!
+fi
 
 echo "Waiting 3 seconds for backend to start..."
 sleep 3
@@ -31,5 +41,5 @@ echo
 echo "Press Ctrl+C to stop both servers..."
 
 # Wait for user to stop
-trap "echo 'Stopping servers...'; kill $BACKEND_PID $FRONTEND_PID; exit" INT
+trap "echo 'Stopping servers...'; kill $BACKEND_PID $PAYMENT_WORKER_PID $FRONTEND_PID; exit" INT
 wait